@@ -0,0 +1,143 @@
+# Photon compiler benchmark
+# Compiles the programs of genProgram.py at growing sizes to C and times
+# every phase of the compiler: reading the file, parsing and assembly,
+# transpiling, writing the C sources and gcc. Each size runs in its own
+# process, so the peak memory of every phase belongs to that size only.
+# The growth exponent of each phase is fitted over the sizes, so
+# superlinear behaviour shows up as an exponent above 1.
+#
+# Usage: python benchCompiler.py [sizes] [-o results.json] [--no-gcc]
+#   sizes is a comma separated list, like 50,100,200,400
+
+import os
+import sys
+import json
+import math
+import time
+import tempfile
+import subprocess
+
+CORE = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'core')
+SIZES = [50, 100, 200, 400]
+PHASES = ['read', 'parse', 'transpile', 'emit', 'gcc']
+
+try:
+    import resource
+except ModuleNotFoundError:
+    # Windows doesn't have resource, memory is not measured there
+    resource = None
+
+def peakMemory(who='self'):
+    ''' Return the peak resident memory in MiB of this process
+        or of its finished children
+    '''
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == 'self' else resource.RUSAGE_CHILDREN)
+    # Linux reports KiB, macOS reports bytes
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(usage.ru_maxrss * scale / 2**20, 1)
+
+def measure(size, folder, gcc=True):
+    ''' Compile the program of a size in folder. Return the time and
+        peak memory of every phase.
+    '''
+    sys.path.insert(1, CORE)
+    from genProgram import writeProgram
+    import parseCache
+    from interpreter import Interpreter, parseLines
+    parseCache.ENABLED = False
+    os.chdir(folder)
+    result = {'size': size, 'lines': writeProgram(size, folder), 'phases': {}}
+    def phase(name, start):
+        result['phases'][name] = {'time': time.perf_counter() - start, 'memory': peakMemory()}
+    start = time.perf_counter()
+    interpreter = Interpreter('main.w', lang='c', standardLibs=os.path.join(CORE, 'libs'), transpileOnly=True)
+    lines = [(interpreter.lineNumber, line) for line in interpreter.lines]
+    phase('read', start)
+    start = time.perf_counter()
+    structs = parseLines(lines, filename='main.w')
+    phase('parse', start)
+    engine = interpreter.engine
+    # The transpiler reports its progress on stdout
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as sys.stdout:
+        try:
+            start = time.perf_counter()
+            # As Interpreter.processAll does, the constants of the file are
+            # known before any struct is processed
+            engine.scanBindings(structs)
+            for struct in structs:
+                engine.process(struct)
+            phase('transpile', start)
+            start = time.perf_counter()
+            engine.write()
+            phase('emit', start)
+        finally:
+            sys.stdout = stdout
+    if gcc:
+        start = time.perf_counter()
+        subprocess.check_call(['gcc', '-O2', '-std=c99', f'Sources/c/{engine.filename}']
+            + list(engine.links) + ['-o', 'Sources/c/main'])
+        result['phases']['gcc'] = {'time': time.perf_counter() - start, 'memory': peakMemory('children')}
+    return result
+
+def runSize(size, gcc=True):
+    ''' Measure a size in a new process and return its result '''
+    with tempfile.TemporaryDirectory() as folder:
+        command = [sys.executable, os.path.realpath(__file__), '--measure', str(size), folder]
+        if not gcc:
+            command.append('--no-gcc')
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+def growthExponent(sizes, times):
+    ''' Return the slope of the least squares line of log(time) over
+        log(size), the k of time ~ size**k
+    '''
+    points = [(math.log(s), math.log(t)) for s, t in zip(sizes, times) if t > 0]
+    if len(points) < 2:
+        return None
+    meanX = sum(x for x, _ in points) / len(points)
+    meanY = sum(y for _, y in points) / len(points)
+    variance = sum((x - meanX)**2 for x, _ in points)
+    if variance == 0:
+        return None
+    return round(sum((x - meanX) * (y - meanY) for x, y in points) / variance, 2)
+
+def report(runs):
+    phases = [p for p in PHASES if p in runs[0]['phases']]
+    print(f'{"size":>6} {"lines":>7} ' + ' '.join(f'{p:>16}' for p in phases))
+    for run in runs:
+        cells = []
+        for p in phases:
+            measured = run['phases'][p]
+            memory = '' if measured['memory'] is None else f' {measured["memory"]:.0f}M'
+            cells.append(f'{measured["time"]:.3f}s{memory}'.rjust(16))
+        print(f'{run["size"]:>6} {run["lines"]:>7} ' + ' '.join(cells))
+
+def main(args):
+    if args[:1] == ['--measure']:
+        result = measure(int(args[1]), args[2], gcc='--no-gcc' not in args)
+        print(json.dumps(result))
+        return
+    sizes = SIZES
+    output = 'benchResults.json'
+    gcc = '--no-gcc' not in args
+    for i, arg in enumerate(args):
+        if arg == '-o':
+            output = args[i+1]
+        elif arg[0].isdigit():
+            sizes = [int(size) for size in arg.split(',')]
+    runs = [runSize(size, gcc=gcc) for size in sizes]
+    exponents = {}
+    for p in runs[0]['phases']:
+        exponents[p] = growthExponent(sizes, [run['phases'][p]['time'] for run in runs])
+    report(runs)
+    print('growth exponents: ' + ', '.join(f'{p} {k}' for p, k in exponents.items()))
+    with open(output, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'platform': sys.platform,
+            'runs': runs, 'exponents': exponents}, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,143 @@
+# Photon loop benchmark
+# Runs a program made of loops with invariant work in them, the length
+# of a list in a while condition, a chain of fields in a range and in
+# the body, and a cast of a value the loop doesn't change. The program
+# is transpiled with and without loop invariant code motion and the
+# best time of a few runs is reported for every target.
+#
+# Usage: python benchLoops.py [langs] [-n runs] [-o results.json]
+#   langs is a comma separated list, like c,py,js
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import time
+
+CORE = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'core')
+LANGS = ['c', 'py', 'js']
+# Times the loops run in each target, so each takes about a second
+REPEAT = {'c': 300000, 'py': 1000, 'js': 40000}
+RUNS = 3
+
+PROGRAM = '''class Grid():
+    def new(.width = 0, .height = 0):
+
+class World():
+    def new(Grid .grid = Grid()):
+
+class Game():
+    def new(World .world = World()):
+
+    def int area():
+        int total = 0
+        int y = 0
+        while y < self.world.grid.height:
+            for x in 0..self.world.grid.width:
+                total += self.world.grid.width * y + x
+            y += 1
+        return total
+
+int[] a = []
+for i in 0..1000:
+    a.append(i)
+g = Game(World(Grid(100, 10)))
+total = 0
+scaled = 0.0
+for r in 0..{repeat}:
+    i = 0
+    while i < a.len:
+        total += a[i]
+        i += 1
+    n = a.len + r
+    for k in 0..1000:
+        scaled += float(n) * 0.5
+    total += g.area()
+print(total)
+print(scaled)
+'''
+
+def transpile(lang, folder, licm=True):
+    ''' Write the program for lang in folder and transpile it, in this
+        process, with or without loop invariant code motion
+    '''
+    sys.path.insert(1, CORE)
+    import parseCache
+    from interpreter import Interpreter
+    from transpilers import licm as motion
+    parseCache.ENABLED = False
+    motion.ENABLED = licm
+    os.chdir(folder)
+    with open('main.w', 'w') as f:
+        f.write(PROGRAM.replace('{repeat}', str(REPEAT[lang])))
+    with open(os.devnull, 'w') as sys.stdout:
+        Interpreter('main.w', lang=lang, standardLibs=os.path.join(CORE, 'libs'), transpileOnly=True).run()
+
+def command(lang, folder):
+    ''' Return the command that runs the transpiled program, or None if
+        the tools of the target are missing
+    '''
+    sources = os.path.join(folder, 'Sources', lang)
+    if lang == 'py':
+        return [sys.executable, os.path.join(sources, 'main.py')]
+    if lang == 'js':
+        return ['node', os.path.join(sources, 'main.js')] if shutil.which('node') else None
+    if not shutil.which('gcc'):
+        return None
+    binary = os.path.join(sources, 'main')
+    subprocess.check_call(['gcc', '-O2', '-std=gnu99', os.path.join(sources, 'main.c'), '-lm', '-o', binary],
+        stderr=subprocess.DEVNULL)
+    return [binary]
+
+def measure(lang, licm, runs):
+    ''' Return the best time of the program in lang and what it prints '''
+    with tempfile.TemporaryDirectory() as folder:
+        script = [sys.executable, os.path.realpath(__file__), '--transpile', lang, folder]
+        if not licm:
+            script.append('--no-licm')
+        subprocess.run(script, check=True)
+        run = command(lang, folder)
+        if run is None:
+            return None, None
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = subprocess.run(run, check=True, capture_output=True, text=True).stdout
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+def main(args):
+    if args[:1] == ['--transpile']:
+        transpile(args[1], args[2], licm='--no-licm' not in args)
+        return
+    langs = LANGS
+    runs = RUNS
+    output = 'benchLoops.json'
+    for i, arg in enumerate(args):
+        if arg == '-o':
+            output = args[i+1]
+        elif arg == '-n':
+            runs = int(args[i+1])
+        elif arg[0].isalpha() and args[i-1:i] not in (['-o'], ['-n']):
+            langs = arg.split(',')
+    results = {}
+    print(f'{"lang":>4} {"no licm":>10} {"licm":>10} {"speedup":>8}')
+    for lang in langs:
+        before, expected = measure(lang, False, runs)
+        after, printed = measure(lang, True, runs)
+        if before is None or after is None:
+            print(f'{lang:>4} {"skipped":>10}')
+            continue
+        if printed != expected:
+            raise RuntimeError(f'The {lang} program prints something else with licm')
+        results[lang] = {'noLicm': before, 'licm': after}
+        print(f'{lang:>4} {before:>9.3f}s {after:>9.3f}s {before / after:>7.2f}x')
+    with open(output, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'platform': sys.platform,
+            'repeat': REPEAT, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
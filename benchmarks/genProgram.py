@@ -0,0 +1,78 @@
+# Photon benchmark programs
+# Generates synthetic photon programs that grow with a size parameter:
+# many functions, a deep class hierarchy, long expressions, large list
+# and map literals and many imported modules. The output only depends
+# on the size, so runs of benchCompiler.py can be compared.
+
+import os
+
+def genModule(k):
+    ''' Return the source of the k-th imported module '''
+    return f'def int g{k}(int x):\n    return x + {k}\n'
+
+def genFunctions(count):
+    lines = ['def int f0(int x, int y):', '    return x + y']
+    for k in range(1, count):
+        lines += [
+            f'def int f{k}(int x, int y):',
+            f'    int t = f{k-1}(x, y)',
+            f'    if t > {k * 7}:',
+            f'        t = t - {k}',
+            '    else:',
+            f'        t = t + {k % 5}',
+            f'    return t + y * {k % 3}',
+        ]
+    return lines
+
+def genClasses(depth):
+    lines = ['class C0():', '    def new(.v = 0):', '    def int get0():', '        return .v']
+    for k in range(1, depth):
+        lines += [
+            f'class C{k}(C{k-1}):',
+            f'    def int get{k}():',
+            f'        return .v + {k}',
+        ]
+    return lines
+
+def genExpression(terms):
+    ''' Return a long integer expression with grouped and ungrouped terms '''
+    operators = ['+', '-', '*', '+']
+    expr = '1'
+    for k in range(1, terms):
+        term = f'({k} * 2)' if k % 4 == 0 else str(k % 10)
+        expr += f' {operators[k % 4]} {term}'
+    return expr
+
+def genProgram(size):
+    ''' Return the source of the main program of a size and a dict
+        with the source of every module it imports, by file name
+    '''
+    modules = {f'mod{k}.w': genModule(k) for k in range(size // 10 + 1)}
+    lines = [f'import mod{k}' for k in range(len(modules))]
+    lines += genFunctions(size)
+    lines += genClasses(size // 10 + 1)
+    lines.append(f'int e = {genExpression(size)}')
+    lines.append('l = [' + ', '.join(str(k) for k in range(size)) + ']')
+    lines.append('int:int m = {' + ', '.join(f'{k}: {k * k}' for k in range(size)) + '}')
+    last = size // 10
+    lines += [
+        f'c = C{last}()',
+        f'int r = c.get{last}()',
+        f'int s = f{size - 1}(1, 2)',
+        f'int g = mod{last}.g{last}(3)',
+        f'print("{{r}} {{s}} {{g}} {{e}} {{l[{size - 1}]}} {{m[{size - 1}]}}")',
+    ]
+    return '\n'.join(lines) + '\n', modules
+
+def writeProgram(size, folder):
+    ''' Write the program of a size to folder as main.w and its modules.
+        Return the number of lines written.
+    '''
+    main, modules = genProgram(size)
+    modules['main.w'] = main
+    lines = 0
+    for filename, source in modules.items():
+        with open(os.path.join(folder, filename), 'w') as f:
+            f.write(source)
+        lines += source.count('\n')
+    return lines
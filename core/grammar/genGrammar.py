@@ -27,13 +27,75 @@ def genRules(val):
             terms.append((v,))
     return list(product(*terms))
 
+def genKinds(grammar):
+    ''' Return every token kind of the grammar, in order of appearance.
+        The kind code of each kind is its position here.
+    '''
+    kinds = {}
+    for patterns in grammar.values():
+        for pattern in patterns:
+            for kind in pattern:
+                kinds.setdefault(kind, len(kinds))
+    return kinds
+
+def genMatcher(grammar, kinds):
+    ''' Return a trie over the kind codes of every pattern.
+        Each node maps a kind code to the next node and the
+        None key holds the priority of the pattern ending there,
+        which is its position in the patterns dict.
+    '''
+    order = {}
+    for feature, patterns in grammar.items():
+        for pattern in patterns:
+            order[pattern] = feature
+    matcher = {}
+    for priority, pattern in enumerate(order):
+        node = matcher
+        for kind in pattern:
+            node = node.setdefault(kinds[kind], {})
+        node[None] = priority
+    return matcher
+
+def writeNode(g, node, depth, names):
+    indent = '  ' * depth
+    for key, value in node.items():
+        if key is None:
+            g.write(f'{indent}None: {value},\n')
+        else:
+            g.write(f'{indent}{key}: {{ # {names[key]}\n')
+            writeNode(g, value, depth + 1, names)
+            g.write(f'{indent}}},\n')
+
 def createGrammar(grammar):
+    kinds = genKinds(grammar)
+    order = {}
+    for feature, patterns in grammar.items():
+        for pattern in patterns:
+            order[pattern] = feature
     with open('generatedGrammar.py', 'w') as g:
-        g.write('patterns = {\n')
-        for feature, patterns in grammar.items():
-            for pattern in patterns:
-                g.write(f'  {pattern}: {feature},\n')
-        g.write('}')
+        g.write('# Generated by genGrammar.py from the grammar file, do not edit.\n')
+        g.write('# Patterns are listed by priority and written with kind codes,\n')
+        g.write('# the position of each kind in kinds.\n\n')
+        g.write('kinds = (\n')
+        for kind in kinds:
+            g.write(f'  {kind!r},\n')
+        g.write(')\n\n')
+        g.write('# Name of the lexer function that reduces each pattern\n')
+        g.write('reducers = (\n')
+        for pattern, feature in order.items():
+            g.write(f'  {feature!r},\n')
+        g.write(')\n\n')
+        g.write('patterns = (\n')
+        for pattern in order:
+            codes = tuple(kinds[kind] for kind in pattern)
+            g.write(f'  {codes}, # {" ".join(pattern)}\n')
+        g.write(')\n\n')
+        g.write(f'patternLengths = {tuple(len(pattern) for pattern in order)}\n')
+        g.write(f'maxPatternLength = {max(len(pattern) for pattern in order)}\n\n')
+        g.write('# Trie of the patterns. Its first level indexes them by first kind.\n')
+        g.write('matcher = {\n')
+        writeNode(g, genMatcher(grammar, kinds), 1, list(kinds))
+        g.write('}\n')
 
 with open(grammar, 'r') as g:
     generated = {}
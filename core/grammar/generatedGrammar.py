@@ -1,119 +1,898 @@
-patterns = {
-  ('hashtag',): comment,
-  ('singleQuote',): string,
-  ('doubleQuote',): string,
-  ('type', 'lbracket', 'rbracket', 'var'): arrayType,
-  ('type', 'lbracket', 'rbracket', 'space'): arrayType,
-  ('var', 'lbracket', 'rbracket', 'var'): arrayType,
-  ('var', 'lbracket', 'rbracket', 'space'): arrayType,
-  ('expr', 'lbracket', 'rbracket', 'var'): arrayType,
-  ('expr', 'lbracket', 'rbracket', 'space'): arrayType,
-  ('type', 'lbracket', 'num', 'rbracket', 'var'): arrayType,
-  ('type', 'lbracket', 'num', 'rbracket', 'space'): arrayType,
-  ('var', 'lbracket', 'num', 'rbracket', 'var'): arrayType,
-  ('var', 'lbracket', 'num', 'rbracket', 'space'): arrayType,
-  ('expr', 'lbracket', 'num', 'rbracket', 'var'): arrayType,
-  ('expr', 'lbracket', 'num', 'rbracket', 'space'): arrayType,
-  ('type', 'beginBlock', 'type'): mapType,
-  ('type', 'beginBlock', 'var'): mapType,
-  ('var', 'beginBlock', 'type'): mapType,
-  ('var', 'beginBlock', 'var'): mapType,
-  ('var', 'underline', 'var'): var,
-  ('underline', 'var'): var,
-  ('var', 'underline'): var,
-  ('underline',): var,
-  ('num', 'dot', 'num'): floatNumber,
-  ('num', 'dot'): floatNumber,
-  ('expr', 'dot', 'expr'): dotAccess,
-  ('type', 'space', 'dot', 'expr'): dotAccess,
-  ('expr', 'space', 'dot', 'expr'): dotAccess,
-  ('dot', 'expr'): dotAccess,
-  ('type', 'var'): typeDeclaration,
-  ('expr', 'var'): typeDeclaration,
-  ('lparen', 'expr', 'rparen'): group,
-  ('equal', 'equal'): operator,
-  ('equal', 'operator'): operator,
-  ('operator', 'equal'): operator,
-  ('operator', 'operator'): operator,
-  ('type', 'lparen', 'expr', 'rparen'): cast,
-  ('expr', 'lparen', 'rparen'): call,
-  ('expr', 'lparen', 'expr', 'rparen'): call,
-  ('expr', 'lparen', 'args', 'rparen'): call,
-  ('expr', 'lparen', 'assign', 'rparen'): call,
-  ('expr', 'lparen', 'kwargs', 'rparen'): call,
-  ('expr', 'lparen', 'expr', 'comma', 'assign', 'rparen'): call,
-  ('expr', 'lparen', 'expr', 'comma', 'kwargs', 'rparen'): call,
-  ('expr', 'lparen', 'args', 'comma', 'assign', 'rparen'): call,
-  ('expr', 'lparen', 'args', 'comma', 'kwargs', 'rparen'): call,
-  ('num',): expr,
-  ('floatNumber',): expr,
-  ('var',): expr,
-  ('dotAccess',): expr,
-  ('group',): expr,
-  ('num', 'operator', 'num'): expr,
-  ('num', 'operator', 'var'): expr,
-  ('num', 'operator', 'expr'): expr,
-  ('var', 'operator', 'num'): expr,
-  ('var', 'operator', 'var'): expr,
-  ('var', 'operator', 'expr'): expr,
-  ('expr', 'operator', 'num'): expr,
-  ('expr', 'operator', 'var'): expr,
-  ('expr', 'operator', 'expr'): expr,
-  ('operator', 'expr'): expr,
-  ('expr', 'beginBlock', 'expr'): keyVal,
-  ('keyVals', 'comma', 'keyVal'): keyVals,
-  ('keyVals', 'comma', 'keyVals'): keyVals,
-  ('keyVal', 'comma', 'keyVal'): keyVals,
-  ('keyVal', 'comma', 'keyVals'): keyVals,
-  ('expr', 'lbracket', 'expr', 'rbracket'): indexAccess,
-  ('lbracket', 'args', 'rbracket'): array,
-  ('lbracket', 'expr', 'rbracket'): array,
-  ('lbracket', 'rbracket'): array,
-  ('lbrace', 'rbrace'): hashmap,
-  ('lbrace', 'keyVal', 'rbrace'): hashmap,
-  ('lbrace', 'keyVals', 'rbrace'): hashmap,
-  ('returnStatement',): funcReturn,
-  ('returnStatement', 'expr'): funcReturn,
-  ('expr', 'dot', 'dot', 'expr'): rangeExpr,
-  ('expr', 'dot', 'dot', 'expr', 'dot', 'dot', 'expr'): rangeExpr,
-  ('ifStatement', 'expr', 'beginBlock'): ifelif,
-  ('elifStatement', 'expr', 'beginBlock'): ifelif,
-  ('forStatement', 'args', 'inStatement', 'range', 'beginBlock'): forLoop,
-  ('forStatement', 'args', 'inStatement', 'expr', 'beginBlock'): forLoop,
-  ('forStatement', 'expr', 'inStatement', 'range', 'beginBlock'): forLoop,
-  ('forStatement', 'expr', 'inStatement', 'expr', 'beginBlock'): forLoop,
-  ('forStatement', 'expr', 'beginBlock'): forTarget,
-  ('whileStatement', 'expr', 'beginBlock'): whileLoop,
-  ('args', 'comma', 'args'): args,
-  ('args', 'comma', 'expr'): args,
-  ('expr', 'comma', 'args'): args,
-  ('expr', 'comma', 'expr'): args,
-  ('assign', 'comma', 'assign'): kwargs,
-  ('assign', 'comma', 'kwargs'): kwargs,
-  ('kwargs', 'comma', 'assign'): kwargs,
-  ('kwargs', 'comma', 'kwargs'): kwargs,
-  ('expr', 'operator', 'equal', 'expr'): augAssign,
-  ('expr', 'equal', 'expr'): assign,
-  ('fromStatement', 'expr', 'importStatement', 'expr'): fromImport,
-  ('fromStatement', 'expr', 'importStatement', 'args'): fromImport,
-  ('fromStatement', 'expr', 'importStatement', 'operator'): fromImport,
-  ('nativeStatement', 'importStatement', 'expr'): imports,
-  ('importStatement', 'expr'): imports,
-  ('delStatement', 'expr'): delete,
-  ('defStatement', 'expr', 'lparen', 'expr', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'args', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'assign', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'kwargs', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'expr', 'comma', 'assign', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'expr', 'comma', 'kwargs', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'args', 'comma', 'assign', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'args', 'comma', 'kwargs', 'rparen', 'beginBlock'): function,
-  ('defStatement', 'expr', 'lparen', 'rparen', 'beginBlock'): function,
-  ('classStatement', 'expr', 'lparen', 'rparen', 'beginBlock'): classDefinition,
-  ('classStatement', 'expr', 'lparen', 'expr', 'rparen', 'beginBlock'): classDefinition,
-  ('classStatement', 'expr', 'lparen', 'args', 'rparen', 'beginBlock'): classDefinition,
-  ('open', 'lparen', 'args', 'rparen'): openFunc,
-  ('open', 'lparen', 'expr', 'rparen'): openFunc,
-  ('input', 'lparen', 'expr', 'rparen'): inputFunc,
-  ('input', 'lparen', 'rparen'): inputFunc,
-}
\ No newline at end of file
+# Generated by genGrammar.py from the grammar file, do not edit.
+# Patterns are listed by priority and written with kind codes,
+# the position of each kind in kinds.
+
+kinds = (
+  'hashtag',
+  'singleQuote',
+  'doubleQuote',
+  'type',
+  'lbracket',
+  'rbracket',
+  'var',
+  'space',
+  'expr',
+  'num',
+  'beginBlock',
+  'underline',
+  'dot',
+  'lparen',
+  'rparen',
+  'equal',
+  'operator',
+  'args',
+  'assign',
+  'kwargs',
+  'comma',
+  'floatNumber',
+  'dotAccess',
+  'group',
+  'keyVals',
+  'keyVal',
+  'lbrace',
+  'rbrace',
+  'returnStatement',
+  'ifStatement',
+  'elifStatement',
+  'forStatement',
+  'inStatement',
+  'range',
+  'whileStatement',
+  'fromStatement',
+  'importStatement',
+  'nativeStatement',
+  'delStatement',
+  'defStatement',
+  'classStatement',
+  'open',
+  'input',
+)
+
+# Name of the lexer function that reduces each pattern
+reducers = (
+  'comment',
+  'string',
+  'string',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'arrayType',
+  'mapType',
+  'mapType',
+  'mapType',
+  'mapType',
+  'var',
+  'var',
+  'var',
+  'var',
+  'floatNumber',
+  'floatNumber',
+  'dotAccess',
+  'dotAccess',
+  'dotAccess',
+  'dotAccess',
+  'typeDeclaration',
+  'typeDeclaration',
+  'group',
+  'operator',
+  'operator',
+  'operator',
+  'operator',
+  'cast',
+  'call',
+  'call',
+  'call',
+  'call',
+  'call',
+  'call',
+  'call',
+  'call',
+  'call',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'expr',
+  'keyVal',
+  'keyVals',
+  'keyVals',
+  'keyVals',
+  'keyVals',
+  'indexAccess',
+  'array',
+  'array',
+  'array',
+  'hashmap',
+  'hashmap',
+  'hashmap',
+  'funcReturn',
+  'funcReturn',
+  'rangeExpr',
+  'rangeExpr',
+  'ifelif',
+  'ifelif',
+  'forLoop',
+  'forLoop',
+  'forLoop',
+  'forLoop',
+  'forTarget',
+  'whileLoop',
+  'args',
+  'args',
+  'args',
+  'args',
+  'kwargs',
+  'kwargs',
+  'kwargs',
+  'kwargs',
+  'augAssign',
+  'assign',
+  'fromImport',
+  'fromImport',
+  'fromImport',
+  'imports',
+  'imports',
+  'delete',
+  'function',
+  'function',
+  'function',
+  'function',
+  'function',
+  'function',
+  'function',
+  'function',
+  'function',
+  'classDefinition',
+  'classDefinition',
+  'classDefinition',
+  'openFunc',
+  'openFunc',
+  'inputFunc',
+  'inputFunc',
+)
+
+patterns = (
+  (0,), # hashtag
+  (1,), # singleQuote
+  (2,), # doubleQuote
+  (3, 4, 5, 6), # type lbracket rbracket var
+  (3, 4, 5, 7), # type lbracket rbracket space
+  (6, 4, 5, 6), # var lbracket rbracket var
+  (6, 4, 5, 7), # var lbracket rbracket space
+  (8, 4, 5, 6), # expr lbracket rbracket var
+  (8, 4, 5, 7), # expr lbracket rbracket space
+  (3, 4, 9, 5, 6), # type lbracket num rbracket var
+  (3, 4, 9, 5, 7), # type lbracket num rbracket space
+  (6, 4, 9, 5, 6), # var lbracket num rbracket var
+  (6, 4, 9, 5, 7), # var lbracket num rbracket space
+  (8, 4, 9, 5, 6), # expr lbracket num rbracket var
+  (8, 4, 9, 5, 7), # expr lbracket num rbracket space
+  (3, 10, 3), # type beginBlock type
+  (3, 10, 6), # type beginBlock var
+  (6, 10, 3), # var beginBlock type
+  (6, 10, 6), # var beginBlock var
+  (6, 11, 6), # var underline var
+  (11, 6), # underline var
+  (6, 11), # var underline
+  (11,), # underline
+  (9, 12, 9), # num dot num
+  (9, 12), # num dot
+  (8, 12, 8), # expr dot expr
+  (3, 7, 12, 8), # type space dot expr
+  (8, 7, 12, 8), # expr space dot expr
+  (12, 8), # dot expr
+  (3, 6), # type var
+  (8, 6), # expr var
+  (13, 8, 14), # lparen expr rparen
+  (15, 15), # equal equal
+  (15, 16), # equal operator
+  (16, 15), # operator equal
+  (16, 16), # operator operator
+  (3, 13, 8, 14), # type lparen expr rparen
+  (8, 13, 14), # expr lparen rparen
+  (8, 13, 8, 14), # expr lparen expr rparen
+  (8, 13, 17, 14), # expr lparen args rparen
+  (8, 13, 18, 14), # expr lparen assign rparen
+  (8, 13, 19, 14), # expr lparen kwargs rparen
+  (8, 13, 8, 20, 18, 14), # expr lparen expr comma assign rparen
+  (8, 13, 8, 20, 19, 14), # expr lparen expr comma kwargs rparen
+  (8, 13, 17, 20, 18, 14), # expr lparen args comma assign rparen
+  (8, 13, 17, 20, 19, 14), # expr lparen args comma kwargs rparen
+  (9,), # num
+  (21,), # floatNumber
+  (6,), # var
+  (22,), # dotAccess
+  (23,), # group
+  (9, 16, 9), # num operator num
+  (9, 16, 6), # num operator var
+  (9, 16, 8), # num operator expr
+  (6, 16, 9), # var operator num
+  (6, 16, 6), # var operator var
+  (6, 16, 8), # var operator expr
+  (8, 16, 9), # expr operator num
+  (8, 16, 6), # expr operator var
+  (8, 16, 8), # expr operator expr
+  (16, 8), # operator expr
+  (8, 10, 8), # expr beginBlock expr
+  (24, 20, 25), # keyVals comma keyVal
+  (24, 20, 24), # keyVals comma keyVals
+  (25, 20, 25), # keyVal comma keyVal
+  (25, 20, 24), # keyVal comma keyVals
+  (8, 4, 8, 5), # expr lbracket expr rbracket
+  (4, 17, 5), # lbracket args rbracket
+  (4, 8, 5), # lbracket expr rbracket
+  (4, 5), # lbracket rbracket
+  (26, 27), # lbrace rbrace
+  (26, 25, 27), # lbrace keyVal rbrace
+  (26, 24, 27), # lbrace keyVals rbrace
+  (28,), # returnStatement
+  (28, 8), # returnStatement expr
+  (8, 12, 12, 8), # expr dot dot expr
+  (8, 12, 12, 8, 12, 12, 8), # expr dot dot expr dot dot expr
+  (29, 8, 10), # ifStatement expr beginBlock
+  (30, 8, 10), # elifStatement expr beginBlock
+  (31, 17, 32, 33, 10), # forStatement args inStatement range beginBlock
+  (31, 17, 32, 8, 10), # forStatement args inStatement expr beginBlock
+  (31, 8, 32, 33, 10), # forStatement expr inStatement range beginBlock
+  (31, 8, 32, 8, 10), # forStatement expr inStatement expr beginBlock
+  (31, 8, 10), # forStatement expr beginBlock
+  (34, 8, 10), # whileStatement expr beginBlock
+  (17, 20, 17), # args comma args
+  (17, 20, 8), # args comma expr
+  (8, 20, 17), # expr comma args
+  (8, 20, 8), # expr comma expr
+  (18, 20, 18), # assign comma assign
+  (18, 20, 19), # assign comma kwargs
+  (19, 20, 18), # kwargs comma assign
+  (19, 20, 19), # kwargs comma kwargs
+  (8, 16, 15, 8), # expr operator equal expr
+  (8, 15, 8), # expr equal expr
+  (35, 8, 36, 8), # fromStatement expr importStatement expr
+  (35, 8, 36, 17), # fromStatement expr importStatement args
+  (35, 8, 36, 16), # fromStatement expr importStatement operator
+  (37, 36, 8), # nativeStatement importStatement expr
+  (36, 8), # importStatement expr
+  (38, 8), # delStatement expr
+  (39, 8, 13, 8, 14, 10), # defStatement expr lparen expr rparen beginBlock
+  (39, 8, 13, 17, 14, 10), # defStatement expr lparen args rparen beginBlock
+  (39, 8, 13, 18, 14, 10), # defStatement expr lparen assign rparen beginBlock
+  (39, 8, 13, 19, 14, 10), # defStatement expr lparen kwargs rparen beginBlock
+  (39, 8, 13, 8, 20, 18, 14, 10), # defStatement expr lparen expr comma assign rparen beginBlock
+  (39, 8, 13, 8, 20, 19, 14, 10), # defStatement expr lparen expr comma kwargs rparen beginBlock
+  (39, 8, 13, 17, 20, 18, 14, 10), # defStatement expr lparen args comma assign rparen beginBlock
+  (39, 8, 13, 17, 20, 19, 14, 10), # defStatement expr lparen args comma kwargs rparen beginBlock
+  (39, 8, 13, 14, 10), # defStatement expr lparen rparen beginBlock
+  (40, 8, 13, 14, 10), # classStatement expr lparen rparen beginBlock
+  (40, 8, 13, 8, 14, 10), # classStatement expr lparen expr rparen beginBlock
+  (40, 8, 13, 17, 14, 10), # classStatement expr lparen args rparen beginBlock
+  (41, 13, 17, 14), # open lparen args rparen
+  (41, 13, 8, 14), # open lparen expr rparen
+  (42, 13, 8, 14), # input lparen expr rparen
+  (42, 13, 14), # input lparen rparen
+)
+
+patternLengths = (1, 1, 1, 4, 4, 4, 4, 4, 4, 5, 5, 5, 5, 5, 5, 3, 3, 3, 3, 3, 2, 2, 1, 3, 2, 3, 4, 4, 2, 2, 2, 3, 2, 2, 2, 2, 4, 3, 4, 4, 4, 4, 6, 6, 6, 6, 1, 1, 1, 1, 1, 3, 3, 3, 3, 3, 3, 3, 3, 3, 2, 3, 3, 3, 3, 3, 4, 3, 3, 2, 2, 3, 3, 1, 2, 4, 7, 3, 3, 5, 5, 5, 5, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 4, 3, 4, 4, 4, 3, 2, 2, 6, 6, 6, 6, 8, 8, 8, 8, 5, 5, 6, 6, 4, 4, 4, 3)
+maxPatternLength = 8
+
+# Trie of the patterns. Its first level indexes them by first kind.
+matcher = {
+  0: { # hashtag
+    None: 0,
+  },
+  1: { # singleQuote
+    None: 1,
+  },
+  2: { # doubleQuote
+    None: 2,
+  },
+  3: { # type
+    4: { # lbracket
+      5: { # rbracket
+        6: { # var
+          None: 3,
+        },
+        7: { # space
+          None: 4,
+        },
+      },
+      9: { # num
+        5: { # rbracket
+          6: { # var
+            None: 9,
+          },
+          7: { # space
+            None: 10,
+          },
+        },
+      },
+    },
+    10: { # beginBlock
+      3: { # type
+        None: 15,
+      },
+      6: { # var
+        None: 16,
+      },
+    },
+    7: { # space
+      12: { # dot
+        8: { # expr
+          None: 26,
+        },
+      },
+    },
+    6: { # var
+      None: 29,
+    },
+    13: { # lparen
+      8: { # expr
+        14: { # rparen
+          None: 36,
+        },
+      },
+    },
+  },
+  6: { # var
+    4: { # lbracket
+      5: { # rbracket
+        6: { # var
+          None: 5,
+        },
+        7: { # space
+          None: 6,
+        },
+      },
+      9: { # num
+        5: { # rbracket
+          6: { # var
+            None: 11,
+          },
+          7: { # space
+            None: 12,
+          },
+        },
+      },
+    },
+    10: { # beginBlock
+      3: { # type
+        None: 17,
+      },
+      6: { # var
+        None: 18,
+      },
+    },
+    11: { # underline
+      6: { # var
+        None: 19,
+      },
+      None: 21,
+    },
+    None: 48,
+    16: { # operator
+      9: { # num
+        None: 54,
+      },
+      6: { # var
+        None: 55,
+      },
+      8: { # expr
+        None: 56,
+      },
+    },
+  },
+  8: { # expr
+    4: { # lbracket
+      5: { # rbracket
+        6: { # var
+          None: 7,
+        },
+        7: { # space
+          None: 8,
+        },
+      },
+      9: { # num
+        5: { # rbracket
+          6: { # var
+            None: 13,
+          },
+          7: { # space
+            None: 14,
+          },
+        },
+      },
+      8: { # expr
+        5: { # rbracket
+          None: 66,
+        },
+      },
+    },
+    12: { # dot
+      8: { # expr
+        None: 25,
+      },
+      12: { # dot
+        8: { # expr
+          None: 75,
+          12: { # dot
+            12: { # dot
+              8: { # expr
+                None: 76,
+              },
+            },
+          },
+        },
+      },
+    },
+    7: { # space
+      12: { # dot
+        8: { # expr
+          None: 27,
+        },
+      },
+    },
+    6: { # var
+      None: 30,
+    },
+    13: { # lparen
+      14: { # rparen
+        None: 37,
+      },
+      8: { # expr
+        14: { # rparen
+          None: 38,
+        },
+        20: { # comma
+          18: { # assign
+            14: { # rparen
+              None: 42,
+            },
+          },
+          19: { # kwargs
+            14: { # rparen
+              None: 43,
+            },
+          },
+        },
+      },
+      17: { # args
+        14: { # rparen
+          None: 39,
+        },
+        20: { # comma
+          18: { # assign
+            14: { # rparen
+              None: 44,
+            },
+          },
+          19: { # kwargs
+            14: { # rparen
+              None: 45,
+            },
+          },
+        },
+      },
+      18: { # assign
+        14: { # rparen
+          None: 40,
+        },
+      },
+      19: { # kwargs
+        14: { # rparen
+          None: 41,
+        },
+      },
+    },
+    16: { # operator
+      9: { # num
+        None: 57,
+      },
+      6: { # var
+        None: 58,
+      },
+      8: { # expr
+        None: 59,
+      },
+      15: { # equal
+        8: { # expr
+          None: 93,
+        },
+      },
+    },
+    10: { # beginBlock
+      8: { # expr
+        None: 61,
+      },
+    },
+    20: { # comma
+      17: { # args
+        None: 87,
+      },
+      8: { # expr
+        None: 88,
+      },
+    },
+    15: { # equal
+      8: { # expr
+        None: 94,
+      },
+    },
+  },
+  11: { # underline
+    6: { # var
+      None: 20,
+    },
+    None: 22,
+  },
+  9: { # num
+    12: { # dot
+      9: { # num
+        None: 23,
+      },
+      None: 24,
+    },
+    None: 46,
+    16: { # operator
+      9: { # num
+        None: 51,
+      },
+      6: { # var
+        None: 52,
+      },
+      8: { # expr
+        None: 53,
+      },
+    },
+  },
+  12: { # dot
+    8: { # expr
+      None: 28,
+    },
+  },
+  13: { # lparen
+    8: { # expr
+      14: { # rparen
+        None: 31,
+      },
+    },
+  },
+  15: { # equal
+    15: { # equal
+      None: 32,
+    },
+    16: { # operator
+      None: 33,
+    },
+  },
+  16: { # operator
+    15: { # equal
+      None: 34,
+    },
+    16: { # operator
+      None: 35,
+    },
+    8: { # expr
+      None: 60,
+    },
+  },
+  21: { # floatNumber
+    None: 47,
+  },
+  22: { # dotAccess
+    None: 49,
+  },
+  23: { # group
+    None: 50,
+  },
+  24: { # keyVals
+    20: { # comma
+      25: { # keyVal
+        None: 62,
+      },
+      24: { # keyVals
+        None: 63,
+      },
+    },
+  },
+  25: { # keyVal
+    20: { # comma
+      25: { # keyVal
+        None: 64,
+      },
+      24: { # keyVals
+        None: 65,
+      },
+    },
+  },
+  4: { # lbracket
+    17: { # args
+      5: { # rbracket
+        None: 67,
+      },
+    },
+    8: { # expr
+      5: { # rbracket
+        None: 68,
+      },
+    },
+    5: { # rbracket
+      None: 69,
+    },
+  },
+  26: { # lbrace
+    27: { # rbrace
+      None: 70,
+    },
+    25: { # keyVal
+      27: { # rbrace
+        None: 71,
+      },
+    },
+    24: { # keyVals
+      27: { # rbrace
+        None: 72,
+      },
+    },
+  },
+  28: { # returnStatement
+    None: 73,
+    8: { # expr
+      None: 74,
+    },
+  },
+  29: { # ifStatement
+    8: { # expr
+      10: { # beginBlock
+        None: 77,
+      },
+    },
+  },
+  30: { # elifStatement
+    8: { # expr
+      10: { # beginBlock
+        None: 78,
+      },
+    },
+  },
+  31: { # forStatement
+    17: { # args
+      32: { # inStatement
+        33: { # range
+          10: { # beginBlock
+            None: 79,
+          },
+        },
+        8: { # expr
+          10: { # beginBlock
+            None: 80,
+          },
+        },
+      },
+    },
+    8: { # expr
+      32: { # inStatement
+        33: { # range
+          10: { # beginBlock
+            None: 81,
+          },
+        },
+        8: { # expr
+          10: { # beginBlock
+            None: 82,
+          },
+        },
+      },
+      10: { # beginBlock
+        None: 83,
+      },
+    },
+  },
+  34: { # whileStatement
+    8: { # expr
+      10: { # beginBlock
+        None: 84,
+      },
+    },
+  },
+  17: { # args
+    20: { # comma
+      17: { # args
+        None: 85,
+      },
+      8: { # expr
+        None: 86,
+      },
+    },
+  },
+  18: { # assign
+    20: { # comma
+      18: { # assign
+        None: 89,
+      },
+      19: { # kwargs
+        None: 90,
+      },
+    },
+  },
+  19: { # kwargs
+    20: { # comma
+      18: { # assign
+        None: 91,
+      },
+      19: { # kwargs
+        None: 92,
+      },
+    },
+  },
+  35: { # fromStatement
+    8: { # expr
+      36: { # importStatement
+        8: { # expr
+          None: 95,
+        },
+        17: { # args
+          None: 96,
+        },
+        16: { # operator
+          None: 97,
+        },
+      },
+    },
+  },
+  37: { # nativeStatement
+    36: { # importStatement
+      8: { # expr
+        None: 98,
+      },
+    },
+  },
+  36: { # importStatement
+    8: { # expr
+      None: 99,
+    },
+  },
+  38: { # delStatement
+    8: { # expr
+      None: 100,
+    },
+  },
+  39: { # defStatement
+    8: { # expr
+      13: { # lparen
+        8: { # expr
+          14: { # rparen
+            10: { # beginBlock
+              None: 101,
+            },
+          },
+          20: { # comma
+            18: { # assign
+              14: { # rparen
+                10: { # beginBlock
+                  None: 105,
+                },
+              },
+            },
+            19: { # kwargs
+              14: { # rparen
+                10: { # beginBlock
+                  None: 106,
+                },
+              },
+            },
+          },
+        },
+        17: { # args
+          14: { # rparen
+            10: { # beginBlock
+              None: 102,
+            },
+          },
+          20: { # comma
+            18: { # assign
+              14: { # rparen
+                10: { # beginBlock
+                  None: 107,
+                },
+              },
+            },
+            19: { # kwargs
+              14: { # rparen
+                10: { # beginBlock
+                  None: 108,
+                },
+              },
+            },
+          },
+        },
+        18: { # assign
+          14: { # rparen
+            10: { # beginBlock
+              None: 103,
+            },
+          },
+        },
+        19: { # kwargs
+          14: { # rparen
+            10: { # beginBlock
+              None: 104,
+            },
+          },
+        },
+        14: { # rparen
+          10: { # beginBlock
+            None: 109,
+          },
+        },
+      },
+    },
+  },
+  40: { # classStatement
+    8: { # expr
+      13: { # lparen
+        14: { # rparen
+          10: { # beginBlock
+            None: 110,
+          },
+        },
+        8: { # expr
+          14: { # rparen
+            10: { # beginBlock
+              None: 111,
+            },
+          },
+        },
+        17: { # args
+          14: { # rparen
+            10: { # beginBlock
+              None: 112,
+            },
+          },
+        },
+      },
+    },
+  },
+  41: { # open
+    13: { # lparen
+      17: { # args
+        14: { # rparen
+          None: 113,
+        },
+      },
+      8: { # expr
+        14: { # rparen
+          None: 114,
+        },
+      },
+    },
+  },
+  42: { # input
+    13: { # lparen
+      8: { # expr
+        14: { # rparen
+          None: 115,
+        },
+      },
+      14: { # rparen
+        None: 116,
+      },
+    },
+  },
+}
@@ -6,13 +6,260 @@
 #   - Call the engine to Process the struct
 #   - Run the processed struct
 
-from photonParser import parse, assembly, showError
-from photonParser import debug as debugFunc
+from photonParser import Parser
+from lexer import BEGIN_BLOCK, COMMENT, ELIF_STATEMENT, ELSE_STATEMENT
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import parseCache
+from transpilers import fold, inline, shake, licm, bounds
+import codecs
+import os
+import re
 import sys
 
-class Interpreter():
-    def __init__(self, filename='', lang='c', platform=sys.platform, framework='', module=False, standardLibs='', debug=False, transpileOnly=False):
+# Line endings that continue a call, list or map on the next line
+continuations = {'(\n', ',\n', '{\n', '[\n'}
+# Lines that only close it
+closings = {')\n', ']\n', '}\n'}
+
+# Parse the top level blocks of files in worker processes
+PARALLEL = False
+# Files with fewer logical lines are not worth the workers
+PARALLEL_LINES = 2000
+# Top level lines that continue the block before them
+continuesBlock = re.compile(r'\s|#|(elif|else)\b')
+
+class Reader():
+    ''' Reads the structs of photon code, line by line from self.input,
+        as the console gives them. Files are built by BlockBuilder.
+    '''
+    def __init__(self, filename='', debug=False):
+        self.filename = filename
+        self.debug = debug
+        self.parser = Parser(debug=debug)
+        self.lineNumber = 0
+        self.line = ''
+        # Structs of the lines read before, None to always reduce them
+        self.lineCache = None
+
+    def parseLine(self):
+        ''' Return the tokens of self.line, keeping its text for the line cache '''
+        tokenized = self.parser.parse(self.line, filename=self.filename,
+                no=self.lineNumber, debug=self.debug)
+        tokenized[0]['line'] = self.line.strip()
+        return tokenized
+
+    def assembleLine(self, tokenized):
+        ''' Return the struct of a line. A line read before is taken from
+            the line cache, with the block, elifs and else of this time.
+        '''
+        if self.lineCache is None or len(tokenized) < 2:
+            return self.parser.assembly(tokenized)
+        key = (tokenized[0]['line'], tokenized[0]['indent'])
+        head = tokenized[1]
+        # Reducers carry these along untouched, so they are left out of the cache
+        attached = {name: head.pop(name) for name in ('block', 'elifs', 'else') if name in head}
+        frozen = self.lineCache.get(key)
+        if frozen is None:
+            struct = self.parser.assembly(tokenized)
+            self.lineCache.put(key, parseCache.freeze(struct))
+        else:
+            struct = parseCache.thaw(frozen)
+        struct.update(attached)
+        return struct
+
+    def getBlock(self, indent):
+        ''' Return a list of code corresponding to the indentation level
+        '''
+        self.line = self.input('... ')
+        self.parser.trace('In a block', center=True)
+        blockTokenized = self.parseLine()
+        blockIndent = blockTokenized[0]['indent']
+        block = []
+        if blockIndent > indent:
+            struct, nextLine = self.handleTokenized(blockTokenized)
+            block.append(struct)
+            if not nextLine:
+                self.line = self.input('... ')
+            blockTokenized = self.parseLine()
+            while blockTokenized[0]['indent'] == blockIndent:
+                struct, nextLine = self.handleTokenized(blockTokenized)
+                block.append(struct)
+                if not nextLine:
+                    self.line = self.input('... ')
+                blockTokenized = self.parseLine()
+            self.parser.trace('Out of a block', center=True)
+            return block, blockTokenized
+        else:
+            self.parser.trace('Out of a block', center=True)
+            return block, blockTokenized
+            raise SyntaxError(f'Expecting an indented block here.\nLine: {self.line}')
+
+    def skipComments(self, tokenized):
+        ''' Return the tokens of the first line from here that is not
+            a line of comments, so they don't separate an elif or else
+            from its block
+        '''
+        while len(tokenized) == 2 and tokenized[1]['token'] == 'comment':
+            self.line = self.input('... ')
+            tokenized = self.parseLine()
+        return tokenized
+
+    def handleBlock(self, tokenized):
+        ''' Return a struct with a block and possibly modifiers '''
+        indent = tokenized[0]['indent']
+        block, nextTokenized = self.getBlock(indent)
+        tokenized = self.parser.assembly(tokenized, block=block)
+        nextTokenized = self.skipComments(nextTokenized)
+        if len(nextTokenized) > 1:
+            while nextTokenized[1]['token'] in {'elifStatement','elseStatement'} and nextTokenized[0]['indent'] == indent:
+                block, afterTokenized = self.getBlock(indent)
+                nextTokenized = self.parser.assembly(nextTokenized, block=block)
+                tokenized = self.parser.assembly(tokenized, modifier=nextTokenized)
+                nextTokenized = self.skipComments(afterTokenized)
+                if len(nextTokenized) == 1:
+                    break
+        struct = self.assembleLine(tokenized)
+        return struct
+
+    def handleTokenized(self, tokenized):
+        ''' Return a struct to be processed by the VM '''
+        ''' And if there is a line to be processed in the buffer (self.line) '''
+        if tokenized[-1]['token'] == 'beginBlock':
+            struct = self.handleBlock(tokenized)
+            return struct, True
+        else:
+            struct = self.assembleLine(tokenized)
+            return struct, False
+
+class OpenBlock():
+    ''' A line ending in ':' whose block is still being built '''
+    def __init__(self, tokenized, owner=None):
+        self.tokenized = tokenized
+        self.indent = tokenized[0].indent
+        # Indentation of the lines of the block, set by its first line
+        self.blockIndent = None
+        self.block = []
+        # The block this one is an elif or else of
+        self.owner = owner
+        # Set once the block ended, while an elif or else may still follow
+        self.ended = False
+
+class BlockBuilder():
+    ''' Builds the structs of the logical lines of a file in one pass,
+        parsing every line once. The blocks still open are kept in an
+        offside-rule stack, innermost last.
+    '''
+    def __init__(self, filename='', debug=False):
+        self.filename = filename
         self.debug = debug
+        self.parser = Parser(debug=debug)
+        self.stack = []
+        self.structs = []
+
+    def build(self, lines):
+        ''' Return the structs of logical lines given as (lineNumber, line) '''
+        number = 0
+        try:
+            for number, line in lines:
+                tokenized = self.parser.parse(line, filename=self.filename, no=number, debug=self.debug)
+                if not self.closeBlocks(tokenized):
+                    self.addLine(tokenized)
+            # The end of the file closes every block
+            self.closeBlocks(self.parser.parse('', filename=self.filename, no=number, debug=self.debug))
+        except SyntaxError:
+            # Already shown by the parser
+            raise
+        except Exception as e:
+            self.parser.showError(e)
+        return self.structs
+
+    def closeBlocks(self, tokenized):
+        ''' Close the blocks the line is out of. Return True if the line
+            was taken as an elif or else, or skipped as a comment
+            between a block and its elif or else.
+        '''
+        indent = tokenized[0].indent
+        while self.stack:
+            top = self.stack[-1]
+            if top.ended:
+                if len(tokenized) == 2 and tokenized[1].kind == COMMENT:
+                    return True
+                if len(tokenized) > 1 and indent == top.indent \
+                        and tokenized[1].kind in (ELIF_STATEMENT, ELSE_STATEMENT):
+                    self.parser.trace('In a block', center=True)
+                    self.stack.append(OpenBlock(tokenized, owner=top))
+                    return True
+                self.stack.pop()
+                self.addStruct(self.parser.assembly(top.tokenized))
+            elif indent == top.blockIndent:
+                return False
+            elif top.blockIndent is None and indent > top.indent:
+                top.blockIndent = indent
+                return False
+            else:
+                self.parser.trace('Out of a block', center=True)
+                if top.owner is None:
+                    top.tokenized = self.parser.assembly(top.tokenized, block=top.block)
+                    top.ended = True
+                else:
+                    self.stack.pop()
+                    modifier = self.parser.assembly(top.tokenized, block=top.block)
+                    top.owner.tokenized = self.parser.assembly(top.owner.tokenized, modifier=modifier)
+        return False
+
+    def addLine(self, tokenized):
+        ''' Add a line to the innermost open block or to the structs '''
+        if tokenized[-1].kind == BEGIN_BLOCK:
+            self.parser.trace('In a block', center=True)
+            self.stack.append(OpenBlock(tokenized))
+        else:
+            self.addStruct(self.parser.assembly(tokenized))
+
+    def addStruct(self, struct):
+        if self.stack:
+            self.stack[-1].block.append(struct)
+        else:
+            self.structs.append(struct)
+
+def parseLines(lines, filename='', debug=False):
+    ''' Return the structs of logical lines given as (lineNumber, line) '''
+    return BlockBuilder(filename=filename, debug=debug).build(lines)
+
+def topLevelBlocks(lines):
+    ''' Split logical lines given as (lineNumber, line) into the
+        top level blocks of the file. Comments and elif or else
+        stay with the block before them.
+    '''
+    blocks = []
+    for number, line in lines:
+        if blocks and continuesBlock.match(line):
+            blocks[-1].append((number, line))
+        else:
+            blocks.append([(number, line)])
+    return blocks
+
+def parseParallel(lines, filename='', debug=False):
+    ''' Return the structs of logical lines given as (lineNumber, line),
+        parsing batches of top level blocks in worker processes
+    '''
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(lines) < PARALLEL_LINES:
+        return parseLines(lines, filename=filename, debug=debug)
+    # A few batches per worker, so a slow one doesn't keep the rest waiting
+    batchSize = len(lines) // (workers * 4) + 1
+    batches = [[]]
+    for block in topLevelBlocks(lines):
+        if len(batches[-1]) >= batchSize:
+            batches.append([])
+        batches[-1].extend(block)
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(parseLines, batches, repeat(filename), repeat(debug))
+        return [struct for structs in results for struct in structs]
+
+class Interpreter(Reader):
+    def __init__(self, filename='', lang='c', platform=sys.platform, framework='', module=False, standardLibs='', debug=False, transpileOnly=False):
+        super().__init__(filename=filename, debug=debug)
         if lang == 'c':
             from transpilers.cTranspiler import Transpiler
         elif lang in {'py', 'python'}:
@@ -30,20 +277,19 @@ class Interpreter():
         else:
             print(f'Invalid language {lang}')
             sys.exit()
-        self.filename = filename
+        # Key of the parse cache entry of the file, None when not cached
+        self.cacheKey = None
         if filename:
             self.engine = Transpiler(filename=filename, platform=platform, framework=framework, module=module, standardLibs=standardLibs, debug=debug)
             self.input = self.file
             try:
                 # Read utf8 but write as the default on the OS
-                with open(filename,'r',encoding='utf8') as f:
-                    self.source = [line for line in f]
-            except UnicodeDecodeError:
-                with open(filename,'r') as f:
-                    self.source = [line for line in f]
+                self.lines = self.logicalLines(self.sourceEncoding())
             except FileNotFoundError as e:
                 print(f"File not found: can't open file {filename}: {e}")
                 sys.exit()
+            if parseCache.ENABLED and not debug:
+                self.cacheKey = parseCache.cacheKey(filename)
         else:
             try:
                 import readline
@@ -57,121 +303,136 @@ class Interpreter():
             from engines.pyEngine import Engine
             self.engine = Engine(filename=filename, platform=platform, framework=framework, module=module, standardLibs=standardLibs)
             self.input = self.console
+            if not debug:
+                self.lineCache = parseCache.LineCache(parseCache.LINE_CACHE_SIZE)
         self.end = False
-        self.processing = True
         self.transpileOnly = transpileOnly
-        self.lineNumber = 0
 
     def console(self, glyph='>>> '):
         return input(glyph)
 
     def file(self, *args):
-        try:
-            line = self.source.pop(0)
-            self.lineNumber += 1
-            while line.strip() == '':
-                line = self.source.pop(0)
-                self.lineNumber += 1
-            rest = ''
-            count = 1 # checking where is the end of the function call. When it ends, count is 0
-            while line[-2:] in {'(\n',',\n','{\n','[\n'} or rest.lstrip() in  {')\n',']\n','}\n'} and count > 0:
-                line = line.replace('\n','')
-                rest = self.source.pop(0).lstrip()
-                self.lineNumber += 1
-                while rest.strip() == '':
-                    rest = self.source.pop(0)
-                    self.lineNumber += 1
-                if rest.lstrip() in {')\n',']\n','}\n'}:
-                    if ')' in rest:
-                        count -= 1
-                    if line[-1] == ',':
-                        line = line[:-1]
-                    rest = rest.lstrip()
-                line += rest
-            return line
-        except IndexError:
-            if self.processing:
-                return ''
-            else:
-                if not self.transpileOnly:
-                    self.engine.run()
-                    sys.exit()
-                else:
-                    self.engine.write()
-                    self.classes = self.engine.classes
-                    return 'exit'
-    
-    def getBlock(self, indent):
-        ''' Return a list of code corresponding to the indentation level
+        return next(self.lines, '')
+
+    def sourceEncoding(self):
+        ''' Return utf8 if the file is valid utf8, or None
+            to read it with the default encoding of the OS
         '''
-        self.line = self.input('... ')
-        debugFunc('In a block', center=True)
-        blockTokenized = parse(self.line, filename=self.filename,
-                no=self.lineNumber, debug=self.debug)
-        blockIndent = blockTokenized[0]['indent']
-        block = []
-        if blockIndent > indent:
-            struct, nextLine = self.handleTokenized(blockTokenized)
-            block.append(struct)
-            if not nextLine:
-                self.line = self.input('... ')
-            blockTokenized = parse(self.line, filename=self.filename,
-                    no=self.lineNumber, debug=self.debug)
-            while blockTokenized[0]['indent'] == blockIndent:
-                struct, nextLine = self.handleTokenized(blockTokenized)
-                block.append(struct)
-                if not nextLine:
-                    self.line = self.input('... ')
-                blockTokenized = parse(self.line, filename=self.filename,
-                        no=self.lineNumber, debug=self.debug)
-            debugFunc('Out of a block', center=True)
-            return block, blockTokenized
+        decoder = codecs.getincrementaldecoder('utf8')()
+        with open(self.filename, 'rb') as f:
+            try:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    decoder.decode(chunk)
+                decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                return None
+        return 'utf8'
+
+    def logicalLines(self, encoding):
+        ''' Yield the lines of code of the file as they are read,
+            skipping blank lines and joining the lines a call, list or
+            map was split into. self.lineNumber is set to the physical
+            line each one starts on.
+        '''
+        number = 0
+        with open(self.filename, 'r', encoding=encoding) as source:
+            for line in source:
+                number += 1
+                if line.strip() == '':
+                    continue
+                start = number
+                rest = ''
+                count = 1 # checking where is the end of the function call. When it ends, count is 0
+                while line[-2:] in continuations or rest in closings and count > 0:
+                    line = line.replace('\n','')
+                    for rest in source:
+                        number += 1
+                        if not rest.strip() == '':
+                            break
+                    else:
+                        # The file ended in the middle of the line
+                        return
+                    rest = rest.lstrip()
+                    if rest in closings:
+                        if ')' in rest:
+                            count -= 1
+                        if line[-1] == ',':
+                            line = line[:-1]
+                    line += rest
+                self.lineNumber = start
+                yield line
+
+    def finish(self):
+        ''' Run or write the code once the whole file was processed '''
+        if self.debug:
+            print(self.engine.currentScope.stats())
+        if not self.transpileOnly:
+            self.engine.run()
+            if self.debug:
+                print(self.engine.renders())
+                print(fold.report())
+                print(inline.report())
+                print(shake.report())
+                print(licm.report())
+                print(bounds.report())
+            sys.exit()
         else:
-            debugFunc('Out of a block', center=True)
-            return block, blockTokenized
-            raise SyntaxError(f'Expecting an indented block here.\nLine: {self.line}')
+            self.engine.write()
+            if self.debug:
+                print(self.engine.renders())
+                print(fold.report())
+                print(inline.report())
+                print(shake.report())
+                print(licm.report())
+                print(bounds.report())
+            self.classes = self.engine.classes
+            return 'exit'
 
-    def handleBlock(self, tokenized):
-        ''' Return a struct with a block and possibly modifiers '''
-        indent = tokenized[0]['indent']
-        block, nextTokenized = self.getBlock(indent)
-        tokenized = assembly(tokenized, block=block)
-        if len(nextTokenized) > 1:
-            while nextTokenized[1]['token'] in {'elifStatement','elseStatement'} and nextTokenized[0]['indent'] == indent:
-                block, afterTokenized = self.getBlock(indent)
-                nextTokenized = assembly(nextTokenized, block=block)
-                tokenized = assembly(tokenized, modifier=nextTokenized)
-                nextTokenized = afterTokenized
-                if len(nextTokenized) == 1:
-                    break
-        struct = assembly(tokenized)
-        return struct
+    def runCached(self):
+        ''' Process the structs cached for this file, if there are any.
+            Return False on a cache miss.
+        '''
+        structs = parseCache.load(self.cacheKey)
+        if structs is None:
+            return False
+        self.processAll(structs)
+        return True
 
-    def handleTokenized(self, tokenized):
-        ''' Return a struct to be processed by the VM '''
-        ''' And if there is a line to be processed in the buffer (self.line) '''
-        if tokenized[-1]['token'] == 'beginBlock':
-            struct = self.handleBlock(tokenized)
-            return struct, True
+    def runFile(self):
+        ''' Build the structs of the whole file, then process them '''
+        if PARALLEL:
+            lines = [(self.lineNumber, line) for line in self.lines]
+            structs = parseParallel(lines, filename=self.filename, debug=self.debug)
         else:
-            struct = assembly(tokenized)
-            return struct, False
+            lines = ((self.lineNumber, line) for line in self.lines)
+            structs = parseLines(lines, filename=self.filename, debug=self.debug)
+        if self.cacheKey is not None:
+            parseCache.save(self.cacheKey, [parseCache.freeze(struct) for struct in structs])
+        self.processAll(structs)
+
+    def processAll(self, structs):
+        ''' Process the structs of the whole file and finish '''
+        self.engine.scanBindings(structs)
+        for struct in structs:
+            self.engine.process(struct)
+        self.finish()
 
     def run(self):
+        if self.cacheKey is not None and self.runCached():
+            return
+        if self.filename:
+            return self.runFile()
         nextLine = False
         while True:
             if not nextLine or self.line == '':
                 self.line = self.input('>>> ')
-            self.processing = True
             if self.line == 'exit':
                 break
             try:
-                tokenized = parse(self.line, filename=self.filename, no=self.lineNumber, debug=self.debug)
-                struct, nextLine = self.handleTokenized(tokenized)
+                struct, nextLine = self.handleTokenized(self.parseLine())
             except Exception as e:
-                showError(e)
+                self.parser.showError(e)
             self.engine.process(struct)
-            self.processing = False
 
 if __name__ == "__main__":
     try:
@@ -1,36 +1,225 @@
+from collections.abc import MutableMapping
 from copy import deepcopy
+from grammar import generatedGrammar as grammar
 import photonParser as parser
 
+# Token kinds are interned as small integers. The matcher and the
+# reduction engine compare kind codes, as do the reducers, t['token'] still
+# gives the kind name.
+# The kinds of the grammar come first, with the codes its tables use.
+kindNames = list(grammar.kinds)
+kindCodes = {name: code for code, name in enumerate(kindNames)}
+
+def kindCode(name):
+    ''' Return the code of a token kind, interning new kinds '''
+    code = kindCodes.get(name)
+    if code is None:
+        code = kindCodes[name] = len(kindNames)
+        kindNames.append(name)
+    return code
+
+# Codes of the kinds the reducers and the engine compare
+ARGS, ARRAY, ASSIGN, BEGIN_BLOCK = (kindCode(kind) for kind in
+    ('args', 'array', 'assign', 'beginBlock'))
+CALL, CAST, CLASS, CLASS_STATEMENT = (kindCode(kind) for kind in
+    ('call', 'cast', 'class', 'classStatement'))
+COMMA, COMMENT, DEF_STATEMENT, DOT = (kindCode(kind) for kind in
+    ('comma', 'comment', 'defStatement', 'dot'))
+DOT_ACCESS, DOUBLE_QUOTE, ELIF_STATEMENT, ELSE_STATEMENT = (kindCode(kind) for kind in
+    ('dotAccess', 'doubleQuote', 'elifStatement', 'elseStatement'))
+EQUAL, EXPR, FLOAT_NUMBER, FOR = (kindCode(kind) for kind in
+    ('equal', 'expr', 'floatNumber', 'for'))
+FOR_TARGET, FUNC, GROUP, HASHTAG = (kindCode(kind) for kind in
+    ('forTarget', 'func', 'group', 'hashtag'))
+IMPORT, INDENT, INPUT_FUNC, KEY_VAL = (kindCode(kind) for kind in
+    ('import', 'indent', 'inputFunc', 'keyVal'))
+KEY_VALS, KWARGS, LBRACE, LBRACKET = (kindCode(kind) for kind in
+    ('keyVals', 'kwargs', 'lbrace', 'lbracket'))
+LPAREN, MAP, NATIVE_STATEMENT, NUM = (kindCode(kind) for kind in
+    ('lparen', 'map', 'nativeStatement', 'num'))
+OPEN_FUNC, OPERATOR, RBRACE, RBRACKET = (kindCode(kind) for kind in
+    ('openFunc', 'operator', 'rbrace', 'rbracket'))
+RETURN, RETURN_STATEMENT, RPAREN, SINGLE_QUOTE = (kindCode(kind) for kind in
+    ('return', 'returnStatement', 'rparen', 'singleQuote'))
+SPACE, SPECIAL, TYPE, VAR = (kindCode(kind) for kind in
+    ('space', 'special', 'type', 'var'))
+WHILE = kindCode('while')
+
+# Fields most tokens have get a slot, any other field goes to extra.
+# Slots a token doesn't have hold unset.
+slotFields = ('type', 'name', 'value', 'args', 'ops', 'opcode', 'symbol', 'operator',
+    'expr', 'target', 'kwargs', 'expressions', 'dotAccess', 'indexAccess', 'indent')
+slotSet = frozenset(slotFields)
+unset = object()
+
+class Token(MutableMapping):
+    ''' Compact token with an interned kind code and slots for the
+        usual fields. It works as the dict tokens it replaces, with
+        the kind under the 'token' key. New tokens come from newToken.
+    '''
+    __slots__ = ('kind', 'extra') + slotFields
+
+    def __new__(cls, token, **fields):
+        return newToken(token, **fields)
+
+    @classmethod
+    def fromDict(cls, fields):
+        ''' Return a Token with the fields of a dict token '''
+        fields = dict(fields)
+        return newToken(fields.pop('token'), **fields)
+
+    def __getitem__(self, key):
+        if key == 'token':
+            return kindNames[self.kind]
+        if key in slotSet:
+            value = getattr(self, key)
+            if value is unset:
+                raise KeyError(key)
+            return value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'token':
+            self.kind = kindCode(value)
+        elif key in slotSet:
+            setattr(self, key, value)
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in slotSet and getattr(self, key) is not unset:
+            setattr(self, key, unset)
+        elif key not in slotSet and self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key == 'token':
+            return True
+        if key in slotSet:
+            return getattr(self, key) is not unset
+        return self.extra is not None and key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        yield 'token'
+        for key in slotFields:
+            if getattr(self, key) is not unset:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def copy(self):
+        token = newObject(Token)
+        token.kind = self.kind
+        token.type = self.type
+        token.name = self.name
+        token.value = self.value
+        token.args = self.args
+        token.ops = self.ops
+        token.opcode = self.opcode
+        token.symbol = self.symbol
+        token.operator = self.operator
+        token.expr = self.expr
+        token.target = self.target
+        token.kwargs = self.kwargs
+        token.expressions = self.expressions
+        token.dotAccess = self.dotAccess
+        token.indexAccess = self.indexAccess
+        token.indent = self.indent
+        token.extra = dict(self.extra) if self.extra else None
+        return token
+
+    def __deepcopy__(self, memo):
+        token = newObject(Token)
+        memo[id(self)] = token
+        token.kind = self.kind
+        token.extra = deepcopy(self.extra, memo) if self.extra else None
+        for key in slotFields:
+            value = getattr(self, key)
+            setattr(token, key, value if value is unset else deepcopy(value, memo))
+        return token
+
+    def __reduce__(self):
+        # Kind codes depend on the order kinds were interned, so
+        # pickles keep the kind name
+        return (Token.fromDict, (dict(self),))
+
+newObject = object.__new__
+
+def newToken(token, type=unset, name=unset, value=unset, args=unset,
+        ops=unset, opcode=unset, symbol=unset, operator=unset, expr=unset,
+        target=unset, kwargs=unset, expressions=unset, dotAccess=unset,
+        indexAccess=unset, indent=unset, **extra):
+    ''' Return a Token, as Token(...) does. Calling a function
+        costs less than calling a class, so the parser uses this
+    '''
+    new = newObject(Token)
+    kind = kindCodes.get(token)
+    new.kind = kindCode(token) if kind is None else kind
+    new.type = type
+    new.name = name
+    new.value = value
+    new.args = args
+    new.ops = ops
+    new.opcode = opcode
+    new.symbol = symbol
+    new.operator = operator
+    new.expr = expr
+    new.target = target
+    new.kwargs = kwargs
+    new.expressions = expressions
+    new.dotAccess = dotAccess
+    new.indexAccess = indexAccess
+    new.indent = indent
+    new.extra = extra or None
+    return new
+
 def inference(value):
     ''' Return the token and infer its properties '''
 
-    try:
-        float(value)
-        return {'token':'num', 'value': value, 'type':'int'}
-    except:
+    # Only words starting with a digit, inf or nan can be numbers
+    if value[0].isdecimal() or value.lower() in {'inf', 'infinity', 'nan'}:
         try:
-            float(value[0])
-            return {'token':'special','type':'unknown','value':value}
-        except:
-            if value == 'True' or value == 'False':
-                return {'token':'expr','type':'bool','args': [{'token':'bool', 'type':'bool','value':value.lower()}], 'ops':[] }
-            elif value == 'null':
-                return {'token':'expr','type':'null','args': [{'token':'null', 'type':'null','value':'null'}], 'ops':[] }
-            else:
-                return {'token':'var', 'type':'unknown', 'name':value}
+            float(value)
+            return newToken('num', value=value, type='int')
+        except ValueError:
+            return newToken('special', type='unknown', value=value)
+    if value == 'True' or value == 'False':
+        return newToken('expr', type='bool', args=[newToken('bool', type='bool', value=value.lower())], ops=[])
+    elif value == 'null':
+        return newToken('expr', type='null', args=[newToken('null', type='null', value='null')], ops=[])
+    else:
+        return newToken('var', type='unknown', name=value)
 
 def comment(i, t):
     ''' Remove comment from token list '''
     for n, token in enumerate(t):
-        if token['token'] in {'singleQuote', 'doubleQuote'}:
+        if token.kind in (SINGLE_QUOTE, DOUBLE_QUOTE):
             if n < i:
                 # It is part of a string
                 return 'continue'
-        if token['token'] == 'hashtag':
+        if token.kind == HASHTAG:
             # remove all tokens after the hashtag
             if n == 1:
                 # It's a line of comments
-                t[n]['token'] = 'comment'
+                t[n].kind = COMMENT
                 return t[:n+1]
             # There is code and comment. Ignore the comment for now
             return t[:n]
@@ -38,11 +227,11 @@ def comment(i, t):
 def operator(i, t):
     ''' Combine operators that are compatible '''
 
-    op1 = t[i]['operator'] if 'operator' in t[i] else t[i]['symbol']
-    op2 = t[i+1]['operator'] if 'operator' in t[i+1] else t[i+1]['symbol']
+    op1 = t[i].operator if t[i].operator is not unset else t[i].symbol
+    op2 = t[i+1].operator if t[i+1].operator is not unset else t[i+1].symbol
     op = op1 + op2
     if op in {'**', '==', '>=', '<=','<<','>>','!='}:
-        t[i] = {'token':'operator','operator':op}
+        t[i] = newToken('operator', operator=op)
     #elif op in {'+=','-=','*=','/='}:
     #    t[i] = {'token':'augEqual','symbol':op}
     else:
@@ -55,15 +244,15 @@ def string(i, t):
     
     # Maybe there is a doubleQuote before, verify
     for n,token in enumerate(t):
-        if token['token'] in {'singleQuote','doubleQuote'}:
+        if token.kind in (SINGLE_QUOTE, DOUBLE_QUOTE):
             i = n
             break
-    if t[i]['token'] == 'singleQuote':
+    if t[i].kind == SINGLE_QUOTE:
         quote = "'"
-        stringQuote = 'singleQuote'
+        stringQuote = SINGLE_QUOTE
     else:
         quote = '"'
-        stringQuote = 'doubleQuote'
+        stringQuote = DOUBLE_QUOTE
     s = ''
     n = 1
     expressions = []
@@ -76,17 +265,17 @@ def string(i, t):
                 inExpr = False
                 expressions.append(deepcopy(expression))
                 expression = []
-            elif not token['token'] == 'space':
+            elif not token.kind == SPACE:
                 expression.append(token)
-        elif token['token'] == stringQuote:
+        elif token.kind == stringQuote:
             break
         elif 'singleQuote' in token:
             s += '"\'"'
         elif 'doubleQuote' in token:
             s += "'\"'"
-        elif token['token'] == 'var':
+        elif token.kind == VAR:
             s += token['name']
-        elif token['token'] in ['num','special']:
+        elif token.kind in (NUM, SPECIAL):
             s += str(token['value'])
         elif 'operator' in token:
             s += token['operator']
@@ -96,7 +285,7 @@ def string(i, t):
                 s += '{'
             else:
                 s += token['symbol']
-        elif token['token'] == 'type':
+        elif token.kind == TYPE:
             s += token['type']
         elif 'Statement' in token['token']:
             s += token['token'].replace('Statement', '')
@@ -106,24 +295,28 @@ def string(i, t):
 
     processedExpressions = []
     for expression in expressions:
-        # process expression. Add a dummy token for index compatibility
-        expression = parser.reduceToken([{'token':'indent'}]+expression)[1:][0]
-        # verify if it's an expression
-        if not expression['token'] == 'expr':
-            raise SyntaxError(f'Expected expression in format string, but got {expression[0]["token"]} instead')
-        else:
-            processedExpressions.append(expression)
-
-    t[i] = {
-        'token':'expr',
-        'type':'str',
-        'args':[{'token':'str',
-        'type':'str','value':f'{quote}{s}{quote}','expressions':processedExpressions}],
-        'ops':[]
-    }
+        processedExpressions.append(reduceFormatExpression(expression))
+
+    t[i] = newToken('expr',
+        type='str',
+        args=[newToken('str',
+            type='str',
+            value=f'{quote}{s}{quote}',
+            expressions=processedExpressions)],
+        ops=[])
     for _ in range(n):
         del t[i+1]
-    return t
+    # The string may start before the matched pattern
+    return t, (i, i+n+1)
+
+def reduceFormatExpression(expression):
+    ''' Return the expr token of the tokens inside a format string '''
+    # Add a dummy token for index compatibility
+    expression = parser.reduceToken([newToken('indent')]+expression)[1:][0]
+    # verify if it's an expression
+    if not expression.kind == EXPR:
+        raise SyntaxError(f'Expected expression in format string, but got {expression["token"]} instead')
+    return expression
 
 def var(i, t):
     return t
@@ -134,26 +327,26 @@ def arrayType(i, t):
     (var type) lbracket num rbracket var -> array
     (var type) lbracket rbracket var -> array
     '''
-    if t[i]['token'] in ['var', 'expr']:
-        if i > 0 and t[i-1]['token'] == 'dot':
+    if t[i].kind in (VAR, EXPR):
+        if i > 0 and t[i-1].kind == DOT:
             # Not ready yet
             return 'continue'
-    if t[i]['token'] == 'var':
+    if t[i].kind == VAR:
         elementType = t[i]['name']
-    elif t[i]['token'] == 'type':
+    elif t[i].kind == TYPE:
         elementType = t[i]['type']
-    elif t[i]['token'] == 'expr':
+    elif t[i].kind == EXPR:
         elementType = t[i]['args'][0]
     else:
         raise SyntaxError('Array type tok {t[i]["token"} not implemented.')
 
-    if t[i+2]['token'] == 'num':
+    if t[i+2].kind == NUM:
         arraySize = t[i+2]['value']
         del t[i+1] #num
     else:
         arraySize = 'unknown'
 
-    t[i] = {'token':'type', 'type':'array', 'elementType':elementType, 'size':arraySize}
+    t[i] = newToken('type', type='array', elementType=elementType, size=arraySize)
 
     del t[i+1] #lbracket
     del t[i+1] #rbracket
@@ -164,9 +357,9 @@ def inMap(i, t):
     # If there is an open brace, then it is a keyVal and not a mapType
     braceLevel = 0
     for i in range(i):
-        if t[i]['token'] == 'lbrace':
+        if t[i].kind == LBRACE:
             braceLevel += 1
-        elif t[i]['token'] == 'rbrace':
+        elif t[i].kind == RBRACE:
             braceLevel -= 1
     if braceLevel > 0:
         return True
@@ -180,21 +373,21 @@ def mapType(i, t):
     # Verify if it's a valid type token
     if inMap(i, t):
         return 'continue'
-    if t[i]['token'] == 'var':
+    if t[i].kind == VAR:
         keyType = t[i]['name']
-    elif t[i]['token'] == 'type':
+    elif t[i].kind == TYPE:
         keyType = t[i]['type']
     else:
         raise SyntaxError('Map key type tok {t[i]["token"} not implemented.')
 
-    if t[i+2]['token'] == 'var':
+    if t[i+2].kind == VAR:
         valType = t[i+2]['name']
-    elif t[i+2]['token'] == 'type':
+    elif t[i+2].kind == TYPE:
         valType = t[i+2]['type']
     else:
         raise SyntaxError('Map val type tok {t[i]["token"} not implemented.')
 
-    t[i] = {'token':'type', 'type':'map', 'keyType':keyType, 'valType':valType, 'size':'unknown'}
+    t[i] = newToken('type', type='map', keyType=keyType, valType=valType, size='unknown')
 
     del t[i+1] #beginBlock
     del t[i+1] #var or type
@@ -204,7 +397,7 @@ def keyVal(i, t):
     ''' KeyVal token is used to define map elements '''
     key = t[i]
     val = t[i+2]
-    t[i] = {'token':'keyVal', 'key':key, 'val':val}
+    t[i] = newToken('keyVal', key=key, val=val)
     del t[i+1] # beginBlock
     del t[i+1] # expr
     return t
@@ -213,11 +406,11 @@ def keyVals(i, t):
     ''' keyVal beginBlock keyVal '''
     keyVals = []
     for tok in [t[i], t[i+2]]:
-        if tok['token'] == 'keyVals':
+        if tok.kind == KEY_VALS:
             keyVals += tok['keyVals']
-        elif tok['token'] == 'keyVal':
+        elif tok.kind == KEY_VAL:
             keyVals.append(tok)
-    t[i] = {'token':'keyVals', 'keyVals':keyVals}
+    t[i] = newToken('keyVals', keyVals=keyVals)
     del t[i+1] # beginBlock
     del t[i+1] # keyVal
     return t
@@ -230,29 +423,29 @@ def typeDeclaration(i, t):
     arraySize = ''
     keyType = ''
     valType = ''
-    if t[i]['token'] in {'type', 'var', 'expr'}:
+    if t[i].kind in (TYPE, VAR, EXPR):
         for n, tok in enumerate(t[i:]):
-            if tok['token'] == 'type':
-                if tok['type'] == 'array':
+            if tok.kind == TYPE:
+                if tok.type == 'array':
                     elementType = tok['elementType']
                     arraySize = tok['size']
-                elif tok['type'] == 'map':
+                elif tok.type == 'map':
                     keyType = tok['keyType']
                     valType = tok['valType']
                 else:
-                    varType.append(tok['type'])
-            elif tok['token'] == 'var' and not last == 'var':
-                if not tok['type'] == 'unknown':
-                    varType.append(tok['type'])
-                name = tok['name']
+                    varType.append(tok.type)
+            elif tok.kind == VAR and not last == 'var':
+                if not tok.type == 'unknown':
+                    varType.append(tok.type)
+                name = tok.name
                 last = 'var'
-            elif tok['token'] == 'var' and last == 'var':
+            elif tok.kind == VAR and last == 'var':
                 varType.append(name)
-                name = tok['name']
+                name = tok.name
                 break
-            elif tok['token'] == 'expr':
+            elif tok.kind == EXPR:
                 varType.append(tok)
-            elif not tok['token'] in {'type','var'}:
+            elif not tok.kind in (TYPE, VAR):
                 # subtract to not consume the token
                 n -= 1
                 break
@@ -264,15 +457,15 @@ def typeDeclaration(i, t):
         varType = ' '.join(varType)
     else:
         varType = varType[0]
-    t[i] = {'token':'var', 'name':name, 'type': varType} 
+    t[i] = newToken('var', name=name, type=varType) 
     if elementType:
         # It's an array, include size and elementType
-        t[i]['type'] = 'array'
+        t[i].type = 'array'
         t[i]['size'] = arraySize
         t[i]['elementType'] = elementType
     elif valType:
         # It's a map, include keyType and valType
-        t[i]['type'] = 'map'
+        t[i].type = 'map'
         t[i]['keyType'] = keyType
         t[i]['valType'] = valType
         #TODO: Implement map size hint
@@ -286,50 +479,51 @@ def floatNumber(i, t):
         Return a float number from the given tokenList
     '''
     try:
-        if t[i+2]['token'] == 'dot':
+        if t[i+2].kind == DOT:
             # Its a range token
             return 'continue'
     except IndexError:
         pass
     try:
-        t[i] = {
-            'token':'floatNumber',
-            'type':'float',
-            'value': f"{t[i]['value']}.{t[i+2]['value']}"}
+        t[i] = newToken('floatNumber',
+            type='float',
+            value=f"{t[i]['value']}.{t[i+2]['value']}")
         del t[i+1] #dot
     except:
-        t[i] = {
-            'token':'floatNumber',
-            'type':'float',
-            'value': f"{t[i]['value']}."}
+        t[i] = newToken('floatNumber',
+            type='float',
+            value=f"{t[i]['value']}.")
 
     del t[i+1] #dot or decimal
     return t
 
+# Kinds an expr wraps keeping their type
+exprKinds = {VAR, GROUP, OPEN_FUNC, INPUT_FUNC, CALL, ARRAY, DOT_ACCESS, MAP, CAST}
+
 def convertToExpr(token):
-    if token['token'] in {'num', 'floatNumber'}:
-        if token['token'] == 'num':
+    if token.kind in (NUM, FLOAT_NUMBER):
+        if token.kind == NUM:
             varType = 'int'
         else:
             varType = 'float'
-        return {'token':'expr', 'type':varType, 'args':[token], 'ops':[]}
-    elif token['token'] in {'var','group','openFunc','inputFunc', 'call', 'array', 'dotAccess', 'map', 'cast'}:
-        return {'token':'expr', 'type':token['type'], 'args':[token], 'ops':[]}
+        return newToken('expr', type=varType, args=[token], ops=[])
+    elif token.kind in exprKinds:
+        return newToken('expr', type=token.type, args=[token], ops=[])
     else:
         raise SyntaxError(f'Cant convert token {token} to expr')
 
 def expr(i, t):
-    if t[i]['token'] == 'operator' and t[i-1]['token'] == 'rparen':
+    if t[i].kind == OPERATOR and t[i-1].kind == RPAREN:
         # its part of an expression. Not ready to parse this yet.
         return 'continue'
-    elif len(t[i:]) > 3 and t[i+1]['token'] == 'operator' and t[i+3]['token'] in {'lparen','lbracket'}:
+    elif len(t) - i > 3 and t[i+1].kind == OPERATOR and t[i+3].kind in (LPAREN, LBRACKET):
         # The second argument is probly a function or indexAccess. Not ready to parse
         # this yet.
         return 'continue'
-    elif t[i]['token'] == 'operator':
+    elif t[i].kind == OPERATOR:
         # check if it's ready
         try:
-            if t[i+2]['token'] in {'lparen','lbracket'}:
+            if t[i+2].kind in (LPAREN, LBRACKET):
                 # Second argument is probably a func or indexAccess. Not ready
                 # to parse this yet.
                 return 'continue'
@@ -337,7 +531,7 @@ def expr(i, t):
             # it is the last element on the line, ready to proceed.
             pass
         try:
-            if t[i-1]['token'] in {'rparen','rbracket'}:
+            if t[i-1].kind in (RPAREN, RBRACKET):
                 # First argument is probably a func or indexAccess. Not ready
                 # to parse this yet
                 return 'continue'
@@ -346,28 +540,37 @@ def expr(i, t):
             pass
         # Modifier operator
         t2 = t[i+1].copy()
-        t2['ops'].append(t[i]['operator'])
+        t2.ops.append(t[i].operator)
         t[i] = t2
         del t[i+1] # var or num
-    elif t[i]['token'] == 'group':
+    elif t[i].kind == GROUP:
         t[i] = convertToExpr(t[i])
-    elif len(t[i:]) > 1 and t[i+1]['token'] == 'operator' and t[i+2]['token'] in {'num','var','group','expr'}:
-        args = []
-        ops = []
-        for token in t[i:i+3]:
-            if token['token'] == 'expr':
-                args = args + token['args']
-                ops = ops + token['ops']
-            elif token['token'] in {'floatNumber', 'num','var','group'}:
+    elif len(t) - i > 1 and t[i+1].kind == OPERATOR and t[i+2].kind in (NUM, VAR, GROUP, EXPR):
+        # Extend the operands of a left expression in place, so a chain
+        # of n operators is flattened in linear time
+        if t[i].kind == EXPR:
+            expression = t[i]
+            expression.type = 'unknown'
+            tokens = t[i+1:i+3]
+        else:
+            expression = newToken('expr', type='unknown', args=[], ops=[])
+            tokens = t[i:i+3]
+        args = expression.args
+        ops = expression.ops
+        for token in tokens:
+            if token.kind == EXPR:
+                args.extend(token.args)
+                ops.extend(token.ops)
+            elif token.kind in (FLOAT_NUMBER, NUM, VAR, GROUP):
                 args.append(token)
-            elif token['token'] == 'operator':
-                ops.append(token['operator'])
+            elif token.kind == OPERATOR:
+                ops.append(token.operator)
             else:
                 raise SyntaxError(f'Expression of token {token["token"]} not implemented.')
-        t[i] = {'token':'expr', 'type':'unknown', 'args':args, 'ops':ops}
+        t[i] = expression
         del t[i+1] # operator
         del t[i+1] # var or num
-    elif t[i]['token'] in {'num', 'floatNumber', 'var', 'group', 'dotAccess'}:
+    elif t[i].kind in (NUM, FLOAT_NUMBER, VAR, GROUP, DOT_ACCESS):
         t[i] = convertToExpr(t[i])
     else:
         raise SyntaxError(f'Expression of token {t[i]["token"]} not implemented.')
@@ -376,9 +579,9 @@ def expr(i, t):
 def group(i, t):
     ''' Return a group token
     '''
-    if t[i-1]['token'] in {'operator','returnStatement'} or 'symbol' in t[i-1] or i == 1:
+    if t[i-1].kind in (OPERATOR, RETURN_STATEMENT) or t[i-1].symbol is not unset or i == 1:
         # Its a group
-        t[i] = {'token':'group', 'type':t[i+1]['type'], 'expr':t[i+1]}
+        t[i] = newToken('group', type=t[i+1].type, expr=t[i+1])
         del t[i+1] # expr
         del t[i+1] # rparen
         return t
@@ -390,32 +593,32 @@ def args(i, t):
     ''' Return an args token '''
     args = []
     try:
-        if t[i+3]['token'] in {'equal', 'lparen'}:
+        if t[i+3].kind in (EQUAL, LPAREN):
             # Probably a kwargs token. Not ready to proceed.
             return 'continue'
     except IndexError:
         pass
     for tok in [t[i],t[i+2]]:
-        if tok['token'] == 'args':
-            args += tok['args']
-        elif tok['token'] == 'expr':
+        if tok.kind == ARGS:
+            args += tok.args
+        elif tok.kind == EXPR:
             # Only valid for self.var
-            if 'dotAccess' in tok['args'][0] and len(tok['args'][0]['dotAccess']) == 2:
+            if tok.args[0].dotAccess is not unset and len(tok.args[0].dotAccess) == 2:
                 tok['attribute'] = True
             args.append(tok)
-    t[i] = {'token':'args','args':args}
+    t[i] = newToken('args', args=args)
     del t[i+1] # comma
     del t[i+1] # arg or expr
     return t
 
 def assign2kwarg(tok):
-    if tok['target']['token'] == 'dotAccess':
+    if tok.target.kind == DOT_ACCESS:
         # Only valid for self.var
-        if len(tok['target']['dotAccess']) == 2:
-            varType = tok['target']['type']
-            tok['target'] = tok['target']['dotAccess'][1]
-            tok['target']['attribute'] = True
-            tok['target']['type'] = varType
+        if len(tok.target.dotAccess) == 2:
+            varType = tok.target.type
+            tok.target = tok.target.dotAccess[1]
+            tok.target['attribute'] = True
+            tok.target.type = varType
         else:
             raise SyntaxError('Default class attribute initiation is only valid for immediate class attributes. Ex: self.a.b not valid, but self.a is valid.')
     return tok
@@ -424,11 +627,11 @@ def kwargs(i, t):
     ''' Return a kwargs token, if valid '''
     kwargs = []
     for tok in [t[i],t[i+2]]:
-        if tok['token'] == 'kwargs':
-            kwargs += tok['kwargs']
-        elif tok['token'] == 'assign':
+        if tok.kind == KWARGS:
+            kwargs += tok.kwargs
+        elif tok.kind == ASSIGN:
             kwargs.append(assign2kwarg(tok))
-    t[i] = {'token':'kwargs','kwargs':kwargs}
+    t[i] = newToken('kwargs', kwargs=kwargs)
     del t[i+1] # comma
     del t[i+1] # kwargs or assign
     return t
@@ -436,57 +639,53 @@ def kwargs(i, t):
 def call(i, t):
     ''' Return a call token if valid '''
     # Verify if it is a valid call
-    if not t[i]['args'][0]['token'] in {'var','dotAccess'} or t[i-1]['token'] in {'defStatement','classStatement'}:
+    if not t[i].args[0].kind in (VAR, DOT_ACCESS) or t[i-1].kind in (DEF_STATEMENT, CLASS_STATEMENT):
         # Not a valid call
         return 'continue'
 
     arguments = []
     kwargs = []
-    if t[i+2]['token'] == 'rparen':
+    if t[i+2].kind == RPAREN:
         pass
-    elif t[i+2]['token'] == 'args':
-        arguments = t[i+2]['args']
+    elif t[i+2].kind == ARGS:
+        arguments = t[i+2].args
         del t[i+1] # args
-    elif t[i+2]['token'] == 'expr':
+    elif t[i+2].kind == EXPR:
         arguments = [t[i+2]]
         del t[i+1] # expr
-    elif t[i+2]['token'] == 'assign':
+    elif t[i+2].kind == ASSIGN:
         kwargs = [t[i+2]]
         del t[i+1] # assign
-    elif t[i+2]['token'] == 'kwargs':
-        kwargs = t[i+2]['kwargs']
+    elif t[i+2].kind == KWARGS:
+        kwargs = t[i+2].kwargs
         del t[i+1] # kwargs
     else:
         raise SyntaxError(f'Call with arg {t[i+2]} not supported')
-    if t[i+2]['token'] == 'comma':
-        if t[i+3]['token'] == 'assign':
+    if t[i+2].kind == COMMA:
+        if t[i+3].kind == ASSIGN:
             kwargs += [t[i+3]]
             del t[i+3] # assign
-        elif t[i+3]['token'] == 'kwargs':
-            kwargs += t[i+3]['kwargs']
+        elif t[i+3].kind == KWARGS:
+            kwargs += t[i+3].kwargs
             del t[i+3] # kwargs
         del t[i+2]
 
-    if t[i]['args'][0]['token'] == 'dotAccess':
-        t[i]['args'][0]['dotAccess'][-1] = {
-            'token':'call',
-            'type':t[i]['args'][0]['dotAccess'][-1]['type'],
-            'name':t[i]['args'][0]['dotAccess'][-1],
-            'args':arguments,
-            'kwargs':kwargs,
-        }
+    if t[i].args[0].kind == DOT_ACCESS:
+        t[i].args[0].dotAccess[-1] = newToken('call',
+            type=t[i].args[0].dotAccess[-1].type,
+            name=t[i].args[0].dotAccess[-1],
+            args=arguments,
+            kwargs=kwargs)
     else:
-        if t[i]['args'][0]['name'] == 'print':
+        if t[i].args[0].name == 'print':
             tokenName = 'printFunc'
         else:
             tokenName = 'call'
-        callToken = {
-            'token':tokenName,
-            'type':t[i]['args'][0]['type'],
-            'name':t[i]['args'][0],
-            'args':arguments,
-            'kwargs':kwargs,
-        }
+        callToken = newToken(tokenName,
+            type=t[i].args[0].type,
+            name=t[i].args[0],
+            args=arguments,
+            kwargs=kwargs)
         if tokenName != 'printFunc':
             t[i] = convertToExpr(callToken)
         else:
@@ -498,8 +697,8 @@ def call(i, t):
 def cast(i, t):
     ''' Return a cast token
     '''
-    if t[i+2]['token'] == 'expr':
-        t[i] = convertToExpr({'token':'cast', 'type':t[i]['type'], 'expr':t[i+2]})
+    if t[i+2].kind == EXPR:
+        t[i] = convertToExpr(newToken('cast', type=t[i].type, expr=t[i+2]))
         del t[i+1] # expr
     del t[i+1] # lparen
     del t[i+1] # rparen
@@ -508,13 +707,13 @@ def cast(i, t):
 def inputFunc(i, t):
     ''' Return an inputFunc token
     '''
-    if t[i+2]['token'] == 'rparen':
-        t[i] = convertToExpr({'token':'inputFunc', 'type':'str'})
-    elif t[i+2]['token'] == 'expr':
-        t[i] = convertToExpr({'token':'inputFunc', 'type':'str', 'expr':t[i+2]})
+    if t[i+2].kind == RPAREN:
+        t[i] = convertToExpr(newToken('inputFunc', type='str'))
+    elif t[i+2].kind == EXPR:
+        t[i] = convertToExpr(newToken('inputFunc', type='str', expr=t[i+2]))
         del t[i+1] # expr
     else:
-        t[i] = convertToExpr({'token':'inputFunc', 'type':'str', 'expr':convertToExpr(t[i+2])})
+        t[i] = convertToExpr(newToken('inputFunc', type='str', expr=convertToExpr(t[i+2])))
         del t[i+1] # expr
     del t[i+1] # lparen
     del t[i+1] # rparen
@@ -523,11 +722,11 @@ def inputFunc(i, t):
 def openFunc(i, t):
     ''' Return an openFunc token
     '''
-    if t[i+2]['token'] == 'expr':
-        t[i] = convertToExpr({'token':'openFunc', 'type':'file', 'args':[t[i+2]]})
+    if t[i+2].kind == EXPR:
+        t[i] = convertToExpr(newToken('openFunc', type='file', args=[t[i+2]]))
         del t[i+1] # expr
-    elif t[i+2]['token'] == 'args':
-        t[i] = convertToExpr({'token':'openFunc', 'type':'file', 'args':t[i+2]['args']})
+    elif t[i+2].kind == ARGS:
+        t[i] = convertToExpr(newToken('openFunc', type='file', args=t[i+2]['args']))
         del t[i+1] # expr
     del t[i+1] # lparen
     del t[i+1] # rparen
@@ -536,8 +735,8 @@ def openFunc(i, t):
 def augAssign(i, t):
     ''' expr operator equal expr
     '''
-    if t[i]['args'][0]['token'] in {'var','dotAccess'}:
-        t[i] = {'token':'augAssign', 'target':t[i]['args'][0], 'operator': t[i+1]['operator'], 'expr':t[i+3]}
+    if t[i].args[0].kind in (VAR, DOT_ACCESS):
+        t[i] = newToken('augAssign', target=t[i].args[0], operator=t[i+1].operator, expr=t[i+3])
         del t[i+1] # operator
         del t[i+1] # equal
         del t[i+1] # expr
@@ -551,12 +750,12 @@ def assign(i, t):
     if len(t) > 4 and i == 1:
         # Not parsed the value of the assign yet.
         return 'continue'
-    if len(t) > i+3 and t[i+2]['args'][0]['token'] in {'var', 'dotAccess'} and t[i+3]['token'] == 'lparen':
+    if len(t) > i+3 and t[i+2].args[0].kind in (VAR, DOT_ACCESS) and t[i+3].kind == LPAREN:
         # Incomplete expression parsing
         return 'continue'
         
-    if t[i]['args'][0]['token'] in {'var', 'dotAccess'}:
-        t[i] = {'token':'assign', 'target':t[i]['args'][0], 'expr':t[i+2]}
+    if t[i].args[0].kind in (VAR, DOT_ACCESS):
+        t[i] = newToken('assign', target=t[i].args[0], expr=t[i+2])
         del t[i+1] # equal
         del t[i+1] # expr
         return t
@@ -580,8 +779,9 @@ def ifelif(i, t):
 def rangeExpr(i, t):
     ''' Return a range token '''
 
-    token = {'token':'range', 'from':t[i]}
-    if t[i+4]['token'] == 'dot' and t[i+5]['token'] == 'dot':
+    token = newToken('range')
+    token['from'] = t[i]
+    if t[i+4].kind == DOT and t[i+5].kind == DOT:
         token['step'] = t[i+3]
         token['to'] = t[i+6]
         del t[i+1] # dot
@@ -599,19 +799,19 @@ def forLoop(i, t):
     ''' Check if its a valid for token and return the token if it is '''
     #token will have a block field
     #TODO: include args for key val unpacking
-    t[i]['token'] = 'for'
-    if t[i+1]['token'] == 'expr':
-        if t[i+1]['args'][0]['token'] == 'var':
-            t[i]['vars'] = [t[i+1]['args'][0]]
+    t[i].kind = FOR
+    if t[i+1].kind == EXPR:
+        if t[i+1].args[0].kind == VAR:
+            t[i]['vars'] = [t[i+1].args[0]]
         else:
-            raise SyntaxError("Iteration variable cannot be {t[i+1]['args'][0]['token']}")
-    elif t[i+1]['token'] == 'args':
+            raise SyntaxError("Iteration variable cannot be {t[i+1].args[0]['token']}")
+    elif t[i+1].kind == ARGS:
         t[i]['vars'] = []
-        for expr in t[i+1]['args']:
-            if expr['args'][0]['token'] == 'var':
-                t[i]['vars'].append(expr['args'][0])
+        for expr in t[i+1].args:
+            if expr.args[0].kind == VAR:
+                t[i]['vars'].append(expr.args[0])
             else:
-                raise SyntaxError("Iteration variable cannot be {expr['args'][0]['token']}")
+                raise SyntaxError("Iteration variable cannot be {expr.args[0]['token']}")
     t[i]['iterable'] = t[i+3]
     del t[i+1] # var
     del t[i+1] # in
@@ -621,10 +821,10 @@ def forLoop(i, t):
 
 def forTarget(i, t):
     ''' Check if its a valid for target token and return it if it is '''
-    if not t[i+1]['args'][0]['token'] == 'var':
+    if not t[i+1]['args'][0].kind == VAR:
         # not valid for target
         raise SyntaxError("The token {t[i+1]['args'][0]['token']} is not a valid target token.")
-    t[i]['token'] = 'forTarget'
+    t[i].kind = FOR_TARGET
     t[i]['target'] = t[i+1]
     del t[i+1] # target
     del t[i+1] # beginBlock
@@ -634,7 +834,7 @@ def whileLoop(i, t):
     ''' Create a while token '''
     # token will have a block field
 
-    t[i]['token'] = 'while'
+    t[i].kind = WHILE
     t[i]['expr'] = t[i+1]
     del t[i+1] # expr
     del t[i+1] # beginBlock
@@ -645,39 +845,39 @@ def function(i, t):
     
     # token will have a block field
 
-    if not t[i+1]['args'][0]['token'] == 'var':
+    if not t[i+1].args[0].kind == VAR:
         # Invalid function definition
         return 'continue'
 
-    t[i]['token'] = 'func'
-    t[i]['name'] = t[i+1]['args'][0]['name']
-    t[i]['type'] = t[i+1]['args'][0]['type']
-    t[i]['args'] = []
-    t[i]['kwargs'] = []
-    if t[i+3]['token'] == 'args':
-        t[i]['args'] = t[i+3]['args']
+    t[i].kind = FUNC
+    t[i].name = t[i+1].args[0].name
+    t[i].type = t[i+1].args[0].type
+    t[i].args = []
+    t[i].kwargs = []
+    if t[i+3].kind == ARGS:
+        t[i].args = t[i+3].args
         del t[i+1] # args
-    elif t[i+3]['token'] == 'expr':
-        t[i]['args'] = [t[i+3]]
+    elif t[i+3].kind == EXPR:
+        t[i].args = [t[i+3]]
         del t[i+1] # expr
-    elif t[i+3]['token'] == 'assign':
-        t[i]['kwargs'] = [assign2kwarg(t[i+3])]
+    elif t[i+3].kind == ASSIGN:
+        t[i].kwargs = [assign2kwarg(t[i+3])]
         del t[i+1] # assign
-    elif t[i+3]['token'] == 'kwargs':
-        t[i]['kwargs'] = t[i+3]['kwargs']
+    elif t[i+3].kind == KWARGS:
+        t[i].kwargs = t[i+3].kwargs
         del t[i+1] # kwargs
-    elif t[i+3]['token'] == 'rparen':
+    elif t[i+3].kind == RPAREN:
         # no args no kwargs, but valid definition
         pass
     else:
         raise SyntaxError(f'function arg with token {t[i+3]} not supported.')
-    if t[i+3]['token'] == 'comma':
+    if t[i+3].kind == COMMA:
         del t[i+3]
-        if t[i+3]['token'] == 'assign':
-            t[i]['kwargs'] += [assign2kwarg(t[i+3])]
+        if t[i+3].kind == ASSIGN:
+            t[i].kwargs += [assign2kwarg(t[i+3])]
             del t[i+1] # assign
-        elif t[i+3]['token'] == 'kwargs':
-            t[i]['kwargs'] += t[i+3]['kwargs']
+        elif t[i+3].kind == KWARGS:
+            t[i].kwargs += t[i+3].kwargs
             del t[i+1] # kwargs
     del t[i+1] # var
     del t[i+1] # lparen
@@ -688,10 +888,10 @@ def function(i, t):
 def funcReturn(i, t):
     ''' Return a return token '''
     if i == len(t)-1:
-        t[i]['token'] = 'return'
+        t[i].kind = RETURN
         t[i]['type'] = 'void'
     else:
-        t[i]['token'] = 'return'
+        t[i].kind = RETURN
         t[i]['type'] = t[i+1]['type'],
         t[i]['expr'] = t[i+1]
         del t[i+1] # expr
@@ -699,35 +899,33 @@ def funcReturn(i, t):
 
 def imports(i, t):
     ''' Return an import token if valid '''
-    if t[i]['token'] == 'nativeStatement':
+    if t[i].kind == NATIVE_STATEMENT:
         native = True
         del t[i]
     else:
         native = False
     t[i]['native'] = native
-    t[i]['token'] = 'import'
+    t[i].kind = IMPORT
     t[i]['module'] = t[i+1]
     del t[i+1] # expr
     return t
 
 def fromImport(i, t):
     ''' Return a fromImport token if valid '''
-    if t[i]['token'] == 'nativeStatement':
+    if t[i].kind == NATIVE_STATEMENT:
         native = True
         del t[i]
     else:
         native = False
-    t[i] = {
-        'token':'fromImport',
-        'module':t[i+1],
-        'symbols':[],
-        'native': native,
-    }
-    if t[i+3]['token'] == 'args':
+    t[i] = newToken('fromImport',
+        module=t[i+1],
+        symbols=[],
+        native=native)
+    if t[i+3].kind == ARGS:
         t[i]['symbols'] = t[i+3]['args']
-    elif t[i+3]['token'] == 'expr':
+    elif t[i+3].kind == EXPR:
         t[i]['symbols'] = [t[i+3]]
-    elif t[i+3]['token'] == 'operator':
+    elif t[i+3].kind == OPERATOR:
         if t[i+3]['operator'] == '*':
             t[i]['symbols'] = [t[i+3]]
         else:
@@ -739,34 +937,34 @@ def fromImport(i, t):
 
 def array(i, t):
     ''' Verify if its an array and return an array token if it is '''
-    if t[i-1]['token'] in {'var','expr'}:
+    if t[i-1].kind in (VAR, EXPR):
         # Its an index access
         return 'continue'
     # Its an array
-    if t[i+1]['token'] == 'args':
+    if t[i+1].kind == ARGS:
         elements = t[i+1]['args']
         del t[i+1] # args
-    elif t[i+1]['token'] == 'expr':
+    elif t[i+1].kind == EXPR:
         elements = [t[i+1]]
         del t[i+1] # expr
     else:
         elements = []
-    t[i] = convertToExpr({'token':'array','type':'array','elementType':'unknown',
-        'len':len(elements), 'size':'unknown', 'elements':elements})
+    t[i] = convertToExpr(newToken('array', type='array', elementType='unknown',
+        len=len(elements), size='unknown', elements=elements))
     del t[i+1] # rbracket
     return t
 
 def hashmap(i, t):
     ''' Verify if its a valid hashmap and return a map token if it is '''
     elements = []
-    if t[i+1]['token'] == 'keyVal':
+    if t[i+1].kind == KEY_VAL:
         elements.append(t[i+1])  
         del t[i+1] # keyVal
-    elif t[i+1]['token'] == 'keyVals':
+    elif t[i+1].kind == KEY_VALS:
         elements = t[i+1]['keyVals']
         del t[i+1] # keyVals
-    t[i] = convertToExpr({'token':'map','type':'map','valType':'unknown','keyType':'unknown',
-        'elements':elements, 'size':'unknown'})
+    t[i] = convertToExpr(newToken('map', type='map', valType='unknown', keyType='unknown',
+        elements=elements, size='unknown'))
     del t[i+1] # rbrace
     return t
 
@@ -774,13 +972,13 @@ def indexAccess(i, t):
     ''' Verify if its an indexAccess and return an indexAccess token
         if it is
     '''
-    if not t[i]['args'][-1]['token'] in {'var','dotAccess'}:
+    if not t[i].args[-1].kind in (VAR, DOT_ACCESS):
         # Not a valid indexAccess
         return 'continue'
-    if t[i]['args'][-1]['token'] == 'var':
-        t[i]['args'][-1]['indexAccess'] = t[i+2]
-    elif t[i]['args'][-1]['token'] == 'dotAccess':
-        t[i]['args'][-1]['dotAccess'][-1]['indexAccess'] = t[i+2]
+    if t[i].args[-1].kind == VAR:
+        t[i].args[-1].indexAccess = t[i+2]
+    elif t[i].args[-1].kind == DOT_ACCESS:
+        t[i].args[-1].dotAccess[-1].indexAccess = t[i+2]
     del t[i+1] # lbracket
     del t[i+1] # expr
     del t[i+1] # rbracket
@@ -790,18 +988,18 @@ def classDefinition(i, t):
     ''' Return a class token '''
     # token will have a block field
 
-    if not t[i+1]['args'][0]['token'] == 'var':
+    if not t[i+1]['args'][0].kind == VAR:
         # Invalid function definition
         return 'continue'
 
-    t[i]['token'] = 'class'
+    t[i].kind = CLASS
     t[i]['name'] = t[i+1]['args'][0]['name']
-    if t[i+3]['token'] == 'rparen':
+    if t[i+3].kind == RPAREN:
         t[i]['args'] = []
-    elif t[i+3]['token'] == 'args':
+    elif t[i+3].kind == ARGS:
         t[i]['args'] = t[i+3]['args']
         del t[i+1] # expr or args
-    elif t[i+3]['token'] == 'expr':
+    elif t[i+3].kind == EXPR:
         t[i]['args'] = [t[i+3]]
         del t[i+1] # expr or args
     else:
@@ -817,76 +1015,76 @@ def dotAccess(i, t):
         if it is.
     '''
     varType = 'unknown'
-    if t[i]['token'] == 'dot':
-        if not t[i-1]['token'] in {'dot', 'var', 'dotAccess', 'rparen', 'rbracket'}\
-                and t[i+1]['args'][0]['token'] in {'var', 'dotAccess'}:
+    if t[i].kind == DOT:
+        if not t[i-1].kind in (DOT, VAR, DOT_ACCESS, RPAREN, RBRACKET)\
+                and t[i+1].args[0].kind in (VAR, DOT_ACCESS):
             # Its a self. shorthand notation
-            names = [{'token':'var', 'type':'unknown', 'name':'self'}]
+            names = [newToken('var', type='unknown', name='self')]
             t[i] = convertToExpr(names[0])
             secondToken = t[i+1]
         else:
             # not a valid shorthand for self.
             return 'continue'
     else:
-        if t[i+1]['token'] == 'space':
+        if t[i+1].kind == SPACE:
             # First arg is the type and second is self. shorthand notation
-            names = [{'token':'var', 'type':'unknown', 'name':'self'}]
-            if t[i]['token'] == 'var':
-                varType = t[i]['args'][0]['name']
-            elif t[i]['token'] == 'type':
+            names = [newToken('var', type='unknown', name='self')]
+            if t[i].kind == VAR:
+                varType = t[i].args[0].name
+            elif t[i].kind == TYPE:
                 # type declaration for instance attribute with shorthand notation
-                varType = t[i]['type']
-                t[i+3]['args'][0]['type'] = varType
+                varType = t[i].type
+                t[i+3].args[0].type = varType
                 if varType == 'array':
-                    t[i+3]['args'][0]['elementType'] = t[i]['elementType']
-                    t[i+3]['args'][0]['size'] = t[i]['size']
+                    t[i+3].args[0]['elementType'] = t[i]['elementType']
+                    t[i+3].args[0]['size'] = t[i]['size']
                 elif varType == 'map':
-                    t[i+3]['args'][0]['keyType'] = t[i]['keyType']
-                    t[i+3]['args'][0]['valType'] = t[i]['valType']
-                    t[i+3]['args'][0]['size'] = t[i]['size']
-            elif t[i]['token'] == 'expr':
-                varType = t[i]['args'][0]
+                    t[i+3].args[0]['keyType'] = t[i]['keyType']
+                    t[i+3].args[0]['valType'] = t[i]['valType']
+                    t[i+3].args[0]['size'] = t[i]['size']
+            elif t[i].kind == EXPR:
+                varType = t[i].args[0]
             else:
                 raise SyntaxError(f'Type token {t[i]["token"]} not supported')
             t[i] = convertToExpr(names[0])
             secondToken = t[i+3]
             del t[i+1] # space
 
-        if not t[i]['args'][-1]['token'] in {'var','dotAccess', 'type','call'}\
-            or not t[i+2]['args'][0]['token'] in {'var', 'dotAccess'}:
+        if not t[i].args[-1].kind in (VAR, DOT_ACCESS, TYPE, CALL)\
+            or not t[i+2].args[0].kind in (VAR, DOT_ACCESS):
             # Not a valid dotAccess
             return 'continue'
 
-        if t[i]['args'][-1]['token'] == 'dotAccess':
-            names = t[i]['args'][-1]['dotAccess']
-        elif t[i]['args'][-1]['token'] in {'var','call'}:
-            names = [t[i]['args'][-1]]
+        if t[i].args[-1].kind == DOT_ACCESS:
+            names = t[i].args[-1].dotAccess
+        elif t[i].args[-1].kind in (VAR, CALL):
+            names = [t[i].args[-1]]
 
         secondToken = t[i+2]
         del t[i+1] # dot
 
-    if secondToken['args'][0]['token'] == 'dotAccess':
-        names += secondToken['args'][0]['dotAccess']
-    elif secondToken['args'][0]['token'] in {'var', 'call'}:
-        names += [secondToken['args'][0]]
+    if secondToken.args[0].kind == DOT_ACCESS:
+        names += secondToken.args[0].dotAccess
+    elif secondToken.args[0].kind in (VAR, CALL):
+        names += [secondToken.args[0]]
 
     # Get the args and ops from the previous expr
-    args = deepcopy(t[i]['args'])
-    ops = deepcopy(t[i]['ops'])
+    args = deepcopy(t[i].args)
+    ops = deepcopy(t[i].ops)
     # The last arg is where the junction occurs and it must be converted to a dotAccess token
-    args[-1] = {'token':'dotAccess', 'type':'unknown', 'dotAccess':names}
+    args[-1] = newToken('dotAccess', type='unknown', dotAccess=names)
     # Now join the args from the other expr, removing the first because it was joined
-    args = args + deepcopy(secondToken['args'][1:])
-    ops = ops + deepcopy(secondToken['ops'])
+    args = args + deepcopy(secondToken.args[1:])
+    ops = ops + deepcopy(secondToken.ops)
     # Update the current expression token
-    t[i]['args'] = args
-    t[i]['ops'] = ops
-    t[i]['type'] = varType
-    t[i]['args'][0]['type'] = varType
+    t[i].args = args
+    t[i].ops = ops
+    t[i].type = varType
+    t[i].args[0].type = varType
     del t[i+1] # var or dotAccess
     return t
 
 def delete(i, t):
-    t[i] = {'token':'delete', 'expr':t[i+1]}
+    t[i] = newToken('delete', expr=t[i+1])
     del t[i+1]
     return t
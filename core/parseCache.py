@@ -0,0 +1,128 @@
+# Photon parse cache
+# Keeps the assembled structs of every file run, so a file that didn't
+# change since the last run is not parsed again.
+# Entries are keyed by the file content, the parser sources and the
+# photon version, and the least recently used ones are removed when
+# the cache gets bigger than CACHE_SIZE.
+# The console keeps the structs of the lines typed in a LineCache, so
+# blocks typed again only reduce the lines that changed.
+
+import os
+import pickle
+import pathlib
+from collections import OrderedDict
+from hashlib import sha256
+from version import __version__
+
+ENABLED = True
+CACHE_FOLDER = os.path.join(pathlib.Path.home(), '.photon', 'cache')
+CACHE_SIZE = 64 * 1024 * 1024
+# Lines of the console whose structs are kept in memory
+LINE_CACHE_SIZE = 1024
+
+def parserHash():
+    ''' Return a hash of the sources that decide how a file is parsed '''
+    folder = os.path.dirname(os.path.realpath(__file__))
+    digest = sha256(__version__.encode())
+    sources = ('grammar/generatedGrammar.py', 'lexer.py', 'photonParser.py',
+        'tokenChain.py', 'interpreter.py')
+    for source in sources:
+        with open(os.path.join(folder, source), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+PARSER_HASH = parserHash()
+
+def cacheKey(filename):
+    ''' Return the cache key of the current content of a file '''
+    digest = sha256(PARSER_HASH.encode())
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def freeze(struct):
+    ''' Return the struct serialized as it is now, before the engine
+        gets to change it
+    '''
+    return pickle.dumps(struct, pickle.HIGHEST_PROTOCOL)
+
+def thaw(frozen):
+    ''' Return a new copy of a frozen struct '''
+    return pickle.loads(frozen)
+
+def load(key):
+    ''' Return the structs cached for a key, or None on a miss '''
+    path = os.path.join(CACHE_FOLDER, key)
+    structs = []
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    structs.append(pickle.load(f))
+                except EOFError:
+                    break
+        # Mark the entry as recently used
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Broken entry, parse the file again
+        remove(path)
+        return None
+    return structs
+
+def save(key, frozenStructs):
+    ''' Store the frozen structs of a file and evict old entries '''
+    path = os.path.join(CACHE_FOLDER, key)
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        with open(f'{path}.tmp', 'wb') as f:
+            f.write(b''.join(frozenStructs))
+        os.replace(f'{path}.tmp', path)
+        evict(CACHE_SIZE)
+    except OSError:
+        # The cache is only an optimization, run without it
+        remove(f'{path}.tmp')
+
+def evict(size):
+    ''' Remove the least recently used entries until the cache
+        takes at most size bytes
+    '''
+    entries = []
+    for entry in os.scandir(CACHE_FOLDER):
+        if entry.is_file() and not entry.name.endswith('.tmp'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(entrySize for _, entrySize, _ in entries)
+    for _, entrySize, path in sorted(entries):
+        if total <= size:
+            break
+        remove(path)
+        total -= entrySize
+
+def remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class LineCache():
+    ''' Frozen structs of the lines typed in the console, by line.
+        The least recently used ones are dropped past size entries.
+    '''
+    def __init__(self, size):
+        self.size = size
+        self.structs = OrderedDict()
+
+    def get(self, key):
+        frozen = self.structs.get(key)
+        if frozen is not None:
+            self.structs.move_to_end(key)
+        return frozen
+
+    def put(self, key, frozen):
+        self.structs[key] = frozen
+        self.structs.move_to_end(key)
+        if len(self.structs) > self.size:
+            self.structs.popitem(last=False)
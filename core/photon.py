@@ -7,12 +7,13 @@ from pattern_cli import cli, flags, kwargs, cli_help
 PHOTON_INSTALL_PATH = getattr(sys, '_MEIPASS', os.path.dirname(os.path.realpath(__file__)))
 sys.path.insert(0, PHOTON_INSTALL_PATH)
 
-__version__ = '0.0.10'
+from version import __version__
 
 allowed_kwargs = {
     'lang': ['c', 'd', 'js', 'ts', 'dart', 'haxe', 'python'],
     'platform': ['linux', 'windows', 'mac', 'android', 'web'],
     'framework': ['raylib', 'html5', 'flutter', 'opengl', 'canvas'],
+    'parser': ['trie', 'linear'],
 }
 
 def get_home():
@@ -45,7 +46,7 @@ def set_conf(**kwargs):
                 print(f'Value {val} is not allowed. You can try these: {", ".join(allowed_kwargs[key])}')
         else:
             print(f'Value {key} or {val} is not allowed. You can try these:')
-            print(f'{"\n  ".join([""] + allowed_kwargs)}')
+            print('\n  '.join([''] + list(allowed_kwargs)))
     with open(f'{get_home()}/.photon/photon.conf', 'w') as c:
         json.dump(data, c)
 
@@ -78,13 +79,42 @@ def set_config(**kwargs):
 def run(filename, **kwargs):
     'Run a script'
     from interpreter import Interpreter
+    import parseCache
     DEBUG = '-d' in flags or '--debug' in flags
+    if '--no-cache' in flags:
+        parseCache.ENABLED = False
+    if '--no-fold' in flags:
+        from transpilers import fold
+        fold.ENABLED = False
+    if '--no-inline' in flags:
+        from transpilers import inline
+        inline.ENABLED = False
+    if '--no-shake' in flags:
+        from transpilers import shake
+        shake.ENABLED = False
+    if '--no-licm' in flags:
+        from transpilers import licm
+        licm.ENABLED = False
+    if '--no-bounds' in flags:
+        from transpilers import bounds
+        bounds.ENABLED = False
+    if '--parallel' in flags:
+        # Interpreter's module, not the interpreter command below
+        sys.modules['interpreter'].PARALLEL = True
+    parameters = getParameters()
+    if 'parser' in parameters:
+        import photonParser
+        parser = parameters.pop('parser')
+        if not parser in allowed_kwargs['parser']:
+            print(f'Value {parser} is not allowed. You can try these: {", ".join(allowed_kwargs["parser"])}')
+            sys.exit(1)
+        photonParser.PARSER = parser
     Interpreter(
         filename=filename,
         standardLibs=os.path.join(
             PHOTON_INSTALL_PATH, 'libs'),
         debug=DEBUG,
-        **getParameters()).run()
+        **parameters).run()
 
 @cli('')
 def interpreter():
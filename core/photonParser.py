@@ -3,8 +3,13 @@
 # and also generates the struct of the code.
 # This struct is used by the Engine to execute the code.
 
+import os
 import re
+import threading
+from heapq import heappush, heappop
 from lexer import *
+from grammar import generatedGrammar as grammar
+from tokenChain import TokenChain
 
 statements = ['if','else','elif','def','cdef','for','in','as','return','import','class','while','break','continue','try', 'del', 'native', 'from']
 operators = ['+','-','%','/','*','**','<','>','not', '!', 'and','or','is', '&']
@@ -32,28 +37,142 @@ symbols = {
     '_':'underline'
 }
 
-lineNumber = 0
-currentFilename = ''
-currentLine = ''
-parsePhrase = ''
+# Parser backend, the scan that finds the pattern matches of a line:
+# 'trie' walks the compiled matcher from every position and only scans
+# again from the reduced tokens on. 'linear' tries every pattern at every
+# position and scans the whole line again after each reduction. It is
+# the reference the trie is tested against.
+PARSER = 'trie'
+# Lines with at least this many tokens are reduced in a TokenChain.
+# Shorter lines are cheaper to reduce in a plain list, as their scans
+# are mostly found in the scan cache.
+CHAIN_LENGTH = 50
+# Reduce list and map literals of only constant elements in one pass,
+# instead of merging their elements pair by pair in the general engine.
+FAST_LITERALS = True
 
-DEBUG = False
+# Words and characters that always give the same token.
+# Built in reverse order of precedence, so statements win.
+fixedTokens = {}
+for i in builtins:
+    fixedTokens[i] = newToken(i)
+for i in symbols:
+    fixedTokens[i] = newToken(symbols[i], symbol=i)
+for i in types:
+    fixedTokens[i] = newToken('type', type=i)
+for i in operators:
+    fixedTokens[i] = newToken('operator', operator=i)
+for i in statements:
+    fixedTokens[i] = newToken(i+'Statement')
+# Operators written with two characters. Longer runs of operator
+# characters are left to the operator rule, which combines them
+# in grammar order instead of from left to right.
+scannedOperators = {'**', '==', '>=', '<=', '<<', '>>', '!='}
+# Punctuation and operators are only read and dropped by the reducers,
+# so every line gets the same tokens instead of copies. Hashtags are
+# turned into comments, they are copied.
+sharedTokens = {i: token for i, token in fixedTokens.items()
+    if (token.symbol is not unset and not token.kind == HASHTAG) or token.operator is not unset}
+sharedTokens.update({i: newToken('operator', operator=i) for i in scannedOperators})
 
-def debug(*args, center=False):
-    if DEBUG:
-        if center:
-            consoleWidth = os.get_terminal_size()[0]
-            print(args[0].center(consoleWidth, '-'))
-        else:    
-            print(*args)
+scanner = re.compile(r'''
+    (?P<string>"[^"]*"|'[^']*')
+  | (?P<float>\d+\.\d+(?!\w)|\d+\.(?![ \t]*[\w.]))
+  | (?P<word>\w+)
+  | (?P<operator>[-+%/*<>!&=](?:[ \t]*[-+%/*<>!&=])*)
+  | (?P<space>[ \t\n]+)
+  | (?P<comment>\#)
+  | (?P<symbol>.)
+''', re.VERBOSE | re.DOTALL)
+formatExpression = re.compile(r'\{([^{}]*)\}')
 
-def parse(line, filename='', no=-1, debug=False):
-    global currentLine, lineNumber, currentFilename, DEBUG
-    ''' Return a list of tokens for the given line '''
-    DEBUG = debug
-    lineNumber = no
-    currentFilename = filename
-    currentLine = line
+def scan(line):
+    ''' Return the tokens of a line in a single pass, with whole
+        strings, float numbers and two character operators.
+        Return None if a string is ambiguous, like an unclosed quote.
+    '''
+    indentation = len(line) - len(line.lstrip(' \t'))
+    if indentation == len(line):
+        return [newToken('indent', indent=0)]
+    tokenized = [newToken('indent', indent=indentation)]
+    for match in scanner.finditer(line, indentation):
+        kind = match.lastgroup
+        i = match.group()
+        if kind == 'word':
+            if i in sharedTokens:
+                tokenized.append(sharedTokens[i])
+            elif i in fixedTokens:
+                tokenized.append(fixedTokens[i].copy())
+            else:
+                tokenized.append(inference(i))
+        elif kind == 'space':
+            # A space before a dot is part of the dotAccess grammar
+            if i[-1] == ' ' and line.startswith('.', match.end()) \
+                    and tokenized[-1].kind in (VAR, TYPE, RBRACKET):
+                tokenized.append(newToken('space', symbol=' '))
+        elif kind == 'operator':
+            if i in scannedOperators:
+                tokenized.append(sharedTokens[i])
+            else:
+                for char in i:
+                    if not char in {' ', '\t'}:
+                        tokenized.append(sharedTokens[char])
+        elif kind == 'string':
+            token = scanString(i)
+            if token is None:
+                return None
+            tokenized.append(token)
+        elif kind == 'float':
+            tokenized.append(newToken('floatNumber', type='float', value=i))
+        elif kind == 'comment':
+            if len(tokenized) == 1:
+                # It's a line of comments
+                tokenized.append(newToken('comment', symbol='#'))
+            break
+        elif i in {'"', "'"}:
+            return None
+        elif i in sharedTokens:
+            tokenized.append(sharedTokens[i])
+        elif i in fixedTokens:
+            tokenized.append(fixedTokens[i].copy())
+        else:
+            tokenized.append(inference(i))
+    return tokenized
+
+def scanString(literal):
+    ''' Return the expr token of a string literal, with a {} in its
+        value for every format expression, or None if it is ambiguous
+    '''
+    quote = literal[0]
+    body = literal[1:-1]
+    s = ''
+    expressions = []
+    last = 0
+    for match in formatExpression.finditer(body):
+        text = match.group(1)
+        if '{' in body[last:match.start()] or '#' in text \
+                or '"' in text or "'" in text or '\t' in text:
+            return None
+        expression = scan(text)
+        if expression is None:
+            return None
+        expression = [token for token in expression[1:] if not token.kind == SPACE]
+        if not expression:
+            return None
+        expressions.append(reduceFormatExpression(expression))
+        s += body[last:match.start()] + '{}'
+        last = match.end()
+    if '{' in body[last:]:
+        return None
+    s += body[last:]
+    return newToken('expr', type='str',
+        args=[newToken('str', type='str', value=f'{quote}{s}{quote}', expressions=expressions)],
+        ops=[])
+
+def splitTokens(line):
+    ''' Return the tokens of a line split on every non word character,
+        leaving strings, float numbers and operators to the grammar
+    '''
     tokens = [i for i in re.split(r'(\W)',line) if not i == '' ]
     indentation = 0
     indentationSet = False
@@ -63,36 +182,36 @@ def parse(line, filename='', no=-1, debug=False):
     for n, i in enumerate(tokens):
         if not indentationSet and not (i == ' ' or i == '\t'):
             indentationSet = True
-            tokenized.append({'token':'indent','indent':indentation})
+            tokenized.append(newToken('indent', indent=indentation))
         if (i == ' ' or i == '\t') and not indentationSet:
             indentation += 1
         elif i in statements:
-            tokenized.append({'token':i+'Statement'})
+            tokenized.append(newToken(i+'Statement'))
         elif i in operators:
-            tokenized.append({'token':'operator','operator':i})
+            tokenized.append(newToken('operator', operator=i))
         elif i in types:
-            tokenized.append({'token':'type','type':i})
+            tokenized.append(newToken('type', type=i))
         elif i in symbols:
-            if i == ' ' and tokens[n+1] == '.' and tokenized[-1]['token'] in {'var', 'type', 'rbracket'}:
-                tokenized.append({'token':symbols[i], 'symbol':i})
+            if i == ' ' and tokens[n+1] == '.' and tokenized[-1].kind in (VAR, TYPE, RBRACKET):
+                tokenized.append(newToken(symbols[i], symbol=i))
                 continue
             if i == "'" or i == '"':
                 if not preserveSpace:
                     preserveSpace = True
                     quote = i
                 elif preserveSpace and i == quote:
-                    tokenized.append({'token':symbols[i],'symbol':i})
+                    tokenized.append(newToken(symbols[i], symbol=i))
                     preserveSpace = False
                     quote = ''
             if not i in {'"', "'", ' ','\t','\n'} or (i in {'"',"'",' ','\t','\n'} and preserveSpace):
-                tokenized.append({'token':symbols[i],'symbol':i})
+                tokenized.append(newToken(symbols[i], symbol=i))
         elif i in builtins:
-            tokenized.append({'token':i})
+            tokenized.append(newToken(i))
         else:
             tokenized.append(inference(i))
 
     if tokenized == []:
-        tokenized = [{'token':'indent','indent':0}]
+        tokenized = [newToken('indent', indent=0)]
     return tokenized
 
 def token2word(tokens):
@@ -118,87 +237,442 @@ def token2word(tokens):
         phrase += ' '
     return phrase[:-1]
 
-def reduceToken(tokens):
-    ''' Find patterns that can be reduced to a single token
-        and return the reduced list of tokens
+def linearScan(tokenList, start=0, stop=None):
+    ''' Return the priority and position of every pattern match
+        starting in tokenList[start:stop], by trying each pattern
+        at every position
     '''
-    global parsePhrase
-    def reduce():
-        for pattern in patterns:
-            for i in range(len(tokenList)):
-                if pattern == tuple(tokenList[i:i+len(pattern)]):
-                    debug(pattern)
-                    result = reduceToken(patterns[pattern](i+1,tokens))
-                    if result == 'continue':
-                        continue
-                    else:
-                        return result
-
-    if tokens == 'continue':
-        return 'continue'
-    tokenList = [ token['token'] for token in tokens if not token['token'] == 'indent' ]
-    parsePhrase = token2word(tokens)
-    debug(parsePhrase)
-    reducedTokens = reduce()
-    if reducedTokens:
-        tokens = reducedTokens
-
-    # No patterns were found, reduced to maximum
-    if len(tokens) > 2: #indent reducedToken (beginBlock)
-        if not 'symbol' in tokens[0]:
-            if 'indent' in tokens[0] and not 'symbol' in tokens[1]:
-                showError(f'SyntaxError')
-    return tokens
+    stop = len(tokenList) if stop is None else stop
+    matches = []
+    for priority, pattern in enumerate(patterns):
+        length = patternLengths[priority]
+        for i in range(start, stop):
+            if pattern == tuple(tokenList[i:i+length]):
+                matches.append((priority, i))
+    return matches
 
-def assembly(tokens, block=None, modifier=None):
-    ''' Match the given list of tokens with the corresponding '''
-    ''' grammar and return a struct with its properties '''
-    if not block == None:
-        if not 'block' in tokens[1]:
-            tokens[1]['block'] = block
-            return tokens
+def trieScan(tokenList, start=0, stop=None):
+    ''' Return the priority and position of every pattern match
+        starting in tokenList[start:stop], in the same order as
+        linearScan, walking the compiled matcher once from each position
+    '''
+    matches = []
+    for i in range(start, len(tokenList) if stop is None else stop):
+        node = matcher
+        for kind in tokenList[i:i+maxPatternLength]:
+            node = node.get(kind)
+            if node is None:
+                break
+            if None in node:
+                matches.append((node[None], i))
+    matches.sort()
+    return matches
+
+# Pattern scans by parser backend
+scanners = {'trie': trieScan, 'linear': linearScan}
+
+def readingMatches(kinds, changed, scan):
+    ''' Return the positions whose matches can read the kind at
+        position changed, the ones the walk of the matcher from them
+        gets to, and the matches starting there
+    '''
+    positions = []
+    for i in range(changed):
+        node = matcher
+        for kind in kinds[i:changed]:
+            node = node.get(kind)
+            if node is None:
+                break
+        else:
+            positions.append(i)
+    positions.append(changed)
+    matches = [match for match in scan(kinds, positions[0], changed+1) if match[1] in positions]
+    return positions, matches
+
+# Results of the scans so far, by function, arguments and kinds.
+# Lines repeat the same kinds, and so do the steps of their reductions.
+scanned = {}
+SCANNED_SIZE = 4096
+
+def cached(function, kinds, *args):
+    ''' Return function(kinds, *args), calling it only the first
+        time it gets those kinds and arguments
+    '''
+    key = (function, args, *kinds)
+    result = scanned.get(key)
+    if result is None:
+        if len(scanned) >= SCANNED_SIZE:
+            scanned.clear()
+        result = scanned[key] = function(kinds, *args)
+    return result
+
+def scanLiteral(tokens, i):
+    ''' Return the expr token of the list or map literal opening at
+        position i and the position after it, or None if it has an
+        element that is not a constant
+    '''
+    closing = RBRACKET if tokens[i].kind == LBRACKET else RBRACE
+    elements = []
+    i += 1
+    while i < len(tokens) and not tokens[i].kind == closing:
+        if elements:
+            if not tokens[i].kind == COMMA:
+                return None
+            i += 1
+        if closing == RBRACKET:
+            element, i = scanConstant(tokens, i)
         else:
-            showError('Not expecting an ifBlock here...')
-    elif not modifier == None:
-        if modifier[1]['token'] == 'elifStatement':
-            if not 'elifs' in tokens[1]:
-                tokens[1]['elifs'] = []
-            modifier = assembly(modifier)
-            tokens[1]['elifs'].append({'expr':modifier['expr'], 'elifBlock':modifier['block']})
-            return tokens
-        elif modifier[1]['token'] == 'elseStatement':
-            if not 'else' in tokens[1]:
-                tokens[1]['else'] = modifier[1]['block']
+            key, i = scanConstant(tokens, i)
+            if key is None or i == len(tokens) or not tokens[i].kind == BEGIN_BLOCK:
+                return None
+            value, i = scanConstant(tokens, i+1)
+            element = None if value is None else newToken('keyVal', key=key, val=value)
+        if element is None:
+            return None
+        elements.append(element)
+    if i == len(tokens):
+        return None
+    if closing == RBRACKET:
+        literal = newToken('array', type='array', elementType='unknown',
+            len=len(elements), size='unknown', elements=elements)
+    else:
+        literal = newToken('map', type='map', valType='unknown', keyType='unknown',
+            elements=elements, size='unknown')
+    return convertToExpr(literal), i+1
+
+def scanConstant(tokens, i):
+    ''' Return the expr token of the constant at position i, as the
+        general engine reduces it, and the position after it
+    '''
+    negative = i < len(tokens) and tokens[i].kind == OPERATOR and tokens[i].operator == '-'
+    if negative:
+        i += 1
+    if i == len(tokens):
+        return None, i
+    token = tokens[i]
+    if token.kind in {NUM, FLOAT_NUMBER}:
+        constant = convertToExpr(token)
+        if negative:
+            constant.ops.append('-')
+        return constant, i+1
+    if token.kind == EXPR and not negative:
+        # Out of the scanner these are strings, booleans and null
+        return token, i+1
+    return None, i
+
+def reduceLiterals(tokens):
+    ''' Return the tokens with every list or map literal of only
+        constant elements reduced to its expr token. Literals that are
+        nested or have other elements are left to the general engine.
+    '''
+    if not any([token.kind in (LBRACKET, LBRACE) for token in tokens]):
+        return tokens
+    reduced = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind in {LBRACKET, LBRACE} and reduced and reduced[-1].kind in literalFollows:
+            literal = scanLiteral(tokens, i)
+            if literal is not None:
+                token, i = literal
+                reduced.append(token)
+                continue
+        reduced.append(token)
+        i += 1
+    return reduced
+
+class Parser():
+    ''' Parses lines into tokens and reduces them to structs.
+        It owns the state of the parse in progress, used by showError,
+        so every thread can parse with its own Parser.
+    '''
+    def __init__(self, debug=False):
+        self.debug = debug
+        self.currentLine = ''
+        self.lineNumber = 0
+        self.currentFilename = ''
+        # Tokens of the reduction in progress
+        self.parseTokens = []
+
+    def trace(self, *args, center=False):
+        if self.debug:
+            if center:
+                consoleWidth = os.get_terminal_size()[0]
+                print(args[0].center(consoleWidth, '-'))
+            else:
+                print(*args)
+
+    def parse(self, line, filename='', no=-1, debug=False):
+        ''' Return a list of tokens for the given line '''
+        self.debug = debug
+        self.lineNumber = no
+        self.currentFilename = filename
+        self.currentLine = line
+        tokenized = scan(line)
+        if tokenized is None:
+            # Leave the strings of this line to the grammar
+            tokenized = splitTokens(line)
+        return tokenized
+
+    def applyReducer(self, priority, i, tokens):
+        ''' Call the reducer of a pattern matched at position i.
+            Return the reduced tokens and the position where the
+            reduction left its token, or 'continue' if it was refused
+        '''
+        if self.debug:
+            self.trace(tuple(kindNames[kind] for kind in patterns[priority]))
+        result = reducers[priority](i, tokens)
+        if isinstance(result, tuple):
+            # The reducer reported the span it consumed
+            result, (i, end) = result
+        if result == 'continue':
+            return 'continue'
+        return result, i
+
+    def rescanReduce(self, tokens, scan):
+        ''' Reduce the tokens by scanning the whole line for matches,
+            starting over from the first pattern after each reduction
+        '''
+        while True:
+            self.parseTokens = tokens
+            if self.debug:
+                self.trace(token2word(tokens))
+            kinds = [token.kind for token in tokens]
+            for priority, i in scan(kinds):
+                result = self.applyReducer(priority, i, tokens)
+                if not result == 'continue':
+                    tokens = result[0]
+                    break
+            else:
+                return tokens
+
+    def scanReduce(self, tokens, scan):
+        ''' Reduce the tokens applying the first match by (priority, position)
+            after each reduction, like rescanReduce. The line is only scanned
+            again from a pattern length before the reduction, the matches
+            before that are kept.
+        '''
+        # No pattern starts with the indent of the line
+        kinds = [token.kind for token in tokens]
+        matches = cached(scan, kinds, 1 if kinds[0] == INDENT else 0)
+        while True:
+            self.parseTokens = tokens
+            if self.debug:
+                self.trace(token2word(tokens))
+            for priority, i in matches:
+                result = self.applyReducer(priority, i, tokens)
+                if not result == 'continue':
+                    tokens = result[0]
+                    break
+            else:
+                return tokens
+            # Matches only read kinds. The ones starting a pattern length
+            # before the reduction end before it, so while the kinds there
+            # are the same they are kept. When the kinds after the match are
+            # the same too, their matches only moved.
+            reduced = [token.kind for token in tokens]
+            first = i - maxPatternLength + 1
+            if first > 0 and kinds[:i] == reduced[:i]:
+                end = i + patternLengths[priority]
+                moved = len(reduced) - len(kinds)
+                if end + moved >= i and kinds[end:] == reduced[end+moved:]:
+                    matches = ([match for match in matches if match[1] < first]
+                        + scan(reduced, first, end + moved)
+                        + [(match[0], match[1] + moved) for match in matches if match[1] >= end])
+                else:
+                    matches = [match for match in matches if match[1] < first] + scan(reduced, first)
+                matches.sort()
+            else:
+                matches = cached(scan, reduced, 1 if reduced[0] == INDENT else 0)
+            kinds = reduced
+
+    def chainReduce(self, tokens, scan):
+        ''' Reduce the tokens in a TokenChain, keeping the matches of
+            every position in a heap ordered by (priority, position).
+            After a reduction only the positions whose matches can read
+            the changed token are scanned again.
+        '''
+        def restart(tokens):
+            nonlocal chain, heap, stamps
+            chain = self.parseTokens = TokenChain(tokens)
+            heap = []
+            stamps = [0] * len(chain)
+            kinds = [token.kind for token in chain]
+            for priority, i in scan(kinds):
+                heappush(heap, (priority, i, 0))
+
+        def rescan(changed):
+            # Tokens before the changed one are untouched and the ones
+            # after it only moved, so only matches reading it can differ
+            first = max(changed - maxPatternLength + 1, 0)
+            kinds = [token.kind for token in chain[first:changed+maxPatternLength]]
+            slots = chain.slotsOf(first, changed+1)
+            positions, matches = cached(readingMatches, kinds, changed - first, scan)
+            for i in positions:
+                stamps[slots[i]] += 1
+            for priority, i in matches:
+                heappush(heap, (priority, slots[i], stamps[slots[i]]))
+
+        def forget():
+            for slot in chain.popDeleted():
+                stamps[slot] = -1
+
+        chain = heap = stamps = None
+        restart(tokens)
+        while True:
+            if self.debug:
+                self.trace(token2word(chain))
+            refused = []
+            while heap:
+                entry = heappop(heap)
+                priority, slot, stamp = entry
+                if not stamps[slot] == stamp:
+                    # Deleted or scanned again since it was pushed
+                    continue
+                i = chain.position(slot)
+                result = self.applyReducer(priority, i, chain)
+                if result == 'continue':
+                    refused.append(entry)
+                    if chain.deleted:
+                        # It changed the tokens before refusing
+                        forget()
+                        rescan(i)
+                    continue
+                result, i = result
+                if not result is chain:
+                    restart(result)
+                else:
+                    forget()
+                    rescan(i)
+                    for entry in refused:
+                        heappush(heap, entry)
+                break
+            else:
+                return list(chain)
+
+    def reduceToken(self, tokens):
+        ''' Find patterns that can be reduced to a single token
+            and return the reduced list of tokens
+        '''
+        if tokens == 'continue':
+            return 'continue'
+        if FAST_LITERALS:
+            tokens = reduceLiterals(tokens)
+        if PARSER == 'linear':
+            tokens = self.rescanReduce(tokens, linearScan)
+        elif len(tokens) < CHAIN_LENGTH:
+            tokens = self.scanReduce(tokens, scanners[PARSER])
+        else:
+            tokens = self.chainReduce(tokens, scanners[PARSER])
+
+        # No patterns were found, reduced to maximum
+        if len(tokens) > 2: #indent reducedToken (beginBlock)
+            if tokens[0].symbol is unset:
+                if 'indent' in tokens[0] and tokens[1].symbol is unset:
+                    self.showError(f'SyntaxError')
+        return tokens
+
+    def assembly(self, tokens, block=None, modifier=None):
+        ''' Match the given list of tokens with the corresponding '''
+        ''' grammar and return a struct with its properties '''
+        # Reducers reach the parser through the module functions
+        local.parser = self
+        if not block == None:
+            if not 'block' in tokens[1]:
+                tokens[1]['block'] = block
                 return tokens
             else:
-                showError('Multiple else statements is not permitted')
+                self.showError('Not expecting an ifBlock here...')
+        elif not modifier == None:
+            if modifier[1]['token'] == 'elifStatement':
+                if not 'elifs' in tokens[1]:
+                    tokens[1]['elifs'] = []
+                modifier = self.assembly(modifier)
+                tokens[1]['elifs'].append({'expr':modifier['expr'], 'elifBlock':modifier['block']})
+                return tokens
+            elif modifier[1]['token'] == 'elseStatement':
+                if not 'else' in tokens[1]:
+                    tokens[1]['else'] = modifier[1]['block']
+                    return tokens
+                else:
+                    self.showError('Multiple else statements is not permitted')
+            else:
+                self.showError(f"Not implemented modifier handling for {modifier[1]['token']}")
+
         else:
-            showError(f"Not implemented modifier handling for {modifier[1]['token']}")
-                
-    else:
-        reduced = reduceToken(tokens)
-        if len(reduced) > 1:
-            struct = reduced[1]
-            struct['opcode'] = struct['token']
-            return struct
+            reduced = self.reduceToken(tokens)
+            if len(reduced) > 1:
+                struct = reduced[1]
+                struct.opcode = kindNames[struct.kind]
+                return struct
 
-def showError(error):
-    global currentLine, lineNumber, currentFilename
-    msg = f'''
+    def lastParsePhrase(self):
+        ''' Return the phrase of the tokens being reduced, or their
+            token names if some of them have no word
+        '''
+        try:
+            return token2word(self.parseTokens)
+        except Exception:
+            return ' '.join(token['token'] for token in self.parseTokens)
+
+    def showError(self, error):
+        msg = f'''
 
 
     Ops!! This is a syntax error or a parser error.
     Common causes: Missing "," ")" "}}"
     {error}
-    This happened in line {currentFilename}:{lineNumber}.
+    This happened in line {self.currentFilename}:{self.lineNumber}.
     Last parsed line is "\n
-    {currentLine}\n"
-    Last Parse attempt was:\n "{parsePhrase}"
+    {self.currentLine}\n"
+    Last Parse attempt was:\n "{self.lastParsePhrase()}"
     '''
-    raise SyntaxError(msg)
+        raise SyntaxError(msg)
 
-# Load grammar
-import os
-with open(f'{os.path.dirname(__file__)}/grammar/generatedGrammar.py') as g:
-    exec(g.read())
+# The functions below use the Parser that last assembled a struct
+# in the running thread, so each thread has its own state.
+local = threading.local()
+
+def currentParser():
+    ''' Return the Parser in use in the running thread '''
+    try:
+        return local.parser
+    except AttributeError:
+        local.parser = Parser()
+        return local.parser
+
+def debug(*args, center=False):
+    currentParser().trace(*args, center=center)
+
+def parse(line, filename='', no=-1, debug=False):
+    ''' Return a list of tokens for the given line '''
+    return currentParser().parse(line, filename=filename, no=no, debug=debug)
+
+def reduceToken(tokens):
+    ''' Find patterns that can be reduced to a single token
+        and return the reduced list of tokens
+    '''
+    return currentParser().reduceToken(tokens)
+
+def assembly(tokens, block=None, modifier=None):
+    ''' Match the given list of tokens with the corresponding
+        grammar and return a struct with its properties
+    '''
+    return currentParser().assembly(tokens, block=block, modifier=modifier)
+
+def lastParsePhrase():
+    return currentParser().lastParsePhrase()
+
+def showError(error):
+    currentParser().showError(error)
+
+# Grammar tables, written with kind codes by grammar/genGrammar.py
+patterns = grammar.patterns
+patternLengths = grammar.patternLengths
+maxPatternLength = grammar.maxPatternLength
+matcher = grammar.matcher
+reducers = [globals()[name] for name in grammar.reducers]
+# Kinds a literal can follow, where brackets can't be an index access
+literalFollows = {kindCode(kind) for kind in
+    ('equal', 'lparen', 'comma', 'lbracket', 'beginBlock', 'inStatement')}
 
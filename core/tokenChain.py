@@ -0,0 +1,126 @@
+# Photon token chain
+# A gap buffer of tokens used by the reduction engine.
+# Reducers edit the line around a single position, usually with
+# repeated "del t[i+1]", so keeping the gap there makes each edit O(1).
+
+class TokenChain():
+    ''' List-like gap buffer of tokens.
+
+        Every token keeps the slot it had when the chain was created.
+        Slots never move, so the engine can track match results per
+        slot and ask for the current position of a slot after edits.
+    '''
+    def __init__(self, tokens=()):
+        self.tokens = list(tokens)
+        self.size = self.length = len(self.tokens)
+        self.slots = list(range(self.size))
+        # The gap grows with every deletion, tokens are never inserted
+        self.start = self.size
+        self.end = len(self.tokens)
+        self.deleted = []
+        # Fenwick tree counting the live slots, used to find positions
+        self.tree = [0] * (self.size + 1)
+        for slot in range(1, self.size + 1):
+            self.tree[slot] += 1
+            parent = slot + (slot & -slot)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[slot]
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        yield from self.tokens[:self.start]
+        yield from self.tokens[self.end:]
+
+    def __repr__(self):
+        return f'TokenChain({list(self)})'
+
+    def index(self, i):
+        ''' Return the buffer index of position i '''
+        if i < 0:
+            i += self.length
+        if i < 0 or i >= self.length:
+            raise IndexError('token chain index out of range')
+        if i < self.start:
+            return i
+        return i + self.end - self.start
+
+    def __getitem__(self, i):
+        try:
+            if 0 <= i < self.start:
+                return self.tokens[i]
+            if self.start <= i < self.length:
+                return self.tokens[i + self.end - self.start]
+        except TypeError:
+            # A slice, positions are checked first as they are most reads
+            start, stop, step = i.indices(self.length)
+            if step != 1:
+                return list(self)[i]
+            return self.span(self.tokens, start, stop)
+        return self.tokens[self.index(i)]
+
+    def span(self, buffer, start, stop):
+        ''' Return the items of a buffer between two positions '''
+        gap = self.end - self.start
+        if stop <= self.start:
+            return buffer[start:stop]
+        if start >= self.start:
+            return buffer[start+gap:stop+gap]
+        return buffer[start:self.start] + buffer[self.end:stop+gap]
+
+    def __setitem__(self, i, token):
+        self.tokens[self.index(i)] = token
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            for n in reversed(range(*i.indices(self.length))):
+                del self[n]
+            return
+        if i < 0:
+            i += self.length
+        self.index(i)
+        self.moveGap(i)
+        slot = self.slots[self.end]
+        self.tokens[self.end] = None
+        self.slots[self.end] = None
+        self.end += 1
+        self.length -= 1
+        self.deleted.append(slot)
+        slot += 1
+        while slot <= self.size:
+            self.tree[slot] -= 1
+            slot += slot & -slot
+
+    def moveGap(self, i):
+        ''' Move the gap so it starts at position i '''
+        if i < self.start:
+            n = self.start - i
+            self.tokens[self.end-n:self.end] = self.tokens[i:self.start]
+            self.slots[self.end-n:self.end] = self.slots[i:self.start]
+            self.start -= n
+            self.end -= n
+        elif i > self.start:
+            n = i - self.start
+            self.tokens[self.start:i] = self.tokens[self.end:self.end+n]
+            self.slots[self.start:i] = self.slots[self.end:self.end+n]
+            self.start += n
+            self.end += n
+
+    def slotsOf(self, start, stop):
+        ''' Return the slots of the tokens between two positions '''
+        return self.span(self.slots, start, stop)
+
+    def position(self, slot):
+        ''' Return the current position of a live slot '''
+        position = 0
+        while slot > 0:
+            position += self.tree[slot]
+            slot -= slot & -slot
+        return position
+
+    def popDeleted(self):
+        ''' Return the slots deleted since the last call '''
+        deleted = self.deleted
+        self.deleted = []
+        return deleted
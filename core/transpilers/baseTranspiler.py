@@ -1,6 +1,10 @@
 from interpreter import Interpreter
-from copy import deepcopy
+from transpilers import fold, inline, shake, licm, bounds
+from collections.abc import Mapping
+from collections import ChainMap, Counter
+from copy import copy, deepcopy
 import os
+import sys
 from pprint import pprint
 
 class CurrentScope():
@@ -8,6 +12,16 @@ class CurrentScope():
         self.currentScope = {}
         self.localScope = [{}]
         self.local = [False]
+        # The tokens bound to each name by the local scopes, innermost
+        # last. The names are interned when they are bound.
+        self.bindings = {}
+        self.lookups = Counter()
+        self.misses = Counter()
+        # Changes to the local scopes and missed names
+        # since the oldest open snapshot
+        self.undoLog = []
+        self.missLog = []
+        self.snapshots = 0
 
     def startLocalScope(self):
         self.local.append(True)
@@ -15,43 +29,115 @@ class CurrentScope():
 
     def endLocalScope(self):
         del self.local[-1]
-        del self.localScope[-1]
+        self.dropScope()
+
+    def dropScope(self):
+        for index in self.localScope.pop():
+            self.unbind(index)
+
+    def unbind(self, index):
+        bindings = self.bindings[index]
+        bindings.pop()
+        if not bindings:
+            del self.bindings[index]
+
+    def setLocal(self, index, token):
+        index = sys.intern(index)
+        scope = self.localScope[-1]
+        bound = index in scope
+        if self.snapshots:
+            self.undoLog.append((len(self.localScope), index, bound, scope.get(index)))
+        if bound:
+            self.bindings[index][-1] = token
+        else:
+            self.bindings.setdefault(index, []).append(token)
+        scope[index] = token
+
+    def snapshot(self):
+        ''' Return a mark of the local scopes for rollback. The changes
+            are recorded until the mark is rolled back or released.
+        '''
+        self.snapshots += 1
+        return len(self.localScope), len(self.undoLog)
+
+    def rollback(self, mark):
+        ''' Undo the changes to the local scopes made since mark
+            and discard the scopes started after it
+        '''
+        nScopes, nChanges = mark
+        while len(self.localScope) > nScopes:
+            self.dropScope()
+        for depth, index, bound, token in reversed(self.undoLog[nChanges:]):
+            if depth != len(self.localScope):
+                # Change to a discarded scope
+                continue
+            scope = self.localScope[-1]
+            if bound:
+                scope[index] = token
+                self.bindings[index][-1] = token
+            else:
+                del scope[index]
+                self.unbind(index)
+        del self.undoLog[nChanges:]
+        self.release(mark)
+
+    def release(self, mark):
+        ''' Keep the changes made since mark '''
+        self.snapshots -= 1
+        if not self.snapshots:
+            self.undoLog.clear()
+            self.missLog.clear()
 
     def addAlias(self, alias, token):
         if self.local[-1]:
-            self.localScope[-1][alias] = token
+            self.setLocal(alias, token)
         else:
-            self.currentScope[alias] = token
+            self.currentScope[sys.intern(alias)] = token
             if isinstance(token, Module):
-                self.currentScope[alias] = token
+                self.currentScope[sys.intern(alias)] = token
 
     def add(self, token):
         if not isinstance(token, Var) and token.index is not None:
             if self.local[-1]:
-                self.localScope[-1][token.index] = token
+                self.setLocal(token.index, token)
             else:
-                self.currentScope[token.index] = token
+                self.currentScope[sys.intern(token.index)] = token
 
     def update(self, scope):
         self.currentScope.update(scope.currentScope)
         for localScope in scope.localScope:
-            self.localScope[-1].update(localScope)
+            for index, token in localScope.items():
+                self.setLocal(index, token)
 
     def values(self, namespace=None, modules=False):
+        ''' Return the tokens of a namespace. They are the tokens of
+            the scope, not copies, so use indexIn to rename them.
+        '''
         vals = []
         for token in self.currentScope.values():
             if token.namespace == namespace:
                 if not modules and (token.type.isModule or token.type.isPackage):
                     continue
-                vals.append(deepcopy(token))
+                vals.append(token)
         for localScope in self.localScope:
             for token in localScope.values():
                 if token.namespace == namespace:
                     if not modules and (token.type.isModule or token.type.isPackage):
                         continue
-                    vals.append(deepcopy(token))
+                    vals.append(token)
         return vals
 
+    def indexIn(self, token, namespace):
+        ''' Return the index of token in another namespace, leaving
+            the token as it is
+        '''
+        oldNamespace = token.namespace
+        token.namespace = namespace
+        index = token.index
+        token.namespace = oldNamespace
+        token.prepare()
+        return index
+
     def __repr__(self):
         s = 'SCOPE DUMP\n'
         for i, t in self.currentScope.items():
@@ -62,10 +148,31 @@ class CurrentScope():
         return s
 
     def get(self, index):
-        for scope in reversed(self.localScope):
-            if index in scope:
-                return scope[index]
-        return self.currentScope[index]
+        self.lookups[index] += 1
+        bindings = self.bindings.get(index)
+        if bindings is not None:
+            return bindings[-1]
+        try:
+            return self.currentScope[index]
+        except KeyError:
+            self.misses[index] += 1
+            if self.snapshots:
+                self.missLog.append(index)
+            raise
+
+    def isBound(self, index):
+        return index in self.bindings or index in self.currentScope
+
+    def stats(self, top=10):
+        ''' Return the number of lookups and misses and
+            the names with the most of them
+        '''
+        s = f'SYMBOL TABLE {sum(self.lookups.values())} lookups {sum(self.misses.values())} misses\n'
+        for i, n in self.lookups.most_common(top):
+            s += f'"{i}" {n} lookups\n'
+        for i, n in self.misses.most_common(top):
+            s += f'"{i}" {n} misses\n'
+        return s
 
     def inMemory(self, obj):
         try:
@@ -126,12 +233,31 @@ class BaseTranspiler():
             'delete': self.processDelete,
             'null': self.processNull,
             'cast': self.processCast,
+            'inlined': self.processInlined,
         }
 
         self.sequence = Sequence()
         self.currentScope = CurrentScope()
         self.currentNamespace = self.moduleName
-        self.importedModules = {}
+        # Imports of child modules see the parent modules without a copy
+        self.importedModules = ChainMap()
+        # How many times each name is bound in the file
+        self.bindings = Counter()
+        # Values of the numbers assigned once at the top level
+        self.constants = {}
+        # Top level functions defined once, with what inlining them takes
+        self.inlinable = {}
+        # Functions being inlined, not to expand them into themselves
+        self.inlining = set()
+        # Fields the getters of the classes return, by class and method
+        self.getters = {}
+        # Names the written code uses, None until it is shaken
+        self.usedNames = None
+        # Variables the loop invariants were hoisted into
+        self.invariants = 0
+        # The (list, index) names the for loops being processed keep in
+        # bounds, one set for each loop
+        self.inBounds = []
 
     #def __getattribute__(self,name):
     #    attr = object.__getattribute__(self, name)
@@ -144,12 +270,53 @@ class BaseTranspiler():
     #    else:
     #        return attr
 
+    def renders(self):
+        ''' Return how many tokens were rendered and how many
+            renders were answered from their caches
+        '''
+        return f'RENDERS {renderStats["rendered"]} rendered {renderStats["saved"]} saved'
+
     def loadTokens(self, lang):
         import importlib
         tokens = importlib.import_module(f'.{lang}Tokens', package=__package__)
         for name, token in tokens.__dict__.items():
             globals()[name] = token
 
+    def shakenSequence(self):
+        ''' Return the sequence to write, rendered, without the top level
+            functions and classes nothing in the program reaches
+        '''
+        if self.module or not shake.ENABLED:
+            return self.sequence
+        texts = []
+        items = []
+        # Methods of C classes, defined by the name of their field
+        methods = []
+        classes = []
+        for obj in self.sequence:
+            if isinstance(obj, Expr):
+                obj.mode = 'declaration'
+            if self.lang == 'c' and isinstance(obj, Class):
+                # Inherited methods are fields of the class too
+                fields = [name for name, p in obj.parameters.items()
+                    if isinstance(p, Function) and name != 'new']
+                obj.drop(fields)
+                methods.extend((name, render(m)) for name, m in obj.methods.items() if name != 'new')
+                classes.append((len(texts), obj, fields))
+            texts.append(render(obj))
+            name = repr(obj.name) if isinstance(obj, (Function, Class)) else None
+            items.append((name, texts[-1]))
+        kept, self.usedNames = shake.shake(items + methods, self.lang)
+        for i, obj, fields in classes:
+            if kept[i]:
+                obj.drop(name for name in fields if name not in self.usedNames)
+                texts[i] = render(obj)
+        return Sequence([text for text, keep in zip(texts, kept) if keep])
+
+    def isImportUsed(self, imp):
+        ''' Return if the written code uses a native import '''
+        return self.usedNames is None or shake.isUsed(imp, self.usedNames)
+
     def typeOf(self, obj):
         if obj.type.known:
             return obj.type
@@ -161,16 +328,223 @@ class BaseTranspiler():
             print(f'Exception in typeOf {e}')
             return Type('unknown')
 
+    def scanBindings(self, structs):
+        ''' Count the names the structs of the whole file bind, before
+            they are processed
+        '''
+        def names(struct):
+            if isinstance(struct, Mapping):
+                if struct.get('token') == 'var':
+                    yield struct['name']
+                for value in struct.values():
+                    yield from names(value)
+            elif isinstance(struct, list):
+                for value in struct:
+                    yield from names(value)
+
+        pending = list(structs)
+        while pending:
+            struct = pending.pop()
+            if isinstance(struct, list):
+                pending.extend(struct)
+                continue
+            if not isinstance(struct, Mapping):
+                continue
+            token = struct.get('token')
+            if token in ('assign', 'augAssign'):
+                if struct['target'].get('token') == 'var':
+                    self.bindings[struct['target']['name']] += 1
+            elif token == 'for':
+                self.bindings.update(names(struct['vars']))
+            elif token in ('func', 'class'):
+                self.bindings[struct['name']] += 1
+                self.bindings.update(names(struct['args']))
+            elif token in ('import', 'fromImport'):
+                self.bindings.update(names(struct))
+            elif token == 'expr' and 'opcode' in struct:
+                # Declarations like int x
+                self.bindings.update(arg['name'] for arg in struct['args']
+                    if arg.get('token') == 'var' and arg.get('type', 'unknown') != 'unknown')
+            pending.extend(struct.values())
+
+    def addConstant(self, token, assign):
+        ''' Keep the value of a number assigned once, to use it for
+            the variable from here on
+        '''
+        target = token['target']
+        if not fold.ENABLED or target.get('token') != 'var' \
+                or target.keys() - {'token', 'type', 'name'} \
+                or self.bindings[target['name']] != 1:
+            return
+        value = constantOf(assign.value)
+        if fold.isNumber(value) and fold.literal(value, Expr.target) is not None:
+            value = fold.variable(value, Expr.target)
+            self.constants[target['name']] = (value, assign.value.type)
+
+    def propagate(self, token):
+        ''' Return the constant for a variable token, or None '''
+        if token['token'] != 'var' or token.get('type', 'unknown') != 'unknown' \
+                or token.keys() - {'token', 'type', 'name'}:
+            return None
+        constant = self.constants.get(token['name'])
+        if constant is None:
+            return None
+        fold.stats['propagated'] += 1
+        return self.constantExpr(*constant)
+
+    def constantExpr(self, value, type):
+        ''' Return the expression of a number with a literal '''
+        expr = Expr(value=fold.literal(value, Expr.target), type=type)
+        expr.folded = value
+        # A negative number next to another minus or a power
+        return Group(expr) if value < 0 else expr
+
+    def addInlinable(self, token, function):
+        ''' Keep what inlining a top level function takes, or why it
+            can't be inlined
+        '''
+        if self.bindings[token['name']] != 1:
+            found = 'name bound again'
+        elif function.type.type not in inline.returnTypes:
+            found = f'returns {function.type.type}'
+        else:
+            found = inline.candidate(token)
+        self.inlinable[token['name']] = (found, function)
+
+    def inlineCall(self, token, alone=False, caller=None):
+        ''' Return the expression a call to a function of the module
+            expands to, or None to leave the call. Alone in its
+            expression it needs no parenthesis. A call made by an
+            importing module has its arguments processed by the caller.
+        '''
+        caller = caller or self
+        name = token['name']
+        if name.get('token') != 'var' or name['name'] not in self.inlinable \
+                or name['name'] in self.inlining:
+            return None
+        name = name['name']
+        found, function = self.inlinable[name]
+        reason = found if isinstance(found, str) else self.argumentsLeft(token, found, caller is self)
+        if reason:
+            inline.decisions[(name, reason)] += 1
+            return None
+        values = {}
+        for param, sig, arg in zip(found.params, function.signature, token['args']):
+            value = caller.preprocess(arg)
+            if value.type != sig.type:
+                # A cast in a call converts the argument, in C by the
+                # type of the parameter
+                inline.decisions[(name, f'argument {param} cast')] += 1
+                return None
+            values[param] = self.valueOf(self.held(value), inline.isSimple(arg))
+        self.inlining.add(name)
+        try:
+            for local, type, expr in found.locals:
+                value = self.preprocess(inline.substitute(expr, values))
+                if Type(type).known and Type(type) != value.type:
+                    if not value.type.known or {type, value.type.type} - inline.returnTypes:
+                        inline.decisions[(name, f'local {local} cast')] += 1
+                        return None
+                    # Converted as the assignment would
+                    value = Cast(value, Type(type))
+                values[local] = self.valueOf(self.held(value), inline.isSimple(expr))
+            result = self.held(self.preprocess(inline.substitute(found.result, values)))
+        finally:
+            self.inlining.discard(name)
+        if result.type != function.type:
+            inline.decisions[(name, 'return cast')] += 1
+            return None
+        inline.decisions[(name, 'inlined')] += 1
+        if caller is not self:
+            caller.imports = caller.imports.union(self.imports)
+        return result if alone else self.enclose(result)
+
+    def inlineModuleCall(self, token, alone=False):
+        ''' Return the expression a call to a function of an imported
+            module expands to, or None to leave the call. The module is
+            written in the same file, so its functions are in reach.
+        '''
+        if len(token['dotAccess']) != 2:
+            return None
+        first, call = token['dotAccess']
+        if first.get('token') != 'var' or first.keys() - {'token', 'type', 'name'} \
+                or call.get('token') != 'call' or 'indexAccess' in call:
+            return None
+        moduleType = self.preprocess(first).type
+        if not moduleType.isModule:
+            return None
+        module = self.currentScope.get(Var(moduleType.name, namespace=self.moduleName).index)
+        if module.engine is None or not module.engine.inlinable:
+            return None
+        return module.engine.inlineCall(call, alone, caller=self)
+
+    def argumentsLeft(self, token, found, local=True):
+        ''' Return why the arguments of a call keep it from inlining.
+            The functions of an imported module can't reach the
+            variables of the module calling them.
+        '''
+        if token['kwargs'] or len(token['args']) != len(found.params):
+            return 'arguments'
+        sideEffects = [param for param, arg in zip(found.params, token['args'])
+            if not inline.isSimple(arg)]
+        for param in sideEffects:
+            if found.uses[param] != 1:
+                return f'argument {param} used {found.uses[param]} times'
+        if len(sideEffects) + found.calls > 1:
+            # The order they run in could change
+            return 'calls'
+        if found.calls and local and any(any(inline.names(arg)) for arg in token['args']):
+            # The call could change the variable before it is read
+            return 'variable with a call'
+        return None
+
+    def held(self, value):
+        ''' Return a value as a variable holds it, so a constant int
+            is a long in C
+        '''
+        constant = constantOf(value)
+        if isinstance(constant, int) and not isinstance(constant, bool):
+            return self.constantExpr(fold.variable(constant, Expr.target), value.type)
+        return value
+
+    def valueOf(self, value, simple):
+        ''' Return what gives the token for each use of a value '''
+        if simple:
+            return lambda: self.enclose(deepcopy(value))
+        return lambda: self.enclose(value)
+
+    def enclose(self, value):
+        ''' Return the value in parenthesis, unless it is a single term '''
+        while isinstance(value, Expr) and not isinstance(value.value, NativeCode):
+            value = value.value
+        if isinstance(value, Expr) and (value.folded is None or repr(value).startswith('-')):
+            return Group(value)
+        return value
+
+    def processInlined(self, token):
+        return token['value']
+
     def process(self, token):
         if token is not None:
             processedToken = self.instructions[token['opcode']](token)
+            if token['opcode'] == 'assign':
+                self.addConstant(token, processedToken)
+            elif token['opcode'] == 'func' and inline.ENABLED:
+                self.addInlinable(token, processedToken)
             if processedToken is not None:
-                self.currentScope.add(processedToken)
-                for imp in getattr(processedToken, 'imports', []):
-                    self.imports.add(imp)
                 if token['opcode'] == 'expr':
                     processedToken.mode = 'declaration'
-                self.sequence.add(processedToken)
+                for processed in self.statements(processedToken):
+                    self.currentScope.add(processed)
+                    for imp in getattr(processed, 'imports', []):
+                        self.imports.add(imp)
+                    self.sequence.add(processed)
+
+    def statements(self, processedToken):
+        ''' Return the statements a processed token is written as, a loop
+            comes with the invariants hoisted before it
+        '''
+        return processedToken if isinstance(processedToken, list) else [processedToken]
 
     def preprocess(self, token):
         processedToken = self.instructions[token['token']](token)
@@ -186,17 +560,49 @@ class BaseTranspiler():
         return Bool(value=token['value'])
 
     def processGroup(self, token):
-        return Group(expr=self.preprocess(token['expr']))
+        expr = self.preprocess(token['expr'])
+        value = getattr(expr, 'value', None)
+        if getattr(value, 'folded', None) is not None and not repr(value).startswith('-'):
+            # A constant needs no parenthesis, unless it is negative
+            return expr
+        if isinstance(value, Group):
+            return expr
+        return Group(expr=expr)
 
     def processString(self, token):
         for i in String.imports:
             self.imports.add(i)
-        expressions = self.processTokens(token['expressions'])
+        value, expressions = self.inlineConstants(
+            token['value'], self.processTokens(token['expressions']))
         return String(
-            value=token['value'],
+            value=value,
             expressions=expressions,
         )
 
+    def inlineConstants(self, value, expressions):
+        ''' Write the constant expressions of a format string into it.
+            Return the new value and the expressions left.
+        '''
+        if not fold.ENABLED or not expressions or Expr.target is None:
+            return value, expressions
+        parts = value.split('{}')
+        if len(parts) != len(expressions) + 1 \
+                or any('{' in part or '}' in part for part in parts) \
+                or (Expr.target == 'c' and '%' in value):
+            return value, expressions
+        value = parts[0]
+        left = []
+        for expr, part in zip(expressions, parts[1:]):
+            text = fold.formatted(constantOf(expr), Expr.target)
+            if text is None:
+                left.append(expr)
+                value += '{}'
+            else:
+                fold.stats['inlined'] += 1
+                value += text
+            value += part
+        return value, left
+
     def processCast(self, token):
         return Cast(
             expr=self.preprocess(token['expr']),
@@ -211,7 +617,7 @@ class BaseTranspiler():
     def processType(self, token):
         tokenType = token
         native = False
-        if isinstance(token, dict):
+        if isinstance(token, Mapping):
             typeExpr = self.preprocess(token)
             try:
                 tokenType = self.currentScope.get(repr(typeExpr)).type.type
@@ -245,7 +651,7 @@ class BaseTranspiler():
             token['keyType'], _ = self.processType(keyType)
         if valType is not None:
             token['valType'], _ = self.processType(valType)
-        if tokenType is not None and isinstance(tokenType, dict):
+        if tokenType is not None and isinstance(tokenType, Mapping):
             token['type'], token['native'] = self.processType(tokenType)
         varType = Type(**token)
         if not varType.known:
@@ -255,9 +661,11 @@ class BaseTranspiler():
                 varType = varCorrect.type
                 namespace = varCorrect.namespace
             except Exception as e: 
-                print(f'didnt find {e} in scope')
-                print(self.currentScope)
-                pass
+                # Misses are counted by the scope, the dump is only
+                # worth its cost when debugging
+                if self.debug:
+                    print(f'didnt find {e} in scope')
+                    print(self.currentScope)
 
         var = Var(
             value=token['name'],
@@ -273,9 +681,24 @@ class BaseTranspiler():
                 globalVar.namespace = self.moduleName
                 globalVar.type = self.typeOf(globalVar)
                 if globalVar.type.known:
-                    return globalVar
+                    var = globalVar
+        if indexAccess is not None and var.type.type == 'array' and self.isInBounds(token):
+            var.inBounds = True
+            bounds.stats['unchecked'] += 1
         return var
 
+    def isInBounds(self, token):
+        ''' Return if a var token indexes its list by a variable some
+            loop being processed keeps in bounds
+        '''
+        index = token['indexAccess']
+        if not self.inBounds or index.get('token') != 'expr' or index['ops'] \
+                or len(index['args']) != 1 or index['args'][0].keys() != {'token', 'type', 'name'} \
+                or index['args'][0]['token'] != 'var':
+            return False
+        item = (token['name'], index['args'][0]['name'])
+        return any(item in pairs for pairs in self.inBounds)
+
     def processDelete(self, token):
         return Delete(expr=self.preprocess(token['expr']))
 
@@ -345,14 +768,27 @@ class BaseTranspiler():
         )
 
     def processExpr(self, token):
+        args = []
+        for t in token['args']:
+            value = None
+            if t['token'] == 'var' and self.constants:
+                value = self.propagate(t)
+            elif t['token'] == 'call' and self.inlinable and 'opcode' not in token:
+                # A call made for its value
+                value = self.inlineCall(t, alone=not token['ops'])
+            elif t['token'] == 'dotAccess' and inline.ENABLED and 'opcode' not in token:
+                value = self.inlineModuleCall(t, alone=not token['ops'])
+            args.append(self.preprocess(t) if value is None else value)
         return Expr(
-            *[self.preprocess(t) for t in token['args']],
+            *args,
             ops = token['ops']
         )
 
     def processAssign(self, token):
-        target = self.preprocess(token['target'])
-        value = self.preprocess(token['expr'])
+        return self.assignment(self.preprocess(token['target']), self.preprocess(token['expr']))
+
+    def assignment(self, target, value):
+        ''' Return the Assign of a processed value to a processed target '''
         inMemory = self.currentScope.inMemory(target)
         if inMemory:
             target.type = self.typeOf(target)
@@ -414,13 +850,90 @@ class BaseTranspiler():
             elseBlock = elseBlock,
         )
 
+    def hoistInvariants(self, token):
+        ''' Return the statements assigning the invariants of the loop to
+            variables and the loop, or None if it has none to hoist
+        '''
+        if not licm.ENABLED:
+            return None
+        found = licm.invariants(token, boundsOnce=self.lang == 'python')
+        if found is None:
+            return None
+        always, first, guard = found
+        names = {}
+        # The name and the processed value of each expression, the same
+        # ones share them
+        hoisted = {}
+        values = {}
+        for struct in always + first:
+            key = licm.key(licm.expression(struct))
+            if key not in hoisted:
+                counted = fold.stats.copy(), bounds.stats.copy(), inline.decisions.copy()
+                value = self.preprocess(deepcopy(licm.expression(struct)))
+                if value.type.type not in licm.types or self.isLiteral(value):
+                    # Processed again in the loop, where it is counted
+                    fold.stats, bounds.stats, inline.decisions = counted
+                    hoisted[key] = None
+                    continue
+                self.invariants += 1
+                hoisted[key] = f'__invariant{self.invariants}'
+                values[hoisted[key]] = value
+            elif hoisted[key] is None:
+                continue
+            names[id(struct)] = hoisted[key]
+        if not names:
+            return None
+        licm.stats['hoisted'] += len(values)
+        licm.stats['loops'] += 1
+        before, guarded = [], []
+        assigned = set()
+        for structs, assigns in ((always, before), (first, guarded)):
+            for struct in structs:
+                name = names.get(id(struct))
+                if name is not None and name not in assigned:
+                    assigned.add(name)
+                    target = self.preprocess({'token': 'var', 'type': 'unknown', 'name': name})
+                    assign = self.assignment(target, values[name])
+                    self.currentScope.add(assign)
+                    assigns.append(assign)
+        loop = self.preprocess(licm.replace(token, names))
+        if guarded:
+            # Computed before the first run, only if there is one
+            guard = self.preprocess(licm.replace(guard, names))
+            if constantOf(guard) is True:
+                before.extend(guarded)
+            else:
+                loop = If(expr=guard, ifBlock=guarded + [loop], elifs=[])
+        return before + [loop]
+
+    def isLiteral(self, value):
+        ''' Return if an expression was folded into a literal '''
+        if constantOf(value) is not None:
+            return True
+        value = value.value if isinstance(value, Expr) else value
+        return isinstance(value, String) and not value.expressions
+
     def processWhile(self, token):
+        hoisted = self.hoistInvariants(token)
+        if hoisted is not None:
+            return hoisted
         return While(
             expr=self.preprocess(token['expr']),
             block=self.processTokens(token['block'], addToScope=True)
         )
 
     def processFor(self, token):
+        if bounds.ENABLED and self.lang == 'c':
+            self.inBounds.append(bounds.inBounds(token))
+            forToken = self.processForLoop(token)
+            self.inBounds.pop()
+            return forToken
+        return self.processForLoop(token)
+
+    def processForLoop(self, token):
+        hoisted = self.hoistInvariants(token)
+        if hoisted is not None:
+            return hoisted
         iterable = self.preprocess(token['iterable'])
         self.currentScope.startLocalScope()
         args = self.processTokens(token['vars'])
@@ -566,6 +1079,12 @@ class BaseTranspiler():
                             continue
                     elif isinstance(c, Call):
                         methodIndex = f'{c.name}'
+                        field = self.getterField(currentType, methodIndex, c, scope)
+                        if field is not None:
+                            chain[n + 1] = c = field
+                            parsedChain.append(c)
+                            currentType = c.type
+                            continue
                         if methodIndex in scope['methods']:
                             c.type = scope['methods'][methodIndex].type
                             c.signature = scope['methods'][methodIndex].signature
@@ -597,7 +1116,6 @@ class BaseTranspiler():
                     else:
                         #TODO: maybe the class should have a signature precomputed
                         # instead of doing this here and in processCall
-                        input(module.scope)
                         cOriginal = module.scope.get(c.name.index)
                         signature = []
                         if isinstance(cOriginal, Class):
@@ -631,6 +1149,23 @@ class BaseTranspiler():
             self.imports.add(i)
         return dotAccess
 
+    def getterField(self, classType, methodIndex, call, scope):
+        ''' Return the field to read instead of calling a getter, in C
+            where methods are called through a field, or None
+        '''
+        name = self.getters.get((classType.type, methodIndex))
+        if self.lang != 'c' or name is None or methodIndex not in scope['methods'] \
+                or call.args.args or call.kwargs.kwargs or getattr(call, 'indexAccess', None) is not None:
+            return None
+        field = Var(name, namespace='')
+        parameter = scope['parameters'].get(field.index)
+        if parameter is None or isinstance(parameter, Function) \
+                or parameter.type != scope['methods'][methodIndex].type:
+            return None
+        field.type = parameter.type
+        inline.decisions[(methodIndex, 'inlined')] += 1
+        return field
+
     def processClass(self, token):
         self.currentScope.startLocalScope()
         className = Var(token['name'], namespace=self.currentNamespace)
@@ -652,7 +1187,6 @@ class BaseTranspiler():
             new=new,
             parameters=parameters
         )
-        # First pass for type inference
         parentClass = None
         for arg in args:
             arg.namespace = self.currentNamespace
@@ -665,88 +1199,69 @@ class BaseTranspiler():
                 Assign(
                     target=Var('super', repr(parentClass.name)),
                     value=Call(Var(parentClass.name))))
+        # The members are lowered in one pass. A member that refers to
+        # one declared after it breaks with a KeyError, so it's rolled
+        # back and put in a worklist. A member that missed names in the
+        # scope goes to the worklist with them. Once the signatures of
+        # all members are known and the class is in scope, the worklist
+        # is lowered again, skipping members whose names are still missing.
+        worklist = []
+        hasNew = False
         for t in token['block']:
+            oldNamespace = self.currentNamespace
+            mark = self.currentScope.snapshot()
+            misses = len(self.currentScope.missLog)
             try:
-                oldNamespace = self.currentNamespace
-                oldScope = deepcopy(self.currentScope.localScope[-1])
-                nScopes = len(self.currentScope.localScope)
-                t = self.preprocess(t)
+                member = self.preprocess(t)
             except KeyError as e:
                 # we must recover the namespace when
                 # it breaks in the middle of execution
                 # and the scope (discard deeper scopes)
                 self.currentNamespace = oldNamespace
-                self.currentScope.localScope = self.currentScope.localScope[:nScopes]
-                self.currentScope.localScope[-1] = oldScope
+                self.currentScope.rollback(mark)
+                worklist.append((t, None))
                 continue
-            if isinstance(t, Function):
-                if t.name.value == 'new':
-                    new = t
-                    new.kwargs.kwargs = newKwargs + new.kwargs.kwargs
-                    for kw in new.kwargs.kwargs:
-                        if kw.target.attribute:
-                            parameters[kw.index] = kw
-                else:
-                    t.args.args.insert(0, Var('self', repr(className)))
-                    t.signature.insert(0, Var('self', repr(className)))
-                parameters[t.name.value] = t
-                t.namespace = className
-                t.name.namespace = className
-                #t.prepare()
-                methods[t.name.value] = t
-            elif isinstance(t, Assign):
-                t.namespace = ''
-                parameters[t.index] = t
-            elif isinstance(t, Expr):
-                t.namespace = ''
-                parameters[repr(t)] = t
-        if new is None:
-            new = Function(name=Var(f'new', namespace=className))
-            methods[new.name.value] = new
+            missed = self.currentScope.missLog[misses:]
+            self.currentScope.release(mark)
+            if missed:
+                worklist.append((t, missed))
+            if self.addMember(member, className, parameters, methods, newKwargs):
+                new = member
+                hasNew = True
+            elif isinstance(member, Function) and inline.ENABLED and inline.getter(t):
+                self.getters[(repr(className), member.name.value)] = inline.getter(t)
         new.name.type = Type(repr(className))
+        # Class formats the code of its new method, the one that's kept
+        # is formatted with the final class
         self.currentScope.add(
             Class(
                 name=className,
-                args=self.processTokens(token['args']),
+                args=args,
                 parameters = parameters,
-                new = new,
+                new = copy(new),
         ))
-        # Second pass for code generation
-        new = None
-        thisClassCode = Scope(self.processTokens(token['block']))
-        for t in thisClassCode.sequence:
-            if isinstance(t, Function):
-                if t.name.value == 'new':
-                    new = t
-                    new.args.args = newArgs + new.args.args
-                    new.kwargs.kwargs = newKwargs + new.kwargs.kwargs
-                    for kw in t.kwargs.kwargs:
-                        if kw.target.attribute:
-                            parameters[kw.index] = kw
-                else:
-                    t.args.args.insert(0, Var('self', repr(className)))
-                    t.signature.insert(0, Var('self', repr(className)))
-                parameters[t.name.value] = t
-                t.namespace = className
-                t.name.namespace = className
-                #t.prepare()
-                methods[t.name.value] = t
-            elif isinstance(t, Assign):
-                t.namespace = ''
-                parameters[t.index] = t
-            elif isinstance(t, Expr):
-                t.namespace = ''
-                parameters[repr(t)] = t
-        if new is None:
+        for t, missed in worklist:
+            if missed is not None and not any(self.currentScope.isBound(i) for i in missed):
+                continue
+            member = self.preprocess(t)
+            if self.addMember(member, className, parameters, methods, newKwargs):
+                new = member
+                new.name.type = Type(repr(className))
+                hasNew = True
+            elif isinstance(member, Function) and inline.ENABLED and inline.getter(t):
+                self.getters[(repr(className), member.name.value)] = inline.getter(t)
+        if hasNew:
+            new.args.args = newArgs + new.args.args
+        else:
             new = Function(
                 name=Var(f'new',namespace=className),
                 args=newArgs,
                 kwargs=newKwargs)
-        new.name.type = Type(repr(className))
+            new.name.type = Type(repr(className))
         methods[new.name.value] = new
         classToken = Class(
             name=className,
-            args=self.processTokens(token['args']),
+            args=args,
             parameters=parameters,
             methods=methods,
             new=new,
@@ -755,6 +1270,34 @@ class BaseTranspiler():
         self.classes[repr(className)] = classToken
         return classToken
 
+    def addMember(self, t, className, parameters, methods, newKwargs):
+        ''' Add a lowered member to the parameters and methods of
+            its class. Return True if it's the new method.
+        '''
+        isNew = False
+        if isinstance(t, Function):
+            if t.name.value == 'new':
+                isNew = True
+                t.kwargs.kwargs = newKwargs + t.kwargs.kwargs
+                for kw in t.kwargs.kwargs:
+                    if kw.target.attribute:
+                        parameters[kw.index] = kw
+            else:
+                t.args.args.insert(0, Var('self', repr(className)))
+                t.signature.insert(0, Var('self', repr(className)))
+            parameters[t.name.value] = t
+            t.namespace = className
+            t.name.namespace = className
+            #t.prepare()
+            methods[t.name.value] = t
+        elif isinstance(t, Assign):
+            t.namespace = ''
+            parameters[t.index] = t
+        elif isinstance(t, Expr):
+            t.namespace = ''
+            parameters[repr(t)] = t
+        return isNew
+
     def processFunc(self, token):
         # kwargs must be processed in the current namespace
         # because the values must be in the namespace
@@ -845,6 +1388,7 @@ class BaseTranspiler():
         else:
             names = [f'{moduleExpr}']
         moduleExpr.namespace = self.currentNamespace
+        engine = None
         symbols = token.get('symbols', [])
         if symbols:
             if len(token['symbols']) == 1 and token['symbols'][0].get('operator') == '*':
@@ -876,11 +1420,13 @@ class BaseTranspiler():
                         standardLibs=self.standardLibs,
                         transpileOnly=True,
                         debug=self.debug)
-                interpreter.engine.importedModules = deepcopy(self.importedModules)
+                interpreter.engine.importedModules = self.importedModules.new_child()
                 print('Importing module')
                 interpreter.run()
                 print('Done')
+                engine = interpreter.engine
                 self.classes.update(interpreter.engine.classes)
+                self.getters.update(interpreter.engine.getters)
                 #self.currentScope.update(interpreter.engine.currentScope)
                 scope = interpreter.engine.currentScope
                 self.imports = self.imports.union(interpreter.engine.imports)
@@ -890,12 +1436,11 @@ class BaseTranspiler():
                 if symbols == '*':
                     symbols = interpreter.engine.currentScope.values(namespace=self.moduleName + '__' + '__'.join(names))
                 for symbol in symbols:
-                    symbol.namespace = self.moduleName + '__' + '__'.join(names)
-                    t = scope.get(symbol.index)
-                    symbol.namespace = self.currentNamespace
-                    self.currentScope.addAlias(symbol.index, t)
+                    t = scope.get(scope.indexIn(symbol, self.moduleName + '__' + '__'.join(names)))
+                    self.currentScope.addAlias(scope.indexIn(symbol, self.currentNamespace), t)
             else:
                 scope = self.importedModules[filename].scope
+                engine = self.importedModules[filename].engine
             namespace = '__'.join(names)
         elif f"{names[-1]}.{self.libExtension}" in self.listdir(self.standardLibs + f'/native/{self.lang}/'):
             # Native Photon lib module import
@@ -913,10 +1458,9 @@ class BaseTranspiler():
             scope=scope,
             filepath=filename
         )
+        module.engine = engine
         if filename not in self.importedModules:
             self.importedModules[filename] = module
-            print(f'Imported Modules from {self.moduleName}')
-            input(self.importedModules)
             if isPackage:
                 package.addModule(names, module)
         for i in module.imports:
@@ -929,10 +1473,11 @@ class BaseTranspiler():
         if addToScope:
             processedTokens = []
             for t in tokens:
-                processedToken = self.preprocess(t)
-                self.currentScope.add(processedToken)
-                print(self.currentScope)
-                processedTokens.append(processedToken)
+                for processedToken in self.statements(self.preprocess(t)):
+                    self.currentScope.add(processedToken)
+                    if self.debug:
+                        print(self.currentScope)
+                    processedTokens.append(processedToken)
             return processedTokens
         return [self.preprocess(t) for t in tokens]
 
@@ -9,9 +9,44 @@ class BaseType():
         'obj':'obj',
         'file':'file',
     }
+    # Types are interned by class and structure, so equal types
+    # are usually the same object. Func types are not interned,
+    # their funcName is set by the declarations that use them.
+    internedTypes = {}
+    # Interned types by class and name, for Type('int') and alike
+    namedTypes = {}
 
-    def __init__(self, type, elementType=None, keyType=None, valType=None, returnType=None, funcName=None, argsTypes=None, name=None, namespace='', native=False, **kwargs):
-        if isinstance(type, self.__class__):
+    def __new__(cls, *args, **kwargs):
+        if len(args) == 1 and not kwargs:
+            type = args[0]
+            if type is None or type.__class__ is str:
+                named = BaseType.namedTypes.get((cls, type))
+                if named is not None:
+                    return named
+            elif type.__class__ is cls and type.interned:
+                return type
+        self = super().__new__(cls)
+        self.interned = False
+        if not args and not kwargs:
+            # copy protocol
+            return self
+        self.build(*args, **kwargs)
+        if self.type == 'func' or self.argsTypes:
+            return self
+        key = (cls, self.type, id(self.elementType), id(self.keyType), id(self.valType),
+            id(self.returnType), self.funcName, self.name, self.namespace, self.native)
+        self = BaseType.internedTypes.setdefault(key, self)
+        self.interned = True
+        if len(args) == 1 and not kwargs and (args[0] is None or args[0].__class__ is str):
+            BaseType.namedTypes[(cls, args[0])] = self
+        return self
+
+    def __init__(self, *args, **kwargs):
+        # Built by __new__
+        pass
+
+    def build(self, type, elementType=None, keyType=None, valType=None, returnType=None, funcName=None, argsTypes=None, name=None, namespace='', native=False, **kwargs):
+        if isinstance(type, BaseType):
             self.native = type.native
             self.namespace = type.namespace
             self.type = type.type
@@ -32,16 +67,28 @@ class BaseType():
             self.native = native
             self.namespace = namespace
             self.type = type if type is not None else 'unknown'
-            self.elementType = self.__class__(elementType) if self.isKnown(self.type) else 'unknown'
-            self.keyType = self.__class__(keyType) if self.isKnown(self.type) else 'unknown'
-            self.valType = self.__class__(valType) if self.isKnown(self.type) else 'unknown'
-            self.returnType = self.__class__(returnType) if self.isKnown(self.type) else 'unknown'
-            self.funcName = funcName if self.isKnown(self.type) else None
-            self.argsTypes = argsTypes if self.isKnown(self.type) and isinstance(argsTypes, list) else []
+            if self.isKnown(self.type):
+                self.elementType = self.__class__(elementType)
+                self.keyType = self.__class__(keyType)
+                self.valType = self.__class__(valType)
+                self.returnType = self.__class__(returnType)
+                self.funcName = funcName
+                self.argsTypes = argsTypes if isinstance(argsTypes, list) else []
+            else:
+                self.elementType = 'unknown'
+                self.keyType = 'unknown'
+                self.valType = 'unknown'
+                self.returnType = 'unknown'
+                self.funcName = None
+                self.argsTypes = []
             self.name = name
+        self.hashKey = hash((self.type, self.elementType, self.keyType, self.valType))
+        self.known = self.isKnownType()
+        self.isPackage = self.type == 'package' and self.name is not None
+        self.isModule = self.type == 'module' and self.name is not None
+        self.isClass = self.isClassType()
 
-    @property
-    def known(self):
+    def isKnownType(self):
         if self.type == 'array' and self.isKnown(self.elementType):
             return True
         elif self.type == 'map' and self.isKnown(self.valType) and self.isKnown(self.keyType):
@@ -52,23 +99,8 @@ class BaseType():
             return True
         else:
             return False
-    
-    @property
-    def isPackage(self):
-        if self.type == 'package' and self.name is not None:
-            return True
-        else:
-            return False
 
-    @property
-    def isModule(self):
-        if self.type == 'module' and self.name is not None:
-            return True
-        else:
-            return False
-
-    @property
-    def isClass(self):
+    def isClassType(self):
         if self.known and self.type in self.nativeTypes:
             return False
         elif self.known and not self.native and not self.type in self.nativeTypes and self.type not in ['array', 'map', 'module','package'] and not 'func' in self.type.split(' '):
@@ -77,20 +109,38 @@ class BaseType():
             return False
 
     def isKnown(self, type):
-        if isinstance(type, self.__class__):
+        if isinstance(type, BaseType):
             return type.known
         if type not in ['unknown', '']:
             return True
         return False
+
+    def __copy__(self):
+        if self.interned:
+            return self
+        copied = BaseType.__new__(self.__class__)
+        copied.__dict__.update(self.__dict__)
+        copied.interned = False
+        return copied
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
     
     def __str__(self):
+        if self.interned:
+            # Nothing a non func type prints can change
+            try:
+                return self.text
+            except AttributeError:
+                self.text = repr(self)
+                return self.text
         return repr(self)
 
     def __repr__(self):
         raise NotImplemented
 
     def __hash__(self):
-        return hash((self.type, self.elementType, self.keyType, self.valType))
+        return self.hashKey
 
     def __eq__(self, obj):
-        return hash(obj) == self.__hash__()
+        return obj is self or hash(obj) == self.hashKey
@@ -0,0 +1,69 @@
+''' Bounds check elimination for C. The items of a list a for loop
+    indexes by its own counter, from 0 up to the length of the list, or
+    by the index of the list it iterates, are read and written straight
+    from the values of the list instead of through the checks of
+    list_get and list_set. Only loops that call nothing and delete
+    nothing are looked at, so the list keeps its length.
+'''
+from collections import Counter
+from transpilers import licm
+
+# Skip the checks of the items indexed in bounds, turned off by --no-bounds
+ENABLED = True
+
+# Loops proven, items read or written without the checks
+stats = Counter()
+
+def inBounds(loop):
+    ''' Return the (list, index) names of the items a for loop keeps in
+        the bounds of the list
+    '''
+    iterable = loop['iterable']
+    if iterable.get('token') == 'range':
+        # The counter is the last of the variables
+        index = loop['vars'][-1]['name']
+        if not isInteger(iterable['from'], 0) \
+                or ('step' in iterable and not isInteger(iterable['step'], 1)):
+            return set()
+        name = lengthOf(iterable['to'])
+    elif len(loop['vars']) == 2:
+        index = loop['vars'][0]['name']
+        name = variableOf(iterable)
+    else:
+        return set()
+    if name is None:
+        return set()
+    changes = licm.Changes(loop['block'])
+    if not changes.known or changes.deletes or name in changes.bound or index in changes.names:
+        return set()
+    stats['loops'] += 1
+    return {(name, index)}
+
+def variableOf(struct):
+    ''' Return the name of an expr that is a variable alone, or None '''
+    if struct.get('token') != 'expr' or struct['ops'] or len(struct['args']) != 1:
+        return None
+    var = struct['args'][0]
+    if var.get('token') != 'var' or 'indexAccess' in var:
+        return None
+    return var['name']
+
+def lengthOf(struct):
+    ''' Return the name of the variable an expr is the length of, or None '''
+    if struct.get('token') != 'expr' or struct['ops'] or len(struct['args']) != 1:
+        return None
+    chain = struct['args'][0].get('dotAccess', [])
+    if len(chain) != 2 or chain[1].get('name') != 'len' or chain[1].keys() - {'token', 'type', 'name'}:
+        return None
+    return variableOf({'token': 'expr', 'ops': [], 'args': chain[:1]})
+
+def isInteger(struct, least):
+    ''' Return if an expr is an int literal of at least least '''
+    if struct.get('token') != 'expr' or struct['ops'] or len(struct['args']) != 1:
+        return False
+    num = struct['args'][0]
+    return num.get('token') == 'num' and num.get('type') == 'int' \
+        and num['value'].isdigit() and int(num['value']) >= least
+
+def report():
+    return f'BOUNDS {stats["loops"]} loops {stats["unchecked"]} items unchecked'
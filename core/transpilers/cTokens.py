@@ -159,6 +159,8 @@ class Var(Var):
     def expression(self):
         if self.indexAccess:
             if self.type.type == 'array':
+                if self.inBounds:
+                    return f'{self.name}->values[{self.indexAccess}]'
                 return f'list_{self.type.elementType.type}_get({self.name}, {self.indexAccess})'
             if self.type.type == 'map':
                 return f'dict_{self.type.keyType.type}_{self.type.valType.type}_get({self.name}, {self.indexAccess})'
@@ -167,6 +169,7 @@ class Var(Var):
         return self.name
 
 class Expr(Expr):
+    target = 'c'
     operatorOrder = [
         'not','**','*','%','/','-','+','==','!=','>','<','>=','<=',
         'is','in','andnot','and','or','&', '<<', '>>'
@@ -378,6 +381,8 @@ class Assign(Assign):
         if self.inMemory or isinstance(self.target, DotAccess):
             if self.target.indexAccess:
                 if self.target.type.type == 'array':
+                    if self.target.inBounds:
+                        return f'{self.target.name}->values[{self.target.indexAccess}] = {self.value}'
                     return f'list_{self.target.type.elementType.type}_set({self.target.name}, {self.target.indexAccess}, {self.value})'
                 if self.target.type.type == 'map':
                     return f'dict_{self.type.keyType.type}_{self.type.valType.type}_set({self.target.name}, {self.target.indexAccess}, {self.value})'
@@ -400,7 +405,7 @@ class Kwargs(Kwargs):
         return ', '.join([repr(kwarg) for kwarg in self.kwargs])
 
 class Call(Call):
-    def __repr__(self):
+    def render(self):
         if self.mode == 'format' and self.type.isClass:
             return f'"<class {self.type.type}>"'
         if self.signature:
@@ -479,11 +484,16 @@ class Function(Function):
         self.args.mode = oldMode
         return result
 
-    def expression(self):
-        return f'{self.name.type} {self.name}({self.args}{self.separator}{self.kwargs}) {self.code}'
+    def emitExpression(self, out):
+        out.write(f'{self.name.type} {self.name}({self.args}{self.separator}{self.kwargs}) ')
+        out.emit(self.code)
 
 class Class(Class):
     def formatNewMethod(self):
+        self.newCode = self.new.code.sequence.sequence
+        self.new.code = self.formatNewCode()
+
+    def formatNewCode(self):
         paramsInit = [
             NativeCode(f'{self.new.name.type} self = malloc(sizeof({self.name}))')]
         for p in self.parameters.values():
@@ -494,42 +504,57 @@ class Class(Class):
                 else:
                     paramsInit.append(
                         NativeCode(f'self->{p.target} = {p.target}'))
-            elif isinstance(p, Function):
+            elif isinstance(p, Function) and p.name.value not in self.dropped:
                 paramsInit.append( 
                     NativeCode(f'self->{p.name.value} = {p.name}'))
-        code = paramsInit + self.new.code.sequence.sequence
+        code = paramsInit + self.newCode
         code.append(NativeCode(f'return self'))
-        self.new.code = Scope(code)
+        return Scope(code)
+
+    def drop(self, names):
+        ''' Leave out the methods in names, with their fields '''
+        self.dropped = set(names)
+        self.new.code = self.formatNewCode()
 
     def __repr__(self):
         self.declarationMode()
-        declarations = Scope(
-            list(self.parameters.values())
-        )
+        declarations = Scope([
+            p for p in self.parameters.values()
+            if not (isinstance(p, Function) and p.name.value in self.dropped)
+        ])
         value = f'typedef struct {self.name} {declarations} {self.name};\n'
         self.writeMode()
         for method in self.methods.values():
-            if method.name.value == 'new':
+            if method.name.value == 'new' or method.name.value in self.dropped:
                 continue
             value += f'{method}\n'
         value += f'{self.new}\n'
         return value+self.postCode
 
 class Elif(Elif):
-    def __repr__(self):
-        return f'else if ({self.expr}) {self.block}'
+    def emit(self, out):
+        out.write(f'else if ({self.expr}) ')
+        out.emit(self.block)
 
 class Else(Else):
-    def __repr__(self):
-        return f'else {self.block}'
+    def emit(self, out):
+        out.write('else ')
+        out.emit(self.block)
 
 class If(If):
-    def __repr__(self):
-        return f'if ({self.expr}) {self.ifBlock} {"".join(repr(e) for e in self.elifs)} {self.elseBlock}'
+    def emit(self, out):
+        out.write(f'if ({self.expr}) ')
+        out.emit(self.ifBlock)
+        out.write(' ')
+        for e in self.elifs:
+            out.emit(e)
+        out.write(' ')
+        out.emit(self.elseBlock)
 
 class While(While):
-    def __repr__(self):
-        return f'while ({self.expr}) {self.block}'
+    def emit(self, out):
+        out.write(f'while ({self.expr}) ')
+        out.emit(self.block)
 
 class For(For):
     def __init__(self, args=None, iterable=None, code=None):
@@ -537,56 +562,79 @@ class For(For):
         if self.iterable.type.type == 'str':
             self.imports.append('#include <string.h>')
 
-    def __repr__(self):
+    def emit(self, out):
         if isinstance(self.iterable, Range):
             if len(self.args.args) == 1:
-                return f'for ({self.args[0].type} {self.args[0]}={self.iterable.initial}; {self.args[0]} < {self.iterable.final}; {self.args[0]} += {self.iterable.step}) {self.code}'
+                out.write(f'for ({self.args[0].type} {self.args[0]}={self.iterable.initial}; {self.args[0]} < {self.iterable.final}; {self.args[0]} += {self.iterable.step}) ')
+                out.emit(self.code)
+                return
             if len(self.args.args) == 2:
-                return f'{{{self.args[0].type} {self.args[0]}=0; for ({self.args[1].type} {self.args[1]}={self.iterable.initial}; {self.args[1]} < {self.iterable.final}; {self.args[0]}++, {self.args[1]} += {self.iterable.step}) {self.code}}}'
+                out.write(f'{{{self.args[0].type} {self.args[0]}=0; for ({self.args[1].type} {self.args[1]}={self.iterable.initial}; {self.args[1]} < {self.iterable.final}; {self.args[0]}++, {self.args[1]} += {self.iterable.step}) ')
+                out.emit(self.code)
+                out.write('}')
+                return
         elif isinstance(self.iterable, Expr):
             if self.iterable.type.type == 'array':
                 if len(self.args.args) == 1:
                     iterableVar = f'__iterable_{self.args[0]}'
-                    return f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[0].type} {self.args[0]} = {iterableVar}->values[0]; for (long __forIndex=0; __forIndex < {iterableVar}->len; __forIndex++, {self.args[0]} = {iterableVar}->values[__forIndex]) {self.code}}}'
+                    out.write(f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[0].type} {self.args[0]} = {iterableVar}->values[0]; for (long __forIndex=0; __forIndex < {iterableVar}->len; __forIndex++, {self.args[0]} = {iterableVar}->values[__forIndex]) ')
+                    out.emit(self.code)
+                    out.write('}')
+                    return
                 if len(self.args.args) == 2:
                     iterableVar = f'__iterable_{self.args[1]}'
-                    return f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[1].type} {self.args[1]} = {iterableVar}->values[0]; for ({self.args[0].type} {self.args[0]}=0; {self.args[0]} < {iterableVar}->len; {self.args[0]}++, {self.args[1]} = {iterableVar}->values[{self.args[0]}]) {self.code}}}'
+                    out.write(f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[1].type} {self.args[1]} = {iterableVar}->values[0]; for ({self.args[0].type} {self.args[0]}=0; {self.args[0]} < {iterableVar}->len; {self.args[0]}++, {self.args[1]} = {iterableVar}->values[{self.args[0]}]) ')
+                    out.emit(self.code)
+                    out.write('}')
+                    return
             if self.iterable.type.type == 'map':
                 if len(self.args.args) == 1:
                     iterableVar = f'__iterable_{self.args[0]}'
                     iterableIndex = f'__iterable_index_{self.args[0]}'
-                    return f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[0].type} {self.args[0]} = {iterableVar}->entries[0].key; for (long {iterableIndex}=0; {iterableIndex} < {iterableVar}->len; {iterableIndex}++, {self.args[0]} = {iterableVar}->entries[{iterableIndex}].key) {self.code}}}'
+                    out.write(f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[0].type} {self.args[0]} = {iterableVar}->entries[0].key; for (long {iterableIndex}=0; {iterableIndex} < {iterableVar}->len; {iterableIndex}++, {self.args[0]} = {iterableVar}->entries[{iterableIndex}].key) ')
+                    out.emit(self.code)
+                    out.write('}')
+                    return
                 if len(self.args.args) == 2:
                     iterableVar = f'__iterable_{self.args[1]}'
                     iterableIndex = f'__iterable_index_{self.args[1]}'
-                    return f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[0].type} {self.args[0]} = {iterableVar}->entries[0].key;\n{self.args[1].type} {self.args[1]} = {iterableVar}->entries[0].val;\nfor (long {iterableIndex}=0; {iterableIndex} < {iterableVar}->len; {iterableIndex}++, {self.args[0]} = {iterableVar}->entries[{iterableIndex}].key, {self.args[1]} = {iterableVar}->entries[{iterableIndex}].val) {self.code}}}'
+                    out.write(f'{{{self.iterable.type} {iterableVar} = {self.iterable};\n{self.args[0].type} {self.args[0]} = {iterableVar}->entries[0].key;\n{self.args[1].type} {self.args[1]} = {iterableVar}->entries[0].val;\nfor (long {iterableIndex}=0; {iterableIndex} < {iterableVar}->len; {iterableIndex}++, {self.args[0]} = {iterableVar}->entries[{iterableIndex}].key, {self.args[1]} = {iterableVar}->entries[{iterableIndex}].val) ')
+                    out.emit(self.code)
+                    out.write('}')
+                    return
             if self.iterable.type.type == 'str':
                 if len(self.args.args) == 1:
                     iterableVar = f'__iterable_{self.args[0]}'
-                    return f'''{{{self.iterable.type} {iterableVar} = {self.iterable};\n;long __i = 0;char {self.args[0]}[] = " ";\nwhile({iterableVar}[__i] != '\\0') {{
+                    out.write(f'''{{{self.iterable.type} {iterableVar} = {self.iterable};\n;long __i = 0;char {self.args[0]}[] = " ";\nwhile({iterableVar}[__i] != '\\0') {{
                         int __len = mblen({iterableVar}+__i, 2);
                         for (int __j = 0; __j<__len;__j++) {{
                             {self.args[0]}[__j] = {iterableVar}[__i+__j];
                         }}
                         {self.args[0]}[__len] = '\\0';
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                         __i += __len;
                     }}}}
-                    '''
+                    ''')
+                    return
                 if len(self.args.args) == 2:
                     iterableVar = f'__iterable_{self.args[1]}'
                     iterableIndex = f'{self.args[0]}'
-                    return f'''{{{self.iterable.type} {iterableVar} = {self.iterable};\nlong {iterableIndex} = 0;long __i = 0; char {self.args[1]}[] = " ";\nwhile({iterableVar}[__i] != '\\0') {{
+                    out.write(f'''{{{self.iterable.type} {iterableVar} = {self.iterable};\nlong {iterableIndex} = 0;long __i = 0; char {self.args[1]}[] = " ";\nwhile({iterableVar}[__i] != '\\0') {{
                         int __len = mblen({iterableVar}+__i, 2);
                         for (int __j = 0; __j<__len;__j++) {{
                             {self.args[1]}[__j] = {iterableVar}[__i+__j];
                         }}
                         {self.args[1]}[__len] = '\\0';
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                         __i += __len;
                         {iterableIndex} += 1;
                     }}}}
-                    '''
+                    ''')
+                    return
             else:
                 raise TypeError('Iterable type is unknown')
         else:
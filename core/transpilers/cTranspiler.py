@@ -1,4 +1,5 @@
 from transpilers.baseTranspiler import BaseTranspiler
+from transpilers.emitter import Emitter
 from copy import deepcopy
 import os
 from string import Formatter
@@ -116,8 +117,10 @@ class Transpiler(BaseTranspiler):
                     self.renderListTemplate(valType)
                 for keyType, valType in self.dictTypes:
                     self.renderDictTemplate(keyType, valType)
-            for line in [''] + boilerPlateStart + [''] + [self.sequence] + boilerPlateEnd:
-                f.write(f'{line}\n')
+            out = Emitter(f)
+            for line in [''] + boilerPlateStart + [''] + [self.shakenSequence()] + boilerPlateEnd:
+                out.emit(line)
+                out.write('\n')
             f.write('#endif')
         debug('Generated ' + self.filename)
 
@@ -0,0 +1,64 @@
+class Emitter():
+    ''' Output sink the tokens write themselves into. Indentation is a
+        prefix written after every newline, so nested blocks are written
+        once instead of being re-split and re-indented at every level.
+        Without a sink the output is kept in memory, see getvalue.
+    '''
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.parts = []
+        self.prefix = ''
+        self.prefixes = []
+        self.held = 0
+
+    def write(self, text):
+        if self.prefix and '\n' in text:
+            text = text.replace('\n', '\n' + self.prefix)
+        if self.sink is None or self.held:
+            self.parts.append(text)
+        else:
+            self.sink.write(text)
+
+    def emit(self, obj):
+        emit = getattr(obj, 'emit', None)
+        if emit is None:
+            self.write(f'{obj}')
+        else:
+            emit(self)
+
+    def indent(self, indent):
+        self.prefixes.append(self.prefix)
+        self.prefix += indent
+
+    def dedent(self):
+        self.prefix = self.prefixes.pop()
+
+    def mark(self):
+        ''' Hold the output from here on in memory, so it can be inspected
+            or dropped before it reaches the sink. Return the position.
+        '''
+        self.held += 1
+        return len(self.parts)
+
+    def isBlank(self, position):
+        ''' Return if nothing but whitespace was written since position '''
+        parts = self.parts
+        return not any(parts[i].strip() for i in range(position, len(parts)))
+
+    def drop(self, position):
+        del self.parts[position:]
+
+    def release(self):
+        self.held -= 1
+        if not self.held and self.sink is not None and self.parts:
+            self.sink.write(''.join(self.parts))
+            self.parts.clear()
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+def render(obj):
+    ''' Emit obj into memory and return the text '''
+    out = Emitter()
+    out.emit(obj)
+    return out.getvalue()
@@ -0,0 +1,191 @@
+''' Constant folding. Operations on constants are computed while the
+    expressions are built, with the semantics of the target language,
+    and written as a literal. Anything that could turn out different
+    from running the unfolded code is left alone.
+'''
+from collections import Counter
+import math
+
+# Fold constant expressions, turned off by --no-fold
+ENABLED = True
+
+# Operations folded, variables replaced by their constant values and
+# constants written into format strings
+stats = Counter()
+
+# Exclusive bounds of a C long and of a C int, the type of the
+# number literals that fit in it
+LONG = 2**63
+INT = 2**31
+# Integers above it lose precision as a double, so as a JS number
+SAFE_INT = 2**53
+
+arithmetic = {'+', '-', '*', '/', '%', '**'}
+comparisons = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+}
+booleans = {'and', 'or'}
+
+class Long(int):
+    ''' An int a C long holds, where an int literal would overflow '''
+
+def variable(value, target):
+    ''' Return the constant as a variable of the target holds it '''
+    if target == 'c' and isinstance(value, int) and not isinstance(value, bool):
+        return Long(value)
+    return value
+
+def isNumber(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def literal(value, target):
+    ''' Return the source of a constant in the target language, or None
+        if it has none that means the same value
+    '''
+    if isinstance(value, bool):
+        if target == 'c':
+            return '1' if value else '0'
+        if target == 'py':
+            return 'True' if value else 'False'
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        if not -LONG < value < LONG:
+            return None
+        if target == 'js' and abs(value) > SAFE_INT:
+            return None
+        if target == 'c' and isinstance(value, Long) and -INT <= value < INT:
+            return f'{value}L'
+        return str(value)
+    if isinstance(value, float) and math.isfinite(value):
+        return repr(value)
+    return None
+
+def formatted(value, target):
+    ''' Return how a constant is printed in a format string of the
+        target, or None if it can't be known here
+    '''
+    if not isNumber(value) or literal(value, target) is None:
+        return None
+    if isinstance(value, int):
+        return str(value)
+    if target == 'c':
+        return '%g' % value
+    if target == 'py':
+        return repr(value)
+    # Numbers are printed by JS rules
+    return None
+
+def truncatedMod(a, b):
+    ''' Remainder with the sign of the dividend, as C and JS have it '''
+    r = abs(a) % abs(b)
+    return -r if a < 0 else r
+
+def binary(op, a, b, target):
+    ''' Return the value of a op b in the target, or None to leave it '''
+    if op in booleans:
+        if isinstance(a, bool) and isinstance(b, bool):
+            return (a and b) if op == 'and' else (a or b)
+        return None
+    if op in comparisons:
+        if isinstance(a, bool) != isinstance(b, bool):
+            return None
+        if mixesPrecision(a, b):
+            return None
+        return comparisons[op](a, b)
+    if op not in arithmetic or not (isNumber(a) and isNumber(b)):
+        return None
+    if mixesPrecision(a, b):
+        return None
+    if op == '+':
+        value = a + b
+    elif op == '-':
+        value = a - b
+    elif op == '*':
+        value = a * b
+    elif op == '/':
+        if b == 0:
+            return None
+        if target == 'c' and isinstance(a, int) and isinstance(b, int):
+            # Integer division in C, printed as a double
+            return None
+        value = a / b
+    elif op == '%':
+        if b == 0 or not (isinstance(a, int) and isinstance(b, int)):
+            return None
+        value = a % b if target == 'py' else truncatedMod(a, b)
+    elif op == '**':
+        value = power(a, b, target)
+        if value is None:
+            return None
+    if target == 'c' and isinstance(a, int) and isinstance(b, int):
+        return cInteger(value, a, b)
+    if target == 'js' and value == 0 and isinstance(value, int) \
+            and op in ('*', '/', '%') and (a < 0 or b < 0):
+        # Negative zero in JS
+        return None
+    return value
+
+def power(a, b, target):
+    if target == 'c':
+        # No operator for it in C
+        return None
+    if isinstance(a, int) and isinstance(b, int):
+        if b < 0 and target == 'js':
+            return None
+        if b > 0 and abs(a) > 1 and b * math.log2(abs(a)) >= 63:
+            # Too big for a literal, no point computing it
+            return None
+    elif target == 'js':
+        # Math.pow may round differently
+        return None
+    try:
+        value = a ** b
+    except (OverflowError, ZeroDivisionError):
+        return None
+    if isinstance(value, complex):
+        return None
+    return value
+
+def unary(op, a, target):
+    ''' Return the value of op a in the target, or None to leave it '''
+    if op == 'not':
+        return (not a) if isinstance(a, bool) else None
+    if op == '-' and isNumber(a):
+        if target == 'js' and a == 0 and isinstance(a, int):
+            return None
+        if target == 'c' and isinstance(a, int):
+            return cInteger(-a, a)
+        return -a
+    return None
+
+def concatenate(a, b, target):
+    ''' Return the literal joining two string literals, or None '''
+    if target == 'c':
+        # The sum is a new string on the heap, a literal is read only
+        return None
+    if '\\' in a or '\\' in b:
+        return None
+    return a[:-1] + b[1:]
+
+def cInteger(value, *operands):
+    ''' Return the result of an operation on C integers, or None if it
+        overflows. Literals that fit in an int are ints, so are the
+        operations between them.
+    '''
+    if any(isinstance(a, Long) or not -INT <= a < INT for a in operands):
+        return Long(value) if -LONG < value < LONG else None
+    return value if -INT <= value < INT else None
+
+def mixesPrecision(a, b):
+    ''' Return if an int too big for a double meets a float '''
+    if isinstance(a, float) and isinstance(b, int):
+        a, b = b, a
+    return isinstance(a, int) and isinstance(b, float) and abs(a) > SAFE_INT
+
+def report():
+    return f'FOLDS {stats["folded"]} folded {stats["propagated"]} propagated {stats["inlined"]} inlined'
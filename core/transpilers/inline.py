@@ -0,0 +1,170 @@
+''' Inlining of small functions. A function made of assignments to its
+    locals and a return is expanded into one expression where it is
+    called, with the arguments and locals written in place of their
+    names. Functions of the module the call is in and of the modules
+    it imports are inlined, and in C the getters of classes, methods
+    returning a field of the object, which are called through a field.
+'''
+from collections import Counter, namedtuple
+from collections.abc import Mapping
+
+# Inline small functions, turned off by --no-inline
+ENABLED = True
+# Most tokens the expanded expression of a function may have
+BUDGET = 40
+
+# Calls inlined and left, by function name and reason
+decisions = Counter()
+
+# Tokens an inlined function may be made of
+allowed = {'expr', 'var', 'num', 'floatNumber', 'str', 'bool', 'group', 'call', 'null'}
+
+# Types an inlined function may return. Casts to the others are
+# written without parenthesis around the expression.
+returnTypes = {'int', 'float', 'bool', 'str'}
+
+Candidate = namedtuple('Candidate', 'name params locals result uses calls')
+
+def candidate(struct):
+    ''' Return the Candidate of a func struct, or why it can't be inlined '''
+    if struct['kwargs']:
+        return 'kwargs'
+    params = []
+    for arg in struct['args']:
+        var = arg['args'][0] if arg.get('token') == 'expr' and len(arg['args']) == 1 else arg
+        if var.get('token') != 'var' or var.keys() - {'token', 'type', 'name'}:
+            return 'arguments'
+        params.append(var['name'])
+    block = [s for s in struct['block'] if s.get('token') != 'comment']
+    if not block or block[-1].get('token') != 'return' or block[-1].get('expr') is None:
+        return 'not a single return'
+    bound = set(params)
+    locals = []
+    for statement in block[:-1]:
+        target = statement.get('target', {})
+        if statement.get('token') != 'assign' or target.get('token') != 'var' \
+                or target.keys() - {'token', 'type', 'name'} or target['name'] in bound:
+            return 'statements'
+        reason = check(statement['expr'], bound, struct['name'])
+        if reason:
+            return reason
+        locals.append((target['name'], target['type'], statement['expr']))
+        bound.add(target['name'])
+    result = block[-1]['expr']
+    reason = check(result, bound, struct['name'])
+    if reason:
+        return reason
+    # Times each name ends up in the expanded expression
+    uses = Counter(names(result))
+    for name, _, value in reversed(locals):
+        for used, count in Counter(names(value)).items():
+            uses[used] += count * uses[name]
+    for name, _, value in locals:
+        if uses[name] != 1 and not isSimple(value):
+            return f'local {name} used {uses[name]} times'
+    size = tokens(result) + sum(tokens(value) * uses[name] for name, _, value in locals)
+    if size > BUDGET:
+        return f'size {size}'
+    calls = countCalls(result) + sum(countCalls(value) for _, _, value in locals)
+    if calls > 1:
+        # The order they run in could change
+        return 'calls'
+    return Candidate(struct['name'], params, locals, result, uses, calls)
+
+def getter(struct):
+    ''' Return the field a method without arguments returns, or None '''
+    if struct['args'] or struct['kwargs']:
+        return None
+    block = [s for s in struct['block'] if s.get('token') != 'comment']
+    if len(block) != 1 or block[0].get('token') != 'return' or block[0].get('expr') is None:
+        return None
+    expr = block[0]['expr']
+    if expr.get('token') == 'expr' and len(expr['args']) == 1 and not expr['ops']:
+        expr = expr['args'][0]
+    if expr.get('token') != 'dotAccess' or len(expr['dotAccess']) != 2:
+        return None
+    owner, field = expr['dotAccess']
+    for var in (owner, field):
+        if var.get('token') != 'var' or var.keys() - {'token', 'type', 'name'}:
+            return None
+    return field['name'] if owner['name'] == 'self' else None
+
+def check(struct, names, function):
+    ''' Return why an expression can't be inlined, or None '''
+    if isinstance(struct, list):
+        for s in struct:
+            reason = check(s, names, function)
+            if reason:
+                return reason
+        return None
+    if not isinstance(struct, Mapping):
+        return None
+    token = struct.get('token')
+    if token not in allowed:
+        return f'{token}'
+    if token == 'str' and struct.get('expressions'):
+        return 'format string'
+    if token == 'var':
+        if struct['name'] not in names or struct.keys() - {'token', 'type', 'name'}:
+            return f'uses {struct["name"]}'
+        return None
+    if token == 'call':
+        if struct['kwargs']:
+            return 'call with kwargs'
+        if struct['name'].get('name') == function:
+            return 'recursive'
+        return check(struct['args'], names, function)
+    return check(list(struct.values()), names, function)
+
+def names(struct):
+    ''' Yield the names of the variables of an expression '''
+    if isinstance(struct, Mapping):
+        if struct.get('token') == 'var':
+            yield struct['name']
+            return
+        for key, value in struct.items():
+            if not (key == 'name' and struct.get('token') == 'call'):
+                yield from names(value)
+    elif isinstance(struct, list):
+        for value in struct:
+            yield from names(value)
+
+def tokens(struct):
+    if isinstance(struct, Mapping):
+        return 1 + sum(tokens(value) for value in struct.values())
+    if isinstance(struct, list):
+        return sum(tokens(value) for value in struct)
+    return 0
+
+def countCalls(struct):
+    if isinstance(struct, Mapping):
+        return (struct.get('token') == 'call') + sum(countCalls(v) for v in struct.values())
+    if isinstance(struct, list):
+        return sum(countCalls(value) for value in struct)
+    return 0
+
+def isSimple(struct):
+    ''' Return if an expression can be written many times or not at all '''
+    while isinstance(struct, Mapping) and struct.get('token') == 'expr' \
+            and len(struct['args']) == 1 and not struct['ops']:
+        struct = struct['args'][0]
+    return isinstance(struct, Mapping) and struct.get('token') in ('var', 'num', 'floatNumber', 'bool') \
+        and struct.keys() <= {'token', 'type', 'name', 'value'}
+
+def substitute(struct, values):
+    ''' Return a copy of the expression with the variables in values
+        replaced by the processed tokens they hold
+    '''
+    if isinstance(struct, Mapping):
+        if struct.get('token') == 'var' and struct['name'] in values:
+            return {'token': 'inlined', 'value': values[struct['name']]()}
+        return {key: value if key == 'name' and struct.get('token') == 'call'
+            else substitute(value, values) for key, value in struct.items()}
+    if isinstance(struct, list):
+        return [substitute(value, values) for value in struct]
+    return struct
+
+def report():
+    inlined = ', '.join(f'{name} {n}' for (name, reason), n in sorted(decisions.items()) if reason == 'inlined')
+    left = ', '.join(f'{name} ({reason}) {n}' for (name, reason), n in sorted(decisions.items()) if reason != 'inlined')
+    return f'INLINED {inlined or "-"} NOT INLINED {left or "-"}'
@@ -116,6 +116,7 @@ class Var(Var):
         return self.name
 
 class Expr(Expr):
+    target = 'js'
     operatorOrder = [
         'not','**','*','%','/','-','+','==','!=','>','<','>=','<=',
         'is','in','andnot','and','or','&', '<<', '>>'
@@ -326,7 +327,7 @@ class Kwargs(Kwargs):
         return ', '.join([repr(kwarg) for kwarg in self.kwargs])
 
 class Call(Call):
-    def __repr__(self):
+    def render(self):
         if self.mode == 'format' and self.type.isClass:
             return f'"<class {self.type.type}>"'
         if self.signature:
@@ -369,8 +370,9 @@ class Print(Print):
         return f'console.log({self.args})'
 
 class Function(Function):
-    def expression(self):
-        return f'function {self.name}({self.args}{self.separator}{self.kwargs}) {self.code}'
+    def emitExpression(self, out):
+        out.write(f'function {self.name}({self.args}{self.separator}{self.kwargs}) ')
+        out.emit(self.code)
 
 class Class(Class):
     def formatNewMethod(self):
@@ -416,100 +418,130 @@ class Class(Class):
         return definition+value+self.postCode
 
 class Elif(Elif):
-    def __repr__(self):
-        return f'else if ({self.expr}) {self.block}'
+    def emit(self, out):
+        out.write(f'else if ({self.expr}) ')
+        out.emit(self.block)
 
 class Else(Else):
-    def __repr__(self):
-        return f'else {self.block}'
+    def emit(self, out):
+        out.write('else ')
+        out.emit(self.block)
 
 class If(If):
-    def __repr__(self):
-        return f'if ({self.expr}) {self.ifBlock}{"".join(repr(e) for e in self.elifs)}{self.elseBlock}'
+    def emit(self, out):
+        out.write(f'if ({self.expr}) ')
+        out.emit(self.ifBlock)
+        for e in self.elifs:
+            out.emit(e)
+        out.emit(self.elseBlock)
 
 class While(While):
-    def __repr__(self):
-        return f'while ({self.expr}) {self.block}'
+    def emit(self, out):
+        out.write(f'while ({self.expr}) ')
+        out.emit(self.block)
 
 class For(For):
-    def __repr__(self):
+    def emit(self, out):
         if isinstance(self.iterable, Range):
             if len(self.args.args) == 1:
-                return f'for (let {self.args[0]}={self.iterable.initial}; {self.args[0]} < {self.iterable.final}; {self.args[0]} += {self.iterable.step}) {self.code}'
+                out.write(f'for (let {self.args[0]}={self.iterable.initial}; {self.args[0]} < {self.iterable.final}; {self.args[0]} += {self.iterable.step}) ')
+                out.emit(self.code)
+                return
             if len(self.args.args) == 2:
-                return f'{{let {self.args[0]}=0; for ({self.args[1].type} {self.args[1]}={self.iterable.initial}; {self.args[1]} < {self.iterable.final}; {self.args[0]}++, {self.args[1]} += {self.iterable.step}) {self.code}}}'
+                out.write(f'{{let {self.args[0]}=0; for ({self.args[1].type} {self.args[1]}={self.iterable.initial}; {self.args[1]} < {self.iterable.final}; {self.args[0]}++, {self.args[1]} += {self.iterable.step}) ')
+                out.emit(self.code)
+                out.write('}')
+                return
         elif isinstance(self.iterable, Expr):
             if self.iterable.type.type == 'array':
                 if len(self.args.args) == 1:
                     iterableVar = f'__iterable_{self.args[0]}'
                     lenVar = f'__len_{self.args[0]}'
-                    return f'''
+                    out.write(f'''
                     let {iterableVar} = {self.iterable};
                     let {lenVar} = {iterableVar}.length;
                     for(let __i=0; __i<{lenVar}; __i++) {{
                         var {self.args[0]} = {iterableVar}[__i];
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                     }}
-                    '''
+                    ''')
+                    return
                 if len(self.args.args) == 2:
                     iterableVar = f'__iterable_{self.args[1]}'
                     lenVar = f'__len_{self.args[0]}'
-                    return f'''
+                    out.write(f'''
                     let {iterableVar} = {self.iterable};
                     let {lenVar} = {iterableVar}.length;
                     for(let {self.args[0]}=0; {self.args[0]}<{lenVar}; {self.args[0]}++) {{
                         var {self.args[1]} = {self.iterable}[{self.args[0]}];
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                     }}
-                    '''
+                    ''')
+                    return
             if self.iterable.type.type == 'map':
                 if len(self.args.args) == 1:
                     iterableVar = f'__iterable_{self.args[0]}'
                     lenVar = f'__len_{self.args[0]}'
-                    return f'''
+                    out.write(f'''
                     let {iterableVar} = Object.keys({self.iterable});
                     let {lenVar} = {iterableVar}.length;
                     for(let __i=0; __i<{lenVar}; __i++) {{
                         var {self.args[0]} = {iterableVar}[__i];
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                     }}
-                    '''
+                    ''')
+                    return
                 if len(self.args.args) == 2:
                     iterableVar = f'__iterable_{self.args[0]}'
                     iterableIndex = f'__iterable_index_{self.args[0]}'
                     lenVar = f'__len_{self.args[0]}'
-                    return f'''
+                    out.write(f'''
                     let {iterableVar} = Object.keys({self.iterable});
                     let {lenVar} = {iterableVar}.length;
                     for(let {iterableIndex}=0; {iterableIndex}<{lenVar}; {iterableIndex}++) {{
                         var {self.args[0]} = {iterableVar}[{iterableIndex}];
                         var {self.args[1]} = {self.iterable}[{self.args[0]}];
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                     }}
-                    '''
+                    ''')
+                    return
             if self.iterable.type.type == 'str':
                 if len(self.args.args) == 1:
                     iterableVar = f'__iterable_{self.args[0]}'
                     lenVar = f'__len_{self.args[0]}'
-                    return f'''
+                    out.write(f'''
                     let {iterableVar} = {self.iterable};
                     let {lenVar} = {iterableVar}.length;
                     for(let __i=0; __i<{lenVar}; __i++) {{
                         var {self.args[0]} = {iterableVar}[__i];
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                     }}
-                    '''
+                    ''')
+                    return
                 if len(self.args.args) == 2:
                     iterableVar = f'__iterable_{self.args[0]}'
                     lenVar = f'__len_{self.args[0]}'
-                    return f'''
+                    out.write(f'''
                     let {iterableVar} = {self.iterable};
                     let {lenVar} = {iterableVar}.length;
                     for(let {self.args[0]}=0; {self.args[0]}<{lenVar}; {self.args[0]}++) {{
                         var {self.args[1]} = {self.iterable}[{self.args[0]}];
-                        {self.code}
+                        ''')
+                    out.emit(self.code)
+                    out.write(f'''
                     }}
-                    '''
+                    ''')
+                    return
             else:
                 raise TypeError('Iterable type is unknown')
         else:
@@ -1,4 +1,5 @@
 from transpilers.baseTranspiler import BaseTranspiler
+from transpilers.emitter import Emitter
 import os
 
 def debug(*args):
@@ -46,6 +47,7 @@ class Transpiler(BaseTranspiler):
         else:
             boilerPlateStart = []
             boilerPlateEnd = []
+        sequence = self.shakenSequence()
         with open(f'Sources/js/{self.filename}', 'w') as f:
             for imp in self.imports:
                 module = imp.split(' ')[-1].replace('.w', '').replace('"', '')
@@ -54,10 +56,12 @@ class Transpiler(BaseTranspiler):
                     with open(f'Sources/js/{module}.js', 'r') as m:
                         for line in m:
                             f.write(line)
-                else:
+                elif self.isImportUsed(imp):
                     f.write(imp + '\n')
-            for line in [''] + boilerPlateStart + [self.sequence] + boilerPlateEnd:
-                f.write(f'{line}\n')
+            out = Emitter(f)
+            for line in [''] + boilerPlateStart + [sequence] + boilerPlateEnd:
+                out.emit(line)
+                out.write('\n')
         debug('Generated ' + self.filename)
 
     def run(self):
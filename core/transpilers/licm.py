@@ -0,0 +1,222 @@
+''' Loop invariant code motion. Field reads, lengths, items, casts and
+    format strings of a loop that read nothing the loop changes are
+    computed once before it, into a variable the loop reads instead.
+    Only the ones the loop is sure to run when it's entered are moved,
+    so nothing that could fail runs when it wouldn't have. Loops that
+    call functions are left alone, a call could change anything.
+'''
+from collections import Counter
+from collections.abc import Mapping
+
+# Hoist invariant expressions out of loops, turned off by --no-licm
+ENABLED = True
+
+# Expressions hoisted, loops they were hoisted from and loops left
+# because of what they do
+stats = Counter()
+
+# Types a hoisted expression may have
+types = {'int', 'float', 'bool', 'str'}
+
+# Tokens a loop may have. Reading a field or an item of a list or a
+# dict and printing change nothing, the rest of the calls may.
+allowed = {
+    'expr', 'var', 'num', 'floatNumber', 'str', 'bool', 'null', 'group',
+    'dotAccess', 'cast', 'array', 'map', 'keyVal', 'range', 'type',
+    'assign', 'augAssign', 'delete', 'if', 'while', 'for', 'forTarget',
+    'printFunc', 'breakStatement', 'continueStatement', 'return', 'comment',
+}
+
+# Tokens that make an expression worth a variable. Plain arithmetic on
+# variables costs less than the variable.
+costly = {'dotAccess', 'cast'}
+
+class Changes():
+    ''' What the statements of a loop may change: the variables they
+        assign, whole or an item of, the ones assigned whole, the fields
+        they assign, by name as any object could be the one assigned,
+        and if they assign or delete any item, so of any list or dict
+    '''
+    def __init__(self, loop):
+        self.names = set()
+        self.bound = set()
+        self.fields = set()
+        self.items = False
+        self.deletes = False
+        self.known = self.scan(loop)
+
+    def scan(self, struct):
+        if isinstance(struct, list):
+            return all(self.scan(s) for s in struct)
+        if not isinstance(struct, Mapping):
+            return True
+        token = struct.get('token')
+        if token not in allowed:
+            return False
+        if token in ('assign', 'augAssign'):
+            self.assigned(struct['target'])
+        elif token == 'delete':
+            self.deletes = True
+            for arg in struct['expr']['args']:
+                self.assigned(arg)
+        elif token == 'for':
+            for var in struct['vars']:
+                self.assigned(var)
+        return all(self.scan(value) for value in struct.values())
+
+    def assigned(self, target):
+        if target.get('token') == 'var':
+            self.names.add(target['name'])
+            if 'indexAccess' in target:
+                self.items = True
+            else:
+                self.bound.add(target['name'])
+        elif target.get('token') == 'dotAccess':
+            chain = target['dotAccess']
+            self.fields.add(chain[-1].get('name'))
+            self.items = self.items or any('indexAccess' in t for t in chain)
+
+    def invariant(self, struct):
+        ''' Return if an expression is the same every time the loop runs it '''
+        if isinstance(struct, list):
+            return all(self.invariant(s) for s in struct)
+        if not isinstance(struct, Mapping):
+            return True
+        token = struct.get('token')
+        if token == 'var':
+            return struct['name'] not in self.names and self.invariantItem(struct)
+        if token == 'dotAccess':
+            first, *fields = struct['dotAccess']
+            if not self.invariant(first):
+                return False
+            for field in fields:
+                if field.get('token') != 'var' or field['name'] in self.fields \
+                        or (field['name'] == 'len' and self.items) or not self.invariantItem(field):
+                    return False
+            return True
+        if token in ('expr', 'group', 'cast', 'str', 'num', 'floatNumber', 'bool', 'null'):
+            return all(self.invariant(value) for key, value in struct.items() if key != 'type')
+        # A new list or map each time
+        return False
+
+    def invariantItem(self, var):
+        if 'indexAccess' not in var:
+            return True
+        return not self.items and self.invariant(var['indexAccess'])
+
+def worth(struct):
+    ''' Return if an expression does more than reading variables '''
+    if isinstance(struct, list):
+        return any(worth(s) for s in struct)
+    if not isinstance(struct, Mapping):
+        return False
+    token = struct.get('token')
+    if token in costly or 'indexAccess' in struct or (token == 'str' and struct.get('expressions')):
+        return True
+    return any(worth(value) for value in struct.values())
+
+def evaluated(struct):
+    ''' Return the args of an expr that are evaluated whatever their
+        values, the ones before the first and or or
+    '''
+    args, ops = struct['args'], struct['ops']
+    for i, op in enumerate(ops):
+        if op in ('and', 'or'):
+            # Unary operators don't line up with the args
+            return args[:i + 1] if len(ops) == len(args) - 1 else args[:1]
+    return args
+
+def collect(struct, changes, found):
+    ''' Add to found the largest invariant expressions of an expression
+        sure to be evaluated
+    '''
+    if not isinstance(struct, Mapping):
+        return
+    if changes.invariant(struct) and worth(struct):
+        found.append(struct)
+        return
+    token = struct.get('token')
+    if token == 'expr':
+        for arg in evaluated(struct):
+            collect(arg, changes, found)
+    elif token in ('group', 'cast'):
+        collect(struct['expr'], changes, found)
+    elif token == 'str':
+        for expr in struct.get('expressions', []):
+            collect(expr, changes, found)
+    elif token == 'var' and 'indexAccess' in struct:
+        collect(struct['indexAccess'], changes, found)
+    elif token == 'dotAccess':
+        for t in struct['dotAccess']:
+            if 'indexAccess' in t:
+                collect(t['indexAccess'], changes, found)
+
+def invariants(loop, boundsOnce=False):
+    ''' Return the invariant expressions of a while or for loop, the
+        ones evaluated before it starts and the ones its first run
+        evaluates, and the condition its first run needs, or None.
+        Targets that evaluate the bounds of a range once, like python,
+        keep them in the loop.
+    '''
+    changes = Changes(loop)
+    if not changes.known:
+        stats['left'] += 1
+        return None
+    always, first, guard = [], [], None
+    if loop['token'] == 'while':
+        collect(loop['expr'], changes, always)
+        guard = loop['expr']
+    elif loop['iterable'].get('token') == 'range':
+        bounds = loop['iterable']
+        if not boundsOnce:
+            collect(bounds['to'], changes, always)
+            if 'step' in bounds:
+                collect(bounds['step'], changes, always)
+        else:
+            guard = {'token': 'expr', 'type': 'unknown', 'ops': ['<'], 'args': [
+                {'token': 'group', 'type': 'unknown', 'expr': bounds['from']},
+                {'token': 'group', 'type': 'unknown', 'expr': bounds['to']},
+            ]}
+    if guard is not None:
+        for statement in loop['block']:
+            token = statement.get('token')
+            if token == 'comment':
+                continue
+            if token in ('assign', 'augAssign', 'return'):
+                collect(statement['expr'], changes, first)
+            elif token == 'printFunc':
+                for arg in statement['args']:
+                    collect(arg, changes, first)
+            if token not in ('assign', 'augAssign', 'printFunc'):
+                break
+    return always, first, guard
+
+def expression(struct):
+    ''' Return an invariant as an expr to assign '''
+    if struct.get('token') == 'expr':
+        return struct
+    return {'token': 'expr', 'type': 'unknown', 'args': [struct], 'ops': []}
+
+def key(struct):
+    ''' Return what tells an expression apart, to assign it once '''
+    if isinstance(struct, Mapping):
+        return tuple(sorted((k, key(value)) for k, value in struct.items()))
+    if isinstance(struct, list):
+        return tuple(key(value) for value in struct)
+    return struct
+
+def replace(struct, names):
+    ''' Return a copy of a struct with the expressions in names, by id,
+        replaced by the variables they are assigned to
+    '''
+    if isinstance(struct, Mapping):
+        if id(struct) in names:
+            var = {'token': 'var', 'type': 'unknown', 'name': names[id(struct)]}
+            return expression(var) if struct.get('token') == 'expr' else var
+        return {key: replace(value, names) for key, value in struct.items()}
+    if isinstance(struct, list):
+        return [replace(value, names) for value in struct]
+    return struct
+
+def report():
+    return f'HOISTED {stats["hoisted"]} hoisted from {stats["loops"]} loops {stats["left"]} loops left'
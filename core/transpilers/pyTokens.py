@@ -55,11 +55,20 @@ class Group(Group):
 class Scope(Scope):
     beginSymbol = ':'
     endSymbol = ''
-    def __repr__(self):
-        if repr(self.sequence).strip():
-            return super().__repr__()
-        else:
-            return f':\n{self.indent}pass\n'
+    def emit(self, out):
+        out.write(self.beginSymbol)
+        out.indent(self.indent)
+        out.write('\n')
+        # An empty block needs a pass, which is only known once the
+        # block is written, so it is held back from the sink until then
+        position = out.mark()
+        self.sequence.emit(out)
+        if out.isBlank(position):
+            out.drop(position)
+            out.write('pass')
+        out.release()
+        out.dedent()
+        out.write(f'\n{self.endSymbol}')
 
 class NativeCode(NativeCode):
     pass
@@ -119,6 +128,7 @@ class Var(Var):
         return self.name
 
 class Expr(Expr):
+    target = 'py'
     operatorOrder = [
         'not','**','*','%','/','-','+','==','!=','>','<','>=','<=',
         'is','in','andnot','and','or','&', '<<', '>>'
@@ -326,7 +336,7 @@ class Kwargs(Kwargs):
         return ', '.join([repr(kwarg) for kwarg in self.kwargs])
 
 class Call(Call):
-    def __repr__(self):
+    def render(self):
         if self.mode == 'format' and self.type.isClass:
             return f'"<class {self.type.type}>"'
         if self.signature:
@@ -369,8 +379,9 @@ class Print(Print):
         return f'print({self.args})'
 
 class Function(Function):
-    def expression(self):
-        return f'def {self.name}({self.args}{self.separator}{self.kwargs}) -> {self.name.type} {self.code}'
+    def emitExpression(self, out):
+        out.write(f'def {self.name}({self.args}{self.separator}{self.kwargs}) -> {self.name.type} ')
+        out.emit(self.code)
 
 class Class(Class):
     def formatNewMethod(self):
@@ -405,44 +416,67 @@ class Class(Class):
         return value+self.postCode
 
 class Elif(Elif):
-    def __repr__(self):
-        return f'elif {self.expr} {self.block}'
+    def emit(self, out):
+        out.write(f'elif {self.expr} ')
+        out.emit(self.block)
 
 class Else(Else):
-    def __repr__(self):
-        return f'else {self.block}'
+    def emit(self, out):
+        out.write('else ')
+        out.emit(self.block)
 
 class If(If):
-    def __repr__(self):
-        return f'if {self.expr} {self.ifBlock}{"".join(repr(e) for e in self.elifs)}{self.elseBlock}'
+    def emit(self, out):
+        out.write(f'if {self.expr} ')
+        out.emit(self.ifBlock)
+        for e in self.elifs:
+            out.emit(e)
+        out.emit(self.elseBlock)
 
 class While(While):
-    def __repr__(self):
-        return f'while {self.expr} {self.block}'
+    def emit(self, out):
+        out.write(f'while {self.expr} ')
+        out.emit(self.block)
 
 class For(For):
-    def __repr__(self):
+    def emit(self, out):
         if isinstance(self.iterable, Range):
             if len(self.args.args) == 1:
-                return f'for {self.args[0]} in range({self.iterable.initial}, {self.iterable.final}, {self.iterable.step}) {self.code}'
+                out.write(f'for {self.args[0]} in range({self.iterable.initial}, {self.iterable.final}, {self.iterable.step}) ')
+                out.emit(self.code)
+                return
             if len(self.args.args) == 2:
-                return f'for {self.args[0]}, {self.args[1]} in enumerate(range({self.iterable.initial}, {self.iterable.final}, {self.iterable.step})) {self.code}'
+                out.write(f'for {self.args[0]}, {self.args[1]} in enumerate(range({self.iterable.initial}, {self.iterable.final}, {self.iterable.step})) ')
+                out.emit(self.code)
+                return
         elif isinstance(self.iterable, Expr):
             if self.iterable.type.type == 'array':
                 if len(self.args.args) == 1:
-                    return f'for {self.args[0]} in {self.iterable} {self.code}'
+                    out.write(f'for {self.args[0]} in {self.iterable} ')
+                    out.emit(self.code)
+                    return
                 if len(self.args.args) == 2:
-                    return f'for {self.args[0]}, {self.args[1]} in enumerate({self.iterable}) {self.code}'
+                    out.write(f'for {self.args[0]}, {self.args[1]} in enumerate({self.iterable}) ')
+                    out.emit(self.code)
+                    return
             if self.iterable.type.type == 'map':
                 if len(self.args.args) == 1:
-                    return f'for {self.args[0]} in {self.iterable} {self.code}'
+                    out.write(f'for {self.args[0]} in {self.iterable} ')
+                    out.emit(self.code)
+                    return
                 if len(self.args.args) == 2:
-                    return f'for {self.args[0]}, {self.args[1]} in {self.iterable}.items() {self.code}'
+                    out.write(f'for {self.args[0]}, {self.args[1]} in {self.iterable}.items() ')
+                    out.emit(self.code)
+                    return
             if self.iterable.type.type == 'str':
                 if len(self.args.args) == 1:
-                    return f'for {self.args[0]} in {self.iterable} {self.code}'
+                    out.write(f'for {self.args[0]} in {self.iterable} ')
+                    out.emit(self.code)
+                    return
                 if len(self.args.args) == 2:
-                    return f'for {self.args[0]}, {self.args[1]} in enumerate({self.iterable}) {self.code}'
+                    out.write(f'for {self.args[0]}, {self.args[1]} in enumerate({self.iterable}) ')
+                    out.emit(self.code)
+                    return
             else:
                 raise TypeError('Iterable type is unknown')
         else:
@@ -0,0 +1,84 @@
+''' Tree shaking. The top level functions and classes that the rest of
+    the program never names are left out of the generated code. Imported
+    modules bring every definition they have, so most of them go here.
+    Names are looked up in the rendered code, the same in every target.
+    In C methods are functions of their own, called through a field of
+    the object named like the method, so they go too.
+'''
+from collections import Counter
+import re
+
+# Drop the definitions nothing reaches, turned off by --no-shake
+ENABLED = True
+
+# Definitions kept and dropped, imports dropped
+stats = Counter()
+
+identifier = re.compile(r'[A-Za-z_]\w*')
+# Whole line comments, like the ones modules are written as, by the
+# language of the transpiler. A line starting with # in C is a
+# preprocessor line, with names in it.
+comments = {'python': re.compile(r'^\s*#.*$', re.MULTILINE)}
+lineComment = re.compile(r'^\s*//.*$', re.MULTILINE)
+# Imports of native modules, with the name they bind
+importLines = [
+    re.compile(r'import (\w+)$'),
+    re.compile(r'from [\w.]+ import (\w+)$'),
+    re.compile(r'(?:var )?(\w+) = require\('),
+]
+
+def names(text, lang):
+    ''' Return the names a rendered code uses, with the namespaces they
+        are in, so a constructor or a method reaches its class, and the
+        last part of each, so a method called by its full name reaches
+        the field it's defined as
+    '''
+    found = set()
+    for name in set(identifier.findall(comments.get(lang, lineComment).sub('', text))):
+        parts = name.split('__')
+        for end in range(1, len(parts) + 1):
+            found.add('__'.join(parts[:end]))
+        found.add(parts[-1])
+    return found
+
+def shake(items, lang):
+    ''' Return which of items, a list of (name defined or None, text), the
+        items defining nothing reach, and the names the ones kept use
+    '''
+    definitions = {}
+    used = []
+    for i, (name, text) in enumerate(items):
+        if name is None:
+            used.extend(names(text, lang))
+        else:
+            definitions.setdefault(name, []).append(i)
+    kept = [name is None for name, _ in items]
+    reached = set()
+    while used:
+        name = used.pop()
+        if name in reached:
+            continue
+        reached.add(name)
+        for i in definitions.get(name, ()):
+            kept[i] = True
+            used.extend(names(items[i][1], lang))
+    for (name, _), keep in zip(items, kept):
+        if name is not None:
+            stats['kept' if keep else 'dropped'] += 1
+    return kept, reached
+
+def isUsed(line, used):
+    ''' Return if an import line binds a name in used, or binds nothing
+        known and has to stay
+    '''
+    for pattern in importLines:
+        match = pattern.match(line)
+        if match:
+            if match.group(1) in used:
+                return True
+            stats['imports'] += 1
+            return False
+    return True
+
+def report():
+    return f'SHAKEN {stats["dropped"]} dropped {stats["kept"]} kept {stats["imports"]} imports dropped'
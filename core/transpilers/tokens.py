@@ -1,6 +1,14 @@
 # Basic Types
-from copy import deepcopy
 from pprint import pprint
+from .emitter import Emitter, render
+from . import fold
+from collections import Counter
+from copy import copy
+
+# Renders of the tokens that cache their text and renders answered
+# from a token's cache
+renderStats = Counter()
+missing = object()
 
 class Comment():
     def __repr__(self):
@@ -73,6 +81,9 @@ class Module():
         self.links = []
         self.imports = []
         self.scope = scope
+        # The transpiler of a Photon module, that expands its functions
+        # where the importing module calls them
+        self.engine = None
 
     def __repr__(self):
         return f'#module {self.name}'
@@ -110,11 +121,16 @@ class Scope():
     def __len__(self):
         return len(self.sequence)
 
+    def emit(self, out):
+        out.write(self.beginSymbol)
+        out.indent(self.indent)
+        out.write('\n')
+        self.sequence.emit(out)
+        out.dedent()
+        out.write(f'\n{self.endSymbol}')
+
     def __repr__(self):
-        return f'{self.beginSymbol}\n' + '\n'.join(
-            [self.indent + r 
-                for r in repr(self.sequence).split('\n')]
-        ) + f'\n{self.endSymbol}'
+        return render(self)
 
     def extend(self, scope):
         self.sequence = self.sequence + scope.sequence
@@ -177,6 +193,57 @@ class Obj():
     def index(self):
         return None
 
+class CachedObj(Obj):
+    ''' Obj that keeps its costly renders, by mode. While it keeps any
+        it is a Watched one, that clears them when a field is assigned
+        and makes the texts cached before stale, as they may hold the
+        text of this token. Tokens that keep none assign at full speed.
+    '''
+    # Bumped when a token with cached texts changes
+    generation = 0
+    rendered = None
+    # Watched class of each class
+    watched = {}
+
+    def __getstate__(self):
+        # Copies render again
+        state = self.__dict__.copy()
+        state.pop('rendered', None)
+        return state
+
+    def cachedRender(self, key, render):
+        ''' Return the text render returns, from the cache of the key
+            while no token with cached texts changed
+        '''
+        rendered = self.rendered
+        if rendered is not None:
+            cached = rendered.get(key)
+            if cached is not None and cached[0] == CachedObj.generation:
+                renderStats['saved'] += 1
+                return cached[1]
+        renderStats['rendered'] += 1
+        text = render()
+        # Rendering may have assigned fields and cleared the cache
+        rendered = self.rendered
+        if rendered is None:
+            cls = self.__class__
+            if cls not in CachedObj.watched:
+                CachedObj.watched[cls] = type(cls.__name__, (Watched, cls), {'unwatched': cls})
+            self.__class__ = CachedObj.watched[cls]
+            rendered = self.__dict__['rendered'] = {}
+        rendered[key] = (CachedObj.generation, text)
+        return text
+
+class Watched():
+    def __setattr__(self, name, value):
+        fields = self.__dict__
+        # The mode is part of the key
+        if name != 'mode' and fields.get(name, missing) is not value:
+            del fields['rendered']
+            object.__setattr__(self, '__class__', self.unwatched)
+            CachedObj.generation += 1
+        fields[name] = value
+
 class Bool(Obj):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -211,6 +278,8 @@ class Var(Obj):
         super().__init__(*args, **kwargs)
         self.indexAccess = indexAccess
         self.attribute = attribute
+        # The index is known to be in the bounds of the list
+        self.inBounds = False
         self.prepare()
 
     def prepare(self):
@@ -266,7 +335,57 @@ class Var(Obj):
             return f'{self.namespace}__{self.value}'
         return f'{self.value}'
 
-class Expr(Obj):
+def precedenceClimb(elements, ops, ranks, combine, rightAssociative=()):
+    ''' Combine the elements with the binary ops between them in one
+        pass. Lower ranks bind tighter and equal ranks associate to the
+        left, unless the op is right associative. An op without a rank
+        ends the expression.
+    '''
+    operands = [elements[0]]
+    pending = []
+    for n, op in enumerate(ops):
+        rank = ranks.get(op)
+        if rank is None:
+            break
+        while pending and (ranks[pending[-1]] < rank
+                or ranks[pending[-1]] == rank and op not in rightAssociative):
+            right = operands.pop()
+            operands[-1] = combine(pending.pop(), operands[-1], right)
+        pending.append(op)
+        operands.append(elements[n+1])
+    while pending:
+        right = operands.pop()
+        operands[-1] = combine(pending.pop(), operands[-1], right)
+    return operands[0]
+
+def constantOf(token):
+    ''' Return the value of a constant number or of a folded expression,
+        None if the token is anything else
+    '''
+    if isinstance(token, Expr):
+        if token.folded is not None:
+            return token.folded
+        if isinstance(token.value, (Num, Group, Expr)):
+            return constantOf(token.value)
+    elif isinstance(token, Group):
+        return constantOf(token.expr)
+    elif isinstance(token, Num):
+        text = f'{token.value}'
+        try:
+            if token.type.type == 'int':
+                # A leading zero is an octal number in C
+                return int(text) if text == '0' or not text.startswith('0') else None
+            if token.type.type == 'float':
+                return float(text)
+        except ValueError:
+            return None
+    return None
+
+class Expr(CachedObj):
+    # Language the folded constants are written in, None to not fold
+    target = None
+    # Value of the constant the expression was folded into
+    folded = None
     operatorOrder = [
         'not','**','*','%','/','-','+','==','!=','>','<','>=','<=',
         'is','in','andnot','and','or','&', '<<', '>>'
@@ -276,6 +395,24 @@ class Expr(Obj):
         'or': '||',
         'not': '!',
     }
+    operatorRanks = {op: rank for rank, op in enumerate(operatorOrder)}
+    # How the targets group the operators that can be folded. The code
+    # is written without the groups photon gives them, so the constant
+    # parts are the ones the target sees.
+    foldRanks = {
+        '**': 0,
+        '*': 1, '/': 1, '%': 1,
+        '+': 2, '-': 2,
+        '==': 3, '!=': 3, '>': 3, '<': 3, '>=': 3, '<=': 3,
+        'and': 4,
+        'or': 5,
+    }
+    comparisons = {'==', '!=', '>', '<', '>=', '<='}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.operatorRanks = {op: rank for rank, op in enumerate(cls.operatorOrder)}
+
     def __init__(self, *elements, ops=None, **kwargs):
         super().__init__(**kwargs)
         self.elements = list(elements)
@@ -294,31 +431,29 @@ class Expr(Obj):
         self.imports = self.value.imports
 
     def process(self):
-        ops = self.ops.copy()
-        elements = deepcopy(self.elements)
+        elements = self.elements
         if len(elements) == 1 and len(self.ops) == 1:
-            if self.ops[0] == 'not':
-                elements[0] = Expr(value=f'{self.opConversions["not"]} {elements[0]}', type=Type('bool'))
+            folded = self.foldUnary(self.ops[0], elements[0])
+            if folded is not None:
+                elements = [folded]
+                self.ops = []
+            elif self.ops[0] == 'not':
+                elements = [Expr(value=f'{self.opConversions["not"]} {elements[0]}', type=Type('bool'))]
                 self.ops = []
             elif self.ops[0] == '-':
-                elements[0] = Expr(value=f'-{elements[0]}', type=elements[0].type)
+                elements = [Expr(value=f'-{elements[0]}', type=elements[0].type)]
                 self.ops = []
+            value = elements[0]
         else:
             self.type = 'unknown'
-            for op in self.operatorOrder:
-                while op in ops:
-                    index = ops.index(op)
-                    arg1 = elements[index]
-                    arg2 = elements[index+1]
-                    elements[index] = self.operations(op, arg1, arg2)
-                    del ops[index]
-                    del elements[index+1]
-        self.value = elements[0]
-        self.namespace = elements[0].namespace
-        self.type = elements[0].type
-        self.indexAccess = getattr(elements[0], 'indexAccess', None)
+            elements, ops = self.foldConstants(elements, self.ops)
+            value = precedenceClimb(elements, ops, self.operatorRanks, self.operations)
+        self.value = value
+        self.namespace = value.namespace
+        self.type = value.type
+        self.indexAccess = getattr(value, 'indexAccess', None)
 
-    def operations(self, op, arg1, arg2):
+    def operationType(self, op, arg1, arg2):
         t = None
         intOrFloat = [Type('int'), Type('float')]
         if op in ['+', '-','*','**']:
@@ -334,6 +469,10 @@ class Expr(Obj):
             t = Type('int')
         elif op in ['not','==','!=','>','<','>=','<=','in','and','or']:
             t = Type('bool')
+        return t
+
+    def operations(self, op, arg1, arg2):
+        t = self.operationType(op, arg1, arg2)
         if op in self.opConversions:
             op = self.opConversions[op]
         if arg1.type == Type('str') and op == '+':
@@ -345,17 +484,98 @@ class Expr(Obj):
     def concatenate(self, arg1, arg2, t):
         return Expr(value=f'__photon_format_str("%s%s", {arg1}, {arg2})', type=t)
 
+    def foldConstants(self, elements, ops):
+        ''' Return the elements and ops with the constant parts folded '''
+        if not fold.ENABLED or self.target is None or not ops \
+                or not all(op in self.foldRanks for op in ops):
+            return elements, ops
+        tree = precedenceClimb(elements, ops, self.foldRanks,
+            lambda op, left, right: (op, left, right), rightAssociative={'**'})
+        items = self.foldNode(tree)
+        return items[::2], items[1::2]
+
+    def foldNode(self, node, inComparison=False):
+        ''' Return the elements and ops of a node of the tree, as a
+            single element if it is constant
+        '''
+        if not isinstance(node, tuple):
+            return [node]
+        op, left, right = node
+        comparison = op in self.comparisons
+        leftItems = self.foldNode(left, comparison)
+        rightItems = self.foldNode(right, comparison)
+        # Chained comparisons are grouped differently by each target
+        chained = comparison and (inComparison
+            or isinstance(left, tuple) and left[0] in self.comparisons
+            or isinstance(right, tuple) and right[0] in self.comparisons)
+        if len(leftItems) == 1 and len(rightItems) == 1 and not chained:
+            folded = self.fold(op, leftItems[0], rightItems[0])
+            if folded is not None:
+                return [folded]
+        return leftItems + [op] + rightItems
+
+    def fold(self, op, arg1, arg2):
+        ''' Return the constant expression arg1 op arg2 is, or None '''
+        if op == '+' and isinstance(arg1, String) and isinstance(arg2, String):
+            return self.constantString(arg1, arg2)
+        a = constantOf(arg1)
+        b = constantOf(arg2)
+        if a is None or b is None:
+            return None
+        t = self.operationType(op, arg1, arg2)
+        return self.constant(fold.binary(op, a, b, self.target), t)
+
+    def foldUnary(self, op, arg):
+        if not fold.ENABLED or self.target is None:
+            return None
+        a = constantOf(arg)
+        if a is None:
+            return None
+        t = Type('bool') if op == 'not' else arg.type
+        return self.constant(fold.unary(op, a, self.target), t)
+
+    def constantString(self, arg1, arg2):
+        if arg1.expressions or arg2.expressions:
+            return None
+        value = fold.concatenate(arg1.value, arg2.value, self.target)
+        if value is None:
+            return None
+        fold.stats['folded'] += 1
+        string = copy(arg1)
+        string.value = value
+        return string
+
+    def constant(self, value, t):
+        ''' Return an expression with the literal of value, or None
+            if it has no literal in the target
+        '''
+        if value is None:
+            return None
+        text = fold.literal(value, self.target)
+        if text is None:
+            return None
+        fold.stats['folded'] += 1
+        expr = Expr(value=text, type=t)
+        expr.folded = value
+        return expr
+
     def __repr__(self):
+        return self.cachedRender(self.mode, self.render)
+
+    def render(self):
         self.prepare()
         return repr(self.value)
 
     @property
     def index(self):
-        self.prepare()
         if len(self.elements) == 1:
-            return self.value.index
+            return self.cachedRender('index', self.valueIndex)
         return super().index
 
+    def valueIndex(self):
+        self.prepare()
+        return self.value.index
+
 class Delete():
     def __init__(self, expr):
         self.expr = expr
@@ -576,15 +796,17 @@ class Sequence():
             return Sequence(self.sequence + sequence.sequence)
         raise ValueError(f'Object of type {type(sequence)} cannot be added to Sequence.')
 
-    def __repr__(self):
-        representation = ''
+    def emit(self, out):
         for obj in self.sequence:
             if isinstance(obj, Expr):
                 obj.mode = 'declaration'
             if self.apply:
                 obj = self.apply(obj)
-            representation += f'{obj}{self.terminator}\n'
-        return representation
+            out.emit(obj)
+            out.write(f'{self.terminator}\n')
+
+    def __repr__(self):
+        return render(self)
 
     def __len__(self):
         return len(self.sequence)
@@ -688,6 +910,11 @@ class Args():
             arg.mode = self.mode
     
     def __bool__(self):
+        # Two or more args always join to some text,
+        # only a single one has to be rendered to know
+        if len(self.args) != 1:
+            self.prepare()
+            return len(self.args) > 1
         return True if repr(self) else False
 
     def __getitem__(self, index):
@@ -715,6 +942,9 @@ class Kwargs():
             kwarg.mode = mode
 
     def __bool__(self):
+        if len(self.kwargs) != 1:
+            self.prepare()
+            return len(self.kwargs) > 1
         return True if repr(self) else False
 
     def __repr__(self):
@@ -723,7 +953,7 @@ class Kwargs():
             return ', '.join([repr(kwarg.value) for kwarg in self.kwargs])
         return ', '.join([repr(kwarg) for kwarg in self.kwargs])
 
-class Call(Obj):
+class Call(CachedObj):
     def __init__(self, name='', args='', kwargs='', signature='', namespace='', **defaults):
         super().__init__(**defaults)
         self.name = name
@@ -737,6 +967,10 @@ class Call(Obj):
         self.name.namespace = self.namespace
 
     def __repr__(self):
+        # Methods get their instance inserted in their args
+        return self.cachedRender((self.mode, *map(id, self.args.args)), self.render)
+
+    def render(self):
         if self.mode == 'format' and self.type.isClass:
             return f'"<class {self.type.type}>"'
         if self.signature:
@@ -804,6 +1038,18 @@ class Function(Obj):
         raise NotImplemented 
 
     def expression(self):
+        out = Emitter()
+        self.emitExpression(out)
+        return out.getvalue()
+
+    def emit(self, out):
+        if self.mode == 'expr':
+            self.prepare()
+            self.emitExpression(out)
+        else:
+            out.write(repr(self))
+
+    def emitExpression(self, out):
         raise NotImplemented
 
     @property
@@ -821,6 +1067,8 @@ class Class():
         self.parameters = parameters
         self.methods = methods if methods is not None else {}
         self.new = new
+        # Methods left out of the written class, nothing calls them
+        self.dropped = set()
         self.formatNewMethod()
         self.postCode = ''
 
@@ -851,16 +1099,22 @@ class Elif():
         self.expr = expr
         self.block = Scope(block)
 
-    def __repr__(self):
+    def emit(self, out):
         raise NotImplemented
 
+    def __repr__(self):
+        return render(self)
+
 class Else():
     def __init__(self, block):
         self.block = Scope(block)
 
-    def __repr__(self):
+    def emit(self, out):
         raise NotImplemented
 
+    def __repr__(self):
+        return render(self)
+
 class If():
     def __init__(self, expr, ifBlock, elifs=None, elseBlock=None):
         self.expr = expr
@@ -868,9 +1122,12 @@ class If():
         self.elifs = elifs
         self.elseBlock = Else(elseBlock) if elseBlock is not None else ''
 
-    def __repr__(self):
+    def emit(self, out):
         raise NotImplemented
 
+    def __repr__(self):
+        return render(self)
+
     @property
     def index(self):
         return None
@@ -880,9 +1137,12 @@ class While():
         self.expr = expr
         self.block = Scope(block)
 
-    def __repr__(self):
+    def emit(self, out):
         raise NotImplemented
 
+    def __repr__(self):
+        return render(self)
+
     @property
     def index(self):
         return None
@@ -895,6 +1155,9 @@ class For():
         self.imports = []
 
     def __repr__(self):
+        return render(self)
+
+    def emit(self, out):
         #TODO break each type of for into different methods
         # so this logic won't be replicated to different targets
         if isinstance(self.iterable, Range):
@@ -0,0 +1,4 @@
+# Photon version
+# Used by the command-line interface and to key the parse cache.
+
+__version__ = '0.0.10'
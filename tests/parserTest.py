@@ -1,7 +1,18 @@
 import sys, os
 sys.path.insert(1, os.path.pardir+'/core')
 from photonParser import parse
+from lexer import Token, kindCodes
 from interpreter import Interpreter
+from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+import interpreter
+import photonParser
+import parseCache
+from transpilers.tokens import Expr, precedenceClimb
+from transpilers.baseTranspiler import CurrentScope
+import pickle
+from copy import deepcopy
+import tempfile
 import unittest
 
 class ParserTest(unittest.TestCase):
@@ -18,7 +29,306 @@ class ParserTest(unittest.TestCase):
             tokenized = parse(i.line, filename=i.filename, no=i.lineNumber)
             struct, nextLine = i.handleTokenized(tokenized)
         return struct
-        
+
+    def parseFile(self, path):
+        ''' Return every struct of the file or the error raised while parsing it '''
+        i = Interpreter(path)
+        structs = []
+        nextLine = False
+        try:
+            while True:
+                if not nextLine or i.line == '':
+                    i.line = i.input('>>> ')
+                if i.line == 'exit' or not i.line:
+                    break
+                tokenized = parse(i.line, filename=i.filename, no=i.lineNumber)
+                struct, nextLine = i.handleTokenized(tokenized)
+                structs.append(struct)
+        except Exception as e:
+            return repr(e)
+        return structs
+
+    def sourceFiles(self):
+        return sorted(glob(os.path.pardir+'/tests/testFiles/*/*.w')
+            + glob(os.path.pardir+'/examples/*.w'))
+
+    def test_trieScanMatchesLinearScan(self):
+        for path in self.sourceFiles():
+            with self.subTest(path=path):
+                photonParser.PARSER = 'linear'
+                try:
+                    expected = self.parseFile(path)
+                finally:
+                    photonParser.PARSER = 'trie'
+                self.assertEqual(self.parseFile(path), expected)
+
+    def test_tokenChainMatchesLinearScan(self):
+        chainLength = photonParser.CHAIN_LENGTH
+        for path in self.sourceFiles():
+            with self.subTest(path=path):
+                photonParser.PARSER = 'linear'
+                try:
+                    expected = self.parseFile(path)
+                finally:
+                    photonParser.PARSER = 'trie'
+                # Reduce every line in a TokenChain
+                photonParser.CHAIN_LENGTH = 0
+                try:
+                    self.assertEqual(self.parseFile(path), expected)
+                finally:
+                    photonParser.CHAIN_LENGTH = chainLength
+
+    def test_scannerMatchesSplitTokens(self):
+        for path in self.sourceFiles():
+            with open(path) as f:
+                lines = f.readlines()
+            with self.subTest(path=path):
+                for line in lines:
+                    expected = self.assembleLine(photonParser.splitTokens, line)
+                    self.assertEqual(self.assembleLine(photonParser.scan, line), expected)
+
+    def assembleLine(self, tokenize, line):
+        try:
+            return photonParser.assembly(tokenize(line))
+        except Exception as e:
+            return repr(e)
+
+    def test_tokenMapping(self):
+        struct = photonParser.assembly(parse('x = foo(1, [a, b])\n'))
+        self.assertIsInstance(struct, Token)
+        self.assertEqual(struct['token'], 'assign')
+        self.assertEqual(struct['target'], {'token': 'var', 'type': 'unknown', 'name': 'x'})
+        self.assertEqual({'token': 'var', 'type': 'unknown', 'name': 'x'}, struct['target'])
+        self.assertEqual(dict(struct['target']), {'token': 'var', 'type': 'unknown', 'name': 'x'})
+        self.assertEqual(Token('var', type='unknown', name='x'), struct['target'])
+        # Fields without a slot and the kind work as dict keys
+        token = struct['target'].copy()
+        token['size'] = 3
+        token['token'] = 'expr'
+        del token['name']
+        self.assertEqual(token, {'token': 'expr', 'type': 'unknown', 'size': 3})
+        self.assertEqual(token.kind, kindCodes['expr'])
+        self.assertNotIn('name', token)
+        self.assertRaises(KeyError, lambda: token['name'])
+        self.assertEqual(struct['target']['name'], 'x')
+        copied = deepcopy(struct)
+        self.assertEqual(copied, struct)
+        copied['expr']['args'][0]['args'].pop()
+        self.assertNotEqual(copied, struct)
+        pickled = pickle.loads(pickle.dumps(struct))
+        self.assertIsInstance(pickled['expr'], Token)
+        self.assertEqual(pickled, struct)
+        self.assertEqual(pickled['expr'].kind, struct['expr'].kind)
+
+    def test_scannedString(self):
+        struct = photonParser.assembly(parse('print("True is {a + 1}")\n'))
+        value = struct['args'][0]['args'][0]
+        self.assertEqual(value['value'], '"True is {}"')
+        self.assertEqual(value['expressions'][0]['ops'], ['+'])
+
+    def test_longLine(self):
+        args = ', '.join(f'a{n} + {n}' for n in range(200))
+        struct = photonParser.assembly(parse(f'foo({args})\n'))
+        self.assertEqual(struct['args'][0]['token'], 'call')
+        self.assertEqual(len(struct['args'][0]['args']), 200)
+
+    def test_logicalLines(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.w', delete=False) as f:
+            f.write('a = 1\n\nfoo(1,\n    2,\n)\nb = 2\n')
+        try:
+            i = Interpreter(f.name)
+            self.assertEqual(i.input(), 'a = 1\n')
+            self.assertEqual(i.lineNumber, 1)
+            self.assertEqual(i.input(), 'foo(1,2)\n')
+            self.assertEqual(i.lineNumber, 3)
+            self.assertEqual(i.input(), 'b = 2\n')
+            self.assertEqual(i.lineNumber, 6)
+            self.assertEqual(i.input(), '')
+        finally:
+            os.remove(f.name)
+
+    def test_parseCache(self):
+        path = os.path.pardir+'/examples/conditionals_ex.w'
+        structs = self.parseFile(path)
+        key = parseCache.cacheKey(path)
+        cacheFolder = parseCache.CACHE_FOLDER
+        with tempfile.TemporaryDirectory() as folder:
+            parseCache.CACHE_FOLDER = folder
+            try:
+                self.assertIsNone(parseCache.load(key))
+                parseCache.save(key, [parseCache.freeze(struct) for struct in structs])
+                self.assertEqual(parseCache.load(key), structs)
+                parseCache.evict(0)
+                self.assertIsNone(parseCache.load(key))
+            finally:
+                parseCache.CACHE_FOLDER = cacheFolder
+
+    def test_topLevelBlocks(self):
+        for path in self.sourceFiles():
+            with self.subTest(path=path):
+                expected = self.parseFile(path)
+                if isinstance(expected, str):
+                    continue
+                i = Interpreter(path)
+                lines = [(i.lineNumber, line) for line in i.lines]
+                blocks = interpreter.topLevelBlocks(lines)
+                with ProcessPoolExecutor(2) as pool:
+                    results = pool.map(interpreter.parseLines, blocks)
+                    self.assertEqual([struct for structs in results for struct in structs], expected)
+
+    def test_blockBuilder(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.w', delete=False) as f:
+            f.write('if a:\n    x = 1\n# comment\nelif b:\n    y = 2\n  # comment\nelse:\n'
+                '    z = 3\ndef f():\n    if c:\n        return 1\n    return 2\nprint(f())\n')
+        try:
+            for path in self.sourceFiles() + [f.name]:
+                with self.subTest(path=path):
+                    expected = self.parseFile(path)
+                    if isinstance(expected, str):
+                        continue
+                    i = Interpreter(path)
+                    lines = [(i.lineNumber, line) for line in i.lines]
+                    builder = interpreter.BlockBuilder(filename=path)
+                    parse = builder.parser.parse
+                    parsed = []
+                    builder.parser.parse = lambda line, **kwargs: parsed.append(line) or parse(line, **kwargs)
+                    self.assertEqual(builder.build(lines), expected)
+                    # Every line once, and the end of the file
+                    self.assertEqual(parsed, [line for _, line in lines] + [''])
+        finally:
+            os.remove(f.name)
+
+    def test_blockBuilderError(self):
+        lines = enumerate(['if a:', '    x = 1', 'else:', '    y = 2', 'else:', '    z = 3'], 1)
+        with self.assertRaises(SyntaxError) as context:
+            interpreter.BlockBuilder().build(lines)
+        # Shown once, not wrapped again by the builder
+        self.assertEqual(str(context.exception).count('Ops!!'), 1)
+
+    def test_scanWindow(self):
+        kinds = [token.kind for token in parse('x = foo(a + 1, b[2]) * -c.d\n')]
+        for name, scan in photonParser.scanners.items():
+            matches = scan(kinds)
+            with self.subTest(parser=name):
+                self.assertEqual(matches, sorted(matches))
+                for start in range(len(kinds)):
+                    for stop in range(start, len(kinds)+1):
+                        self.assertEqual(scan(kinds, start, stop),
+                            [(priority, i) for priority, i in matches if start <= i < stop])
+
+    def test_fastLiteralsMatchGeneralEngine(self):
+        lines = ['l = [1, 2.5, "a", True, -3, null]\n', 'm = {"a": 1, 2: -2.5}\n', 'l = []\n',
+            'x = f([1, 2], {})\n', 'x = [[1, 2], [3]]\n', 'x = {1: [1, 2]}\n', 'x = [a, -1]\n',
+            'l = [' + ', '.join(str(n) for n in range(500)) + ']\n']
+        for line in lines:
+            with self.subTest(line=line[:40]):
+                photonParser.FAST_LITERALS = False
+                try:
+                    expected = photonParser.assembly(parse(line))
+                finally:
+                    photonParser.FAST_LITERALS = True
+                self.assertEqual(photonParser.assembly(parse(line)), expected)
+        for path in self.sourceFiles():
+            with self.subTest(path=path):
+                photonParser.FAST_LITERALS = False
+                try:
+                    expected = self.parseFile(path)
+                finally:
+                    photonParser.FAST_LITERALS = True
+                self.assertEqual(self.parseFile(path), expected)
+
+    def test_precedenceClimb(self):
+        def combineByOrder(elements, ops):
+            elements = list(elements)
+            ops = list(ops)
+            for op in Expr.operatorOrder:
+                while op in ops:
+                    index = ops.index(op)
+                    elements[index] = f'({elements[index]} {op} {elements[index+1]})'
+                    del ops[index]
+                    del elements[index+1]
+            return elements[0]
+        combine = lambda op, arg1, arg2: f'({arg1} {op} {arg2})'
+        operators = ['+', '-', '*', '/', '**', '%', '==', '<', 'and', 'or']
+        for n in range(1, 60):
+            elements = [f'a{k}' for k in range(n + 1)]
+            ops = [operators[(k * 7 + n) % len(operators)] for k in range(n)]
+            with self.subTest(ops=ops):
+                self.assertEqual(precedenceClimb(elements, ops, Expr.operatorRanks, combine),
+                    combineByOrder(elements, ops))
+        self.assertEqual(precedenceClimb(['a', 'b', 'c'], ['+', '?'], Expr.operatorRanks, combine), '(a + b)')
+
+    def test_scopeRollback(self):
+        scope = CurrentScope()
+        scope.startLocalScope()
+        scope.setLocal('a', 1)
+        mark = scope.snapshot()
+        scope.setLocal('a', 2)
+        scope.setLocal('b', 3)
+        inner = scope.snapshot()
+        scope.setLocal('c', 4)
+        scope.release(inner)
+        scope.startLocalScope()
+        scope.setLocal('d', 5)
+        scope.rollback(mark)
+        self.assertEqual(scope.localScope, [{}, {'a': 1}])
+        self.assertEqual(scope.undoLog, [])
+        mark = scope.snapshot()
+        scope.setLocal('b', 3)
+        scope.release(mark)
+        self.assertEqual(scope.localScope[-1], {'a': 1, 'b': 3})
+        self.assertEqual(scope.undoLog, [])
+
+    def test_symbolTable(self):
+        scope = CurrentScope()
+        scope.currentScope['a'] = 'global'
+        scope.startLocalScope()
+        scope.setLocal('a', 'outer')
+        scope.startLocalScope()
+        scope.setLocal('a', 'inner')
+        scope.setLocal('a', 'inner2')
+        self.assertEqual(scope.get('a'), 'inner2')
+        scope.endLocalScope()
+        self.assertEqual(scope.get('a'), 'outer')
+        scope.endLocalScope()
+        self.assertEqual(scope.get('a'), 'global')
+        self.assertEqual(scope.bindings, {})
+        with self.assertRaises(KeyError):
+            scope.get('b')
+        self.assertEqual(scope.lookups, {'a': 3, 'b': 1})
+        self.assertEqual(scope.misses, {'b': 1})
+
+    def test_lineCache(self):
+        def readStructs(reader, lines):
+            source = iter(lines + [''])
+            reader.input = lambda *args: next(source)
+            structs = []
+            nextLine = False
+            while True:
+                if not nextLine:
+                    reader.line = reader.input()
+                if not reader.line:
+                    return structs
+                struct, nextLine = reader.handleTokenized(reader.parseLine())
+                structs.append(struct)
+        lines = ['def int f(int x):\n', '    int y = x + 1\n', '    if y > 2:\n', '        y = 2\n',
+            '    else:\n', '        y = 0\n', '    return y\n', 'print(f(1))\n']
+        expected = readStructs(interpreter.Reader(), lines)
+        reader = interpreter.Reader()
+        reader.lineCache = parseCache.LineCache(parseCache.LINE_CACHE_SIZE)
+        reduced = []
+        reduceToken = reader.parser.reduceToken
+        reader.parser.reduceToken = lambda tokens: reduced.append(tokens) or reduceToken(tokens)
+        self.assertEqual(readStructs(reader, lines), expected)
+        self.assertEqual(len(reduced), 7)
+        # Only the line that changed is reduced again
+        reduced.clear()
+        lines[3] = '        y = 3\n'
+        structs = readStructs(reader, lines)
+        self.assertEqual(len(reduced), 1)
+        self.assertEqual(structs, readStructs(interpreter.Reader(), lines))
+        self.assertIsNot(structs[0]['block'][0], expected[0]['block'][0])
+
     def test_printStr(self):
         struct = self.runFile('printFunc/printStr.w')
         self.assertEqual(struct['token'], 'printFunc')
@@ -2,7 +2,13 @@ import sys, os
 sys.path.insert(1, os.path.pardir+'/core')
 from photonParser import parse
 from interpreter import Interpreter
+from transpilers import cTokens, pyTokens, jsTokens, fold, inline, shake, licm, bounds
+from transpilers.emitter import Emitter
+import io
 import unittest
+import tempfile
+import contextlib
+import subprocess
 from subprocess import Popen, PIPE
 
 class TranspilersTest(unittest.TestCase):
@@ -47,5 +53,264 @@ class TranspilersTest(unittest.TestCase):
     def test_printVar(self):
         self.runFile('printFunc/printVar.w', 2)
 
+class PassesTest(unittest.TestCase):
+    libs = os.path.abspath(os.path.pardir+'/core/libs')
+
+    def transpile(self, source, lang, without=None, run=False):
+        ''' Return the main file written for a source in lang, or what it
+            prints when run, with the pass of the module without turned off
+        '''
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as folder:
+            os.chdir(folder)
+            if without is not None:
+                without.ENABLED = False
+            try:
+                with open('main.w', 'w') as f:
+                    f.write(source)
+                i = Interpreter('main.w', lang=lang, standardLibs=self.libs, transpileOnly=True)
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    i.run()
+                if run:
+                    return self.output(lang)
+                with open(f'Sources/{lang}/main.{lang}') as f:
+                    return f.read()
+            finally:
+                if without is not None:
+                    without.ENABLED = True
+                os.chdir(cwd)
+
+    def output(self, lang):
+        ''' Return what the main file written in lang prints '''
+        if lang == 'c':
+            subprocess.check_call(['gcc', '-std=c99', 'Sources/c/main.c', '-o', 'Sources/c/main', '-lm'])
+            command = ['Sources/c/main']
+        else:
+            command = [{'py': sys.executable, 'js': 'node'}[lang], f'Sources/{lang}/main.{lang}']
+        return subprocess.run(command, capture_output=True, text=True, check=True).stdout
+
+    def assertSameOutput(self, source, without, langs=('py', 'js', 'c')):
+        ''' Check the source prints the same with and without a pass '''
+        for lang in langs:
+            with self.subTest(lang=lang, without=without.__name__):
+                self.assertEqual(self.transpile(source, lang, run=True),
+                    self.transpile(source, lang, without=without, run=True))
+
+    def test_emitter(self):
+        NativeCode, Scope = pyTokens.NativeCode, pyTokens.Scope
+        inner = [NativeCode('y = 1\nz = 2'), pyTokens.While(NativeCode('z'), [])]
+        block = Scope([NativeCode('x = 0'),
+            pyTokens.If(NativeCode('x'), inner, elifs=[], elseBlock=[NativeCode('y = 0')])])
+        expected = (':\n    x = 0\n    if x :\n        y = 1\n        z = 2\n        while z :\n'
+            '            pass\n        \n        \n    else :\n        y = 0\n        \n    \n    \n')
+        self.assertEqual(repr(block), expected)
+        sink = io.StringIO()
+        Emitter(sink).emit(block)
+        self.assertEqual(sink.getvalue(), expected)
+
+    def test_argsTruth(self):
+        Var = cTokens.Var
+        self.assertFalse(cTokens.Args([]))
+        self.assertFalse(cTokens.Args([Var('x', 'int')], mode='empty'))
+        self.assertTrue(cTokens.Args([Var('x', 'int')]))
+        self.assertTrue(cTokens.Args([Var('x', 'int'), Var('y', 'int')]))
+        self.assertFalse(cTokens.Kwargs([]))
+
+    def test_renderCache(self):
+        Var, stats = cTokens.Var, cTokens.renderStats
+        expr = cTokens.Expr(Var('x', 'int', namespace='main'))
+        saved = stats['saved']
+        self.assertEqual(repr(expr), repr(expr))
+        self.assertEqual(stats['saved'], saved + 1)
+        expr.namespace = 'f'
+        self.assertEqual(repr(expr), 'f__x')
+        self.assertEqual(stats['saved'], saved + 1)
+        call = cTokens.Call(name=Var('f', 'int'), args=[Var('x', 'int')], signature=[Var('y', 'float')])
+        self.assertEqual(repr(call), 'f((double)(x))')
+        call.signature = [Var('y', 'int')]
+        self.assertEqual(repr(call), 'f(x)')
+        # A text with the call in it is stale too
+        outer = cTokens.Expr(call)
+        self.assertEqual(repr(outer), 'f(x)')
+        call.signature = [Var('y', 'float')]
+        self.assertEqual(repr(outer), 'f((double)(x))')
+
+    def test_internedTypes(self):
+        Type = cTokens.Type
+        self.assertIs(Type('int'), Type('int'))
+        self.assertIs(Type('array', elementType='int'), Type(Type('array', elementType='int')))
+        self.assertIs(Type('array', elementType='int').elementType, Type('int'))
+        self.assertIsNot(Type('map', keyType='str', valType='int'), Type('map', keyType='str', valType='float'))
+        self.assertEqual(Type('int', native=True), Type('int'))
+        self.assertIsNot(Type('int func'), Type('int func'))
+        self.assertTrue(Type('Point').isClass)
+        self.assertFalse(Type('array').known)
+        self.assertEqual(f'{Type("str")}', 'char*')
+
+    def test_classLowering(self):
+        source = ('class Counter():\n    def new(.count = 0):\n    def int next():\n'
+            '        return .peek() + 1\n    def int peek():\n        return .count\n'
+            '    def twice():\n        n = Counter(.count)\n        .count = n.next()\n'
+            'c = Counter()\nc.twice()\n')
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as folder:
+            os.chdir(folder)
+            try:
+                with open('counter.w', 'w') as f:
+                    f.write(source)
+                i = Interpreter('counter.w', lang='py', standardLibs=self.libs, transpileOnly=True)
+                processFunc = i.engine.instructions['func']
+                lowered = []
+                def countFunc(token):
+                    lowered.append(token['name'])
+                    return processFunc(token)
+                i.engine.instructions['func'] = countFunc
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    i.run()
+                with open('Sources/py/main.py') as f:
+                    code = f.read()
+            finally:
+                os.chdir(cwd)
+        # twice refers to the class itself, so it's lowered again once
+        # the class is known
+        self.assertEqual(lowered, ['new', 'next', 'peek', 'twice', 'twice'])
+        self.assertIn('n:TypeVar("counter__Counter") = counter__Counter(self.count)', code)
+
+    def test_constantFolding(self):
+        def folded(tokens, *elements, ops):
+            args = [tokens.Num(value=e, type='float' if '.' in e else 'int')
+                if e[0].isdigit() else tokens.Var(e, 'int', namespace='main')
+                for e in elements]
+            return repr(tokens.Expr(*args, ops=ops))
+        c, py, js = cTokens, pyTokens, jsTokens
+        self.assertEqual(folded(c, '2', '3', 'x', ops=['*', '+']), '6 + main__x')
+        self.assertEqual(folded(py, 'x', '2', '3', ops=['+', '*']), 'main__x + 6')
+        # Grouped as the target does, not 8 / (2 * 2)
+        self.assertEqual(folded(py, '8', '2', '2', ops=['/', '*']), '8.0')
+        self.assertEqual(folded(c, '8', '2', '2', ops=['/', '*']), '8 / 2 * 2')
+        self.assertEqual(folded(c, '7', '2.0', ops=['/']), '3.5')
+        self.assertEqual(folded(py, '2', '3', '2', ops=['**', '**']), '512')
+        self.assertEqual(folded(c, '2', '3', ops=['**']), '2 ** 3')
+        # Int literals overflow in C
+        self.assertEqual(folded(c, '100000', '100000', ops=['*']), '100000 * 100000')
+        self.assertEqual(folded(js, '100000', '100000', ops=['*']), '10000000000')
+        for tokens, expected in [(c, '-1'), (py, '2'), (js, '-1')]:
+            num = lambda value: tokens.Num(value=value, type='int')
+            minusSeven = tokens.Group(tokens.Expr(num('0'), num('7'), ops=['-']))
+            self.assertEqual(repr(tokens.Expr(minusSeven, num('3'), ops=['%'])), expected)
+        self.assertEqual(folded(c, '1', '2', '3', ops=['<', '<']), '1 < 2 < 3')
+        self.assertEqual(folded(js, '1', '2', '1', '3', ops=['<', 'and', '<']), 'true')
+        self.assertEqual(fold.literal(fold.variable(3, 'c'), 'c'), '3L')
+        source = ('r = 2.0\nprint(2 * 3.5 * r)\nint day = 60 * 60 * 24\n'
+            'print("{day} {2 + 3}")\n')
+        # Node has no format for the strings of the unfolded code
+        self.assertSameOutput(source, fold, langs=('py', 'c'))
+        code = self.transpile(source, 'py')
+        self.assertIn('print(14.0)', code)
+        self.assertIn('print("86400 5")', code)
+        self.assertIn('main__day:int = 60 * 60 * 24', self.transpile(source, 'py', without=fold))
+
+    def test_inlining(self):
+        source = ('def int sq(int v):\n    return v * v\n'
+            'def float half(float v):\n    float h = v / 2\n    return h\n'
+            'def int fact(int n):\n    if n < 2:\n        return 1\n    return n * fact(n - 1)\n'
+            'for i in 0..3:\n    print(sq(i) + 1)\n    print(half(sq(i)))\n'
+            '    print(half(2.0))\n    print(sq(3))\n    print(fact(i))\n')
+        self.assertSameOutput(source, inline)
+        code = self.transpile(source, 'py')
+        self.assertIn('print((main__i * main__i) + 1)', code)
+        self.assertIn('print(1.0)', code)
+        self.assertIn('print(9)', code)
+        # The argument is converted by the call, and a function with
+        # statements is called
+        self.assertIn('print(main__half(float(main__i * main__i)))', code)
+        self.assertIn('print(main__fact(main__i))', code)
+        # A constant is a long, as the variable it replaces
+        self.assertIn('printf("%ld\\n", 9L);', self.transpile(source, 'c'))
+        self.assertIn('print(main__sq(main__i) + 1)', self.transpile(source, 'py', without=inline))
+        # A function of an imported module, its typed local converted as
+        # the assignment does, and a getter in C
+        source = ('import random\nclass Box():\n    def new(.w = 2):\n\n'
+            '    def int width():\n        return self.w\n\n'
+            'b = Box()\nn = 6\nint x = random.randint(0, n)\nint y = b.width()\nprint(x + y)\n')
+        code = self.transpile(source, 'py')
+        self.assertIn('main__x:int = int(main__random__random() * 6 + 0)', code)
+        self.assertNotIn('main__random__randint', code)
+        self.assertIn('main__y:int = main__b.width()', code)
+        code = self.transpile(source, 'c')
+        self.assertIn('long main__x = (long)(main__random__random() * 6L + 0L);', code)
+        self.assertIn('long main__y = main__b->w;', code)
+
+    def test_treeShaking(self):
+        source = ('import random\nclass Unused():\n    def new(.n = 0):\n'
+            'def int helper(int a):\n    if a > 1:\n        return a\n    return 0\n'
+            'def int lonely(int a):\n    if a > 1:\n        return helper(a)\n    return a\n'
+            'def int used(int a):\n    if a > 1:\n        return helper(a) * 2\n    return a\n'
+            'print(used(2))\n')
+        for lang in ['py', 'js', 'c']:
+            with self.subTest(lang=lang):
+                code = self.transpile(source, lang)
+                self.assertIn('main__used', code)
+                self.assertIn('main__helper', code)
+                for name in ['main__lonely', 'main__Unused', 'main__random__randint']:
+                    self.assertNotIn(name, code)
+        # Methods are functions of their own in C
+        code = self.transpile('class Point():\n    def new(.x = 0):\n\n'
+            '    def int next():\n        return self.x + 1\n\n'
+            '    def int unused():\n        return self.x + 2\n'
+            'print(Point(1).next())\n', 'c')
+        self.assertIn('main__Point__next', code)
+        self.assertNotIn('unused', code)
+        # Preprocessor lines are not comments
+        self.assertIn('main__size', shake.names('#define SIZE main__size\n', 'c'))
+        self.assertNotIn('main__size', shake.names('# main__size\n', 'python'))
+        # Only the class dropped used TypeVar
+        self.assertSameOutput(source, shake)
+        self.assertNotIn('import TypeVar', self.transpile(source, 'py'))
+        code = self.transpile(source, 'py', without=shake)
+        self.assertIn('main__lonely', code)
+        self.assertIn('import TypeVar', code)
+
+    def test_loopInvariants(self):
+        source = ('class Box():\n    def new(.w = 2):\n'
+            'b = Box()\na = [1, 2, 3]\ni = 0\ns = 0\n'
+            'while i < a.len:\n    s += b.w * a[i]\n    i += 1\n'
+            # A call could change the list, a field assigned is not invariant
+            'j = 0\nwhile j < a.len and j < 5:\n    a.append(j)\n    j += 1\n'
+            'k = 0\nwhile k < 3:\n    b.w += 1\n    s += b.w\n    k += 1\n'
+            'print(s)\n')
+        for lang in ['py', 'js', 'c']:
+            with self.subTest(lang=lang):
+                code = self.transpile(source, lang)
+                # The length of a and the field w of the first loop
+                self.assertIn('main____invariant2', code)
+                self.assertNotIn('main____invariant3', code)
+        self.assertSameOutput(source, licm)
+        self.assertNotIn('invariant', self.transpile(source, 'py', without=licm))
+        # Python evaluates the bounds of a range once
+        source = 'a = [1, 2]\ns = 0\nfor m in 0..a.len:\n    s += m\nprint(s)\n'
+        self.assertIn('main____invariant1', self.transpile(source, 'c'))
+        self.assertNotIn('invariant', self.transpile(source, 'py'))
+
+    def test_boundsChecks(self):
+        source = ('a = [3, 1, 4]\nb = [1, 2]\ns = 0\n'
+            'for i in 0..a.len:\n    a[i] = a[i] + b[i]\n'
+            'for i, x in a:\n    s += a[i] + x\n'
+            # The list could be resized or the index be out of bounds
+            'for i in 0..a.len:\n    a.append(i)\n    s += a[i]\n'
+            'for i in 0..b.len:\n    i = 2\n    s += b[i]\n'
+            'print(s)\n')
+        code = self.transpile(source, 'c')
+        self.assertIn('main__a->values[main__i] = main__a->values[main__i] + list_int_get(main__b, main__i)', code)
+        self.assertIn('main__s + main__a->values[main__i] + main__x', code)
+        self.assertEqual(code.count('list_int_get(main__a, main__i)'), 1)
+        self.assertEqual(code.count('list_int_get(main__b, main__i)'), 2)
+        self.assertNotIn('main__a->values[main__i]', self.transpile(source, 'c', without=bounds))
+        source = ('a = [3, 1, 4]\nb = [1, 2]\ns = 0\n'
+            'for i in 0..b.len:\n    a[i] = a[i] + b[i]\n'
+            'for i, x in a:\n    s += a[i] + x\n'
+            'print(s)\n')
+        self.assertSameOutput(source, bounds, langs=('c',))
+
 if __name__ == "__main__":
     unittest.main()